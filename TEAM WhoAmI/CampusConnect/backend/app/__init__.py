@@ -13,7 +13,8 @@ def create_app(config_name='development'):
     Create and configure Flask application using the factory pattern.
     
     Args:
-        config_name (str): Configuration environment name ('development' or 'production')
+        config_name (str or type): Configuration environment name ('development' or
+            'production'), or a Config subclass such as a test configuration
         
     Returns:
         Flask: Configured Flask application instance
@@ -22,11 +23,39 @@ def create_app(config_name='development'):
     app = Flask(__name__)
     
     # Load configuration
-    app.config.from_object(config[config_name])
+    app.config.from_object(config[config_name] if isinstance(config_name, str) else config_name)
     
     # Initialize database
     initialize_database(app)
     
+    # Share one database session per request
+    from .database import init_request_session
+    init_request_session(app)
+    
+    # Cache verified session tokens in-process
+    from .services.session_cache import init_session_cache
+    init_session_cache(app)
+    
+    # Resolve the current user from signed access tokens
+    from .utils.auth import init_auth_middleware
+    init_auth_middleware(app)
+    
+    # Throttle OTP sends and password logins
+    from .services.rate_limiter import init_rate_limiter
+    init_rate_limiter(app)
+    
+    # Compiled email templates
+    from .services.email_templates import init_email_templates
+    init_email_templates(app)
+    
+    # Deliver queued email in the background
+    from .services.email_queue import init_email_worker
+    init_email_worker(app)
+    
+    # Delete expired OTP codes and dead sessions in the background
+    from .services.reaper import init_reaper
+    init_reaper(app)
+    
     # Initialize CORS with configuration
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
@@ -50,11 +79,13 @@ def create_app(config_name='development'):
     @app.route('/health')
     def health_check():
         from .database import get_database_info
+        from .services.reaper import auth_reaper
         db_info = get_database_info()
         return {
             'status': 'healthy', 
             'message': 'Flask backend API is running',
-            'database': db_info
+            'database': db_info,
+            'auth_reaper': auth_reaper.get_stats()
         }
     
     return app
@@ -81,7 +112,7 @@ def initialize_database(app):
         print(f"Initializing database: {database_uri}")
         
         # Initialize database
-        init_database(database_uri, echo=app.config.get('DEBUG', False))
+        init_database(database_uri, echo=app.config.get('DEBUG', False), settings=app.config)
         
         # Create tables if they don't exist
         create_tables()
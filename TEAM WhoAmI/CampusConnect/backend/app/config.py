@@ -22,10 +22,34 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///campus_connect.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read replicas (comma-separated URLs); read-only queries are spread across them
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    DB_READ_YOUR_WRITES_SECONDS = int(os.environ.get('DB_READ_YOUR_WRITES_SECONDS', 5))  # Pin a user to the primary after a write
+    
+    # Connection pool profile for server databases (PostgreSQL, MySQL)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    
+    # SQLite tuning profile, applied as pragmas on every new connection
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536))  # 64 MB
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))  # 256 MB
+    
     # Authentication configuration
     ALLOWED_EMAIL_DOMAINS = os.environ.get('ALLOWED_EMAIL_DOMAINS', '.edu').split(',')
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600))  # 1 hour
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.environ.get('TOKEN_REVOCATION_SYNC_SECONDS', 5))  # Max delay before other workers see a revocation
+    
+    # Session token cache (per process); SESSION_CACHE_MAX_ENTRIES=0 disables it
+    SESSION_CACHE_MAX_ENTRIES = int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', 10000))
+    SESSION_CACHE_TTL_SECONDS = int(os.environ.get('SESSION_CACHE_TTL_SECONDS', 300))
+    SESSION_LAST_USED_FLUSH_SECONDS = int(os.environ.get('SESSION_LAST_USED_FLUSH_SECONDS', 60))
     
     # Email configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
@@ -36,10 +60,46 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or MAIL_USERNAME
     MAIL_REPLY_TO = os.environ.get('REPLY_TO')
+    MAIL_TIMEOUT = int(os.environ.get('MAIL_TIMEOUT', 30))  # seconds
+    EMAIL_TEMPLATE_CACHE_DIR = os.environ.get('EMAIL_TEMPLATE_CACHE_DIR')  # Compiled template bytecode; defaults to a temp dir
+    
+    # Pooled SMTP sessions, reused across messages
+    SMTP_POOL_SIZE = int(os.environ.get('SMTP_POOL_SIZE', 4))
+    SMTP_POOL_MAX_IDLE_SECONDS = int(os.environ.get('SMTP_POOL_MAX_IDLE_SECONDS', 240))
+    SMTP_POOL_NOOP_AFTER_SECONDS = int(os.environ.get('SMTP_POOL_NOOP_AFTER_SECONDS', 30))  # Health-check sessions idle this long
+    SMTP_POOL_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get('SMTP_POOL_MAX_MESSAGES_PER_CONNECTION', 100))
+    
+    # Outbound email queue, drained by a background worker thread
+    EMAIL_QUEUE_WORKER_ENABLED = os.environ.get('EMAIL_QUEUE_WORKER_ENABLED', 'True').lower() == 'true'
+    EMAIL_QUEUE_POLL_SECONDS = int(os.environ.get('EMAIL_QUEUE_POLL_SECONDS', 5))
+    EMAIL_QUEUE_BATCH_SIZE = int(os.environ.get('EMAIL_QUEUE_BATCH_SIZE', 50))
+    EMAIL_QUEUE_MAX_ATTEMPTS = int(os.environ.get('EMAIL_QUEUE_MAX_ATTEMPTS', 5))
+    EMAIL_QUEUE_RETRY_BASE_SECONDS = int(os.environ.get('EMAIL_QUEUE_RETRY_BASE_SECONDS', 30))
+    EMAIL_QUEUE_RETRY_MAX_SECONDS = int(os.environ.get('EMAIL_QUEUE_RETRY_MAX_SECONDS', 3600))
+    EMAIL_QUEUE_LEASE_SECONDS = int(os.environ.get('EMAIL_QUEUE_LEASE_SECONDS', 300))  # Reclaim sends abandoned by a dead worker
+    
+    # Background deletion of expired OTP codes and dead sessions
+    AUTH_REAPER_ENABLED = os.environ.get('AUTH_REAPER_ENABLED', 'True').lower() == 'true'
+    AUTH_REAPER_INTERVAL_SECONDS = int(os.environ.get('AUTH_REAPER_INTERVAL_SECONDS', 3600))
+    AUTH_REAPER_BATCH_SIZE = int(os.environ.get('AUTH_REAPER_BATCH_SIZE', 500))  # Rows deleted per transaction
+    AUTH_REAPER_GRACE_MINUTES = int(os.environ.get('AUTH_REAPER_GRACE_MINUTES', 60))  # Keep dead rows this long before deleting
+    
+    # Token-bucket throttling of OTP sends and password logins, as "capacity/period_seconds"
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # 'memory' or 'sqlite' (shared by worker processes)
+    RATE_LIMIT_SQLITE_PATH = os.environ.get('RATE_LIMIT_SQLITE_PATH')  # Defaults to a file in the temp dir
+    RATE_LIMIT_OTP_SEND_PER_EMAIL = os.environ.get('RATE_LIMIT_OTP_SEND_PER_EMAIL', '3/600')
+    RATE_LIMIT_OTP_SEND_PER_IP = os.environ.get('RATE_LIMIT_OTP_SEND_PER_IP', '20/600')
+    RATE_LIMIT_PASSWORD_LOGIN_PER_EMAIL = os.environ.get('RATE_LIMIT_PASSWORD_LOGIN_PER_EMAIL', '5/300')
+    RATE_LIMIT_PASSWORD_LOGIN_PER_IP = os.environ.get('RATE_LIMIT_PASSWORD_LOGIN_PER_IP', '30/300')
     
     # OTP configuration
     OTP_EXPIRY_MINUTES = int(os.environ.get('OTP_EXPIRY_MINUTES', 10))
     OTP_LENGTH = int(os.environ.get('OTP_LENGTH', 6))
+    
+    # Feed pagination configuration
+    FEED_PAGE_SIZE = int(os.environ.get('FEED_PAGE_SIZE', 20))
+    FEED_MAX_PAGE_SIZE = int(os.environ.get('FEED_MAX_PAGE_SIZE', 100))
 
 
 class DevelopmentConfig(Config):
@@ -5,12 +5,16 @@ This module handles SQLAlchemy database setup, connection management,
 and provides utilities for database operations.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Callable, Dict, Generator, List, Mapping, Optional
+from flask import g, has_request_context
+import itertools
 import logging
+import threading
+import time
 
 try:
     from app.models.auth_models import Base
@@ -24,37 +28,216 @@ except ImportError:
 # Global variables for database components
 engine = None
 SessionLocal = None
+RequestSessionLocal = None
+
+# Read replica routing state
+replica_engines = []
+_replica_cycle = None
+_replica_lock = threading.Lock()
+_recent_writers = {}  # user key -> monotonic time of their last committed write
+_read_your_writes_seconds = 5
 
 logger = logging.getLogger(__name__)
 
 
-def init_database(database_url: str, echo: bool = False) -> None:
+class RequestSession(Session):
     """
-    Initialize the database engine and session factory.
+    Session shared by every get_db() block within one HTTP request.
+    
+    Services written against get_db() call commit() and rollback()
+    themselves. Inside a request those calls only flush or roll back the
+    caller's savepoint; the real transaction is committed once by
+    commit_request() when the request finishes.
+    """
+    
+    def commit(self) -> None:
+        """Flush pending changes and expire state, as a real commit would."""
+        self.flush()
+        self.expire_all()
+    
+    def rollback(self) -> None:
+        """Roll back the current get_db() block's savepoint."""
+        savepoints = self.info.get('savepoints')
+        if not savepoints:
+            super().rollback()
+            return
+        
+        savepoints[-1].rollback()
+        savepoints[-1] = self.begin_nested()
+    
+    def commit_request(self) -> None:
+        """Commit the request's transaction."""
+        super().commit()
+    
+    def rollback_request(self) -> None:
+        """Roll back the request's transaction."""
+        super().rollback()
+
+
+@event.listens_for(RequestSession, "after_flush")
+def _mark_flush_writes(session, flush_context):
+    """Remember that the request session has written through the ORM."""
+    session.info['has_writes'] = True
+
+
+@event.listens_for(RequestSession, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state):
+    """Remember that the request session has run an INSERT/UPDATE/DELETE."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['has_writes'] = True
+
+
+def _enable_sqlite_savepoints(sqlite_engine) -> None:
+    """
+    Let SQLAlchemy control transaction boundaries on pysqlite.
+    
+    pysqlite defers BEGIN until the first write, which makes an outermost
+    SAVEPOINT start (and its RELEASE commit) the whole transaction. Emitting
+    BEGIN ourselves keeps request-scoped savepoints nested properly.
+    """
+    @event.listens_for(sqlite_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(sqlite_engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+def _default_settings() -> Dict[str, Any]:
+    """Engine settings from the base Config, for callers outside the Flask app."""
+    from app.config import Config
+    return {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+
+
+def _is_sqlite_memory(database_url: str) -> bool:
+    """Check whether a SQLite URL points at an in-memory database."""
+    from sqlalchemy.engine import make_url
+    return make_url(database_url).database in (None, '', ':memory:')
+
+
+def build_engine_options(database_url: str, settings: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Build create_engine() keyword arguments for the configured profile.
+    
+    SQLite files are local, so they skip the pre-ping round trip and
+    connection recycling. Server databases get a sized QueuePool.
     
     Args:
         database_url (str): Database connection URL
+        settings (Mapping): Configuration values (DB_* and SQLITE_* keys)
+        
+    Returns:
+        dict: Keyword arguments for create_engine()
+    """
+    if database_url.startswith('sqlite'):
+        return {
+            'pool_pre_ping': False,
+            'connect_args': {'timeout': settings['SQLITE_BUSY_TIMEOUT_MS'] / 1000},
+        }
+    
+    return {
+        'pool_size': settings['DB_POOL_SIZE'],
+        'max_overflow': settings['DB_MAX_OVERFLOW'],
+        'pool_timeout': settings['DB_POOL_TIMEOUT'],
+        'pool_recycle': settings['DB_POOL_RECYCLE'],
+        'pool_pre_ping': settings['DB_POOL_PRE_PING'],
+    }
+
+
+def _apply_sqlite_pragmas(sqlite_engine, settings: Mapping[str, Any], in_memory: bool) -> None:
+    """
+    Apply the SQLite tuning profile to every new connection.
+    
+    Args:
+        sqlite_engine: Engine to configure
+        settings (Mapping): Configuration values (SQLITE_* keys)
+        in_memory (bool): Whether the database is in-memory (no WAL or mmap)
+    """
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA synchronous = {settings['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA cache_size = -{int(settings['SQLITE_CACHE_SIZE_KB'])}",
+    ]
+    if not in_memory:
+        pragmas.insert(0, f"PRAGMA journal_mode = {settings['SQLITE_JOURNAL_MODE']}")
+        pragmas.append(f"PRAGMA mmap_size = {int(settings['SQLITE_MMAP_SIZE'])}")
+    
+    @event.listens_for(sqlite_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _create_configured_engine(database_url: str, echo: bool, settings: Mapping[str, Any]):
+    """Create an engine with the configured profile applied."""
+    new_engine = create_engine(
+        database_url,
+        echo=echo,
+        **build_engine_options(database_url, settings)
+    )
+    
+    if new_engine.dialect.name == 'sqlite':
+        _enable_sqlite_savepoints(new_engine)
+        _apply_sqlite_pragmas(new_engine, settings, _is_sqlite_memory(database_url))
+    
+    return new_engine
+
+
+def init_database(
+    database_url: str,
+    echo: bool = False,
+    settings: Optional[Mapping[str, Any]] = None,
+    replica_urls: Optional[List[str]] = None
+) -> None:
+    """
+    Initialize the database engine and session factory.
+    
+    Args:
+        database_url (str): Database connection URL (the primary)
         echo (bool): Whether to echo SQL statements (for debugging)
+        settings (Mapping, optional): Engine profile settings, normally the
+            Flask app config; defaults to the base Config values
+        replica_urls (List[str], optional): Read replica URLs; defaults to
+            DATABASE_REPLICA_URLS from settings
     """
-    global engine, SessionLocal
+    global engine, SessionLocal, RequestSessionLocal
+    global replica_engines, _replica_cycle, _read_your_writes_seconds
+    
+    settings = settings or _default_settings()
+    if replica_urls is None:
+        replica_urls = settings.get('DATABASE_REPLICA_URLS') or []
     
     try:
-        # Create engine
-        engine = create_engine(
-            database_url,
-            echo=echo,
-            pool_pre_ping=True,  # Verify connections before use
-            pool_recycle=300,    # Recycle connections every 5 minutes
-        )
+        # Create engines
+        engine = _create_configured_engine(database_url, echo, settings)
+        replica_engines = [
+            _create_configured_engine(url, echo, settings) for url in replica_urls
+        ]
+        _replica_cycle = itertools.cycle(replica_engines) if replica_engines else None
+        _read_your_writes_seconds = settings.get('DB_READ_YOUR_WRITES_SECONDS', 5)
+        _recent_writers.clear()
         
-        # Create session factory
+        # Create session factories
         SessionLocal = sessionmaker(
             autocommit=False,
             autoflush=False,
             bind=engine
         )
+        RequestSessionLocal = sessionmaker(
+            class_=RequestSession,
+            autocommit=False,
+            autoflush=False,
+            bind=engine
+        )
         
         logger.info(f"Database initialized successfully with URL: {database_url}")
+        if replica_engines:
+            logger.info(f"Routing read-only queries across {len(replica_engines)} replica(s)")
         
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
@@ -81,6 +264,14 @@ def create_tables() -> None:
         
         # Create all tables
         Base.metadata.create_all(bind=engine)
+        added_columns = add_missing_columns()
+        add_missing_indexes()
+        normalize_feed_timestamps()
+        
+        # Counter columns added to existing tables start at their default
+        # of 0; fill them in before anything relies on them
+        if COUNTER_COLUMNS.intersection(added_columns):
+            repair_counters()
         logger.info("Database tables created successfully")
         
     except Exception as e:
@@ -88,6 +279,154 @@ def create_tables() -> None:
         raise
 
 
+def add_missing_columns() -> List[str]:
+    """
+    Add model columns that are missing from existing tables.
+    
+    create_all() never alters a table that already exists, so databases
+    created before a column was introduced are upgraded here. Only columns
+    that are nullable or carry a server default can be added this way.
+    
+    Returns:
+        list: "table.column" names of the columns added
+    """
+    global engine
+    
+    if engine is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    
+    from sqlalchemy import inspect, text
+    
+    added = []
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if column.server_default is None and not column.nullable:
+                    logger.warning(f"Cannot add column {table.name}.{column.name} without a server default")
+                    continue
+                
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+                connection.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+                logger.info(f"Added column {table.name}.{column.name}")
+    return added
+
+
+def add_missing_indexes() -> None:
+    """
+    Create model indexes that are missing from existing tables.
+    
+    Like columns, indexes declared after a table was first created are not
+    picked up by create_all(), so each one is created if absent.
+    """
+    global engine
+    
+    if engine is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+# Tables paged by (created_at, id) cursors, see app.utils.pagination
+FEED_TABLES = ('posts', 'events')
+
+
+def normalize_feed_timestamps() -> int:
+    """
+    Rewrite feed created_at values stored without microseconds.
+    
+    SQLite keeps datetimes as text and compares them as strings. Rows
+    written by the old func.now() default look like "2024-01-01 12:00:00"
+    while SQLAlchemy binds cursor values as "2024-01-01 12:00:00.000000",
+    so a cursor never matched the rows of its own second and pages
+    repeated. Padding the old values gives every row one format.
+    
+    Returns:
+        int: Number of rows rewritten
+    """
+    global engine
+    
+    if engine is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    if engine.dialect.name != 'sqlite':
+        return 0
+    
+    from sqlalchemy import inspect, text
+    
+    inspector = inspect(engine)
+    rewritten = 0
+    with engine.begin() as connection:
+        for table in FEED_TABLES:
+            if inspector.has_table(table):
+                rewritten += connection.execute(text(
+                    f"UPDATE {table} SET created_at = created_at || '.000000' WHERE length(created_at) = 19"
+                )).rowcount
+    if rewritten:
+        logger.info(f"Normalized created_at on {rewritten} feed rows")
+    return rewritten
+
+
+# Denormalized counters rebuilt by repair_counters()
+COUNTER_COLUMNS = {
+    'posts.like_count',
+    'posts.comment_count',
+    'events.attendee_count',
+    'groups.member_count',
+}
+
+
+def repair_counters() -> dict:
+    """
+    Recompute the denormalized counter columns from their source tables.
+    
+    Post.like_count, Post.comment_count, Event.attendee_count and
+    Group.member_count are maintained incrementally by the services; this
+    rebuilds them from post_likes, comments, user_events and user_groups
+    after bulk imports or manual edits.
+    
+    Returns:
+        dict: Number of rows whose counter was corrected, per column
+    """
+    from sqlalchemy import func, select, update
+    from app.models.auth_models import (
+        Post, Comment, Event, Group, post_likes, user_events, user_groups
+    )
+    
+    counters = [
+        (Post, Post.like_count, post_likes.c.post_id, select(func.count()).select_from(post_likes)),
+        (Post, Post.comment_count, Comment.post_id, select(func.count(Comment.id))),
+        (Event, Event.attendee_count, user_events.c.event_id, select(func.count()).select_from(user_events)),
+        (Group, Group.member_count, user_groups.c.group_id, select(func.count()).select_from(user_groups)),
+    ]
+    
+    repaired = {}
+    with get_db() as db:
+        for model, column, foreign_key, count_query in counters:
+            actual = count_query.where(foreign_key == model.id).scalar_subquery()
+            result = db.execute(
+                update(model)
+                .where(column != actual)
+                .values({column: actual})
+                .execution_options(synchronize_session=False)
+            )
+            repaired[f"{model.__tablename__}.{column.key}"] = result.rowcount
+    
+    logger.info(f"Counter repair complete: {repaired}")
+    return repaired
+
+
 def drop_tables() -> None:
     """
     Drop all database tables. Use with caution!
@@ -126,11 +465,207 @@ def get_db_session() -> Session:
     return SessionLocal()
 
 
+def get_request_session() -> RequestSession:
+    """
+    Get the unit-of-work session for the current request, creating it on first use.
+    
+    Returns:
+        RequestSession: Session stored on flask.g for the rest of the request
+    """
+    global RequestSessionLocal
+    
+    if RequestSessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    
+    if 'db_session' not in g:
+        g.db_session = RequestSessionLocal()
+    return g.db_session
+
+
+@contextmanager
+def _join_request_session() -> Generator[Session, None, None]:
+    """Run a get_db() block inside the request session, under its own savepoint."""
+    db = get_request_session()
+    savepoints = db.info.setdefault('savepoints', [])
+    savepoints.append(db.begin_nested())
+    try:
+        yield db
+        db.flush()
+        if savepoints[-1].is_active:
+            savepoints[-1].commit()
+    except Exception as e:
+        if savepoints[-1].is_active:
+            savepoints[-1].rollback()
+        logger.error(f"Database transaction failed: {str(e)}")
+        raise
+    finally:
+        savepoints.pop()
+
+
+def finish_request_session(commit: bool) -> None:
+    """
+    Commit or roll back the current request's session and release it.
+    
+    Args:
+        commit (bool): Whether to commit (True) or roll back (False)
+    """
+    replica_db = g.pop('replica_session', None)
+    if replica_db is not None:
+        replica_db.close()
+    
+    db = g.pop('db_session', None)
+    if db is None:
+        return
+    
+    try:
+        if commit:
+            db.commit_request()
+            if db.info.get('has_writes'):
+                record_write(_current_user_key())
+        else:
+            db.rollback_request()
+    except Exception:
+        db.rollback_request()
+        raise
+    finally:
+        db.close()
+
+
+def init_request_session(app) -> None:
+    """
+    Attach the request-scoped unit of work to a Flask application.
+    
+    The session is committed once after the view returns (so a failed
+    commit can still turn into an error response) and rolled back in
+    teardown if the request ended without reaching that point.
+    
+    Args:
+        app (Flask): Flask application instance
+    """
+    @app.after_request
+    def _commit_request_session(response):
+        if 'db_session' not in g and 'replica_session' not in g:
+            return response
+        
+        try:
+            finish_request_session(commit=response.status_code < 500)
+        except Exception as e:
+            logger.error(f"Request transaction failed: {str(e)}")
+            from app.utils.helpers import create_internal_error_response
+            error_response, status_code = create_internal_error_response()
+            error_response.status_code = status_code
+            return error_response
+        return response
+    
+    @app.teardown_request
+    def _rollback_request_session(exc):
+        finish_request_session(commit=False)
+
+
+def _current_user_key() -> Optional[str]:
+    """
+    Identify the requesting user for read-your-writes routing.
+    
+    Only the identity verified by the auth middleware counts; a client-sent
+    X-User-ID header would let anyone pin reads to the primary or claim
+    another user's slot. Unauthenticated requests get the default policy.
+    """
+    if not has_request_context():
+        return None
+    return g.get('current_user_id')
+
+
+def record_write(user_key: Optional[str]) -> None:
+    """
+    Pin a user's reads to the primary for the read-your-writes window.
+    
+    Args:
+        user_key (str, optional): User identifier; ignored when None
+    """
+    if not user_key or not replica_engines:
+        return
+    
+    now = time.monotonic()
+    with _replica_lock:
+        _recent_writers[user_key] = now
+        if len(_recent_writers) > 10000:
+            cutoff = now - _read_your_writes_seconds
+            for key in [key for key, written in _recent_writers.items() if written < cutoff]:
+                del _recent_writers[key]
+
+
+def _should_read_from_replica() -> bool:
+    """Decide whether a read-only block may be served by a replica."""
+    if not replica_engines:
+        return False
+    if not has_request_context():
+        return True
+    
+    # The request has already written; later reads must see those writes
+    if 'db_session' in g and g.db_session.info.get('has_writes'):
+        return False
+    
+    # The user wrote recently; replicas may not have caught up yet
+    user_key = _current_user_key()
+    if user_key:
+        written = _recent_writers.get(user_key)
+        if written is not None and time.monotonic() - written < _read_your_writes_seconds:
+            return False
+    
+    return True
+
+
+def next_replica_engine():
+    """
+    Pick the next read replica, round-robin.
+    
+    Returns:
+        Engine: Replica engine, or the primary when no replicas are configured
+    """
+    if _replica_cycle is None:
+        return engine
+    with _replica_lock:
+        return next(_replica_cycle)
+
+
+@contextmanager
+def _replica_session() -> Generator[Session, None, None]:
+    """Open a read-only session on a replica, shared for the rest of the request."""
+    if has_request_context():
+        if 'replica_session' not in g:
+            g.replica_session = SessionLocal(bind=next_replica_engine())
+        try:
+            yield g.replica_session
+        except Exception:
+            g.replica_session.rollback()
+            raise
+        return
+    
+    db = SessionLocal(bind=next_replica_engine())
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
 @contextmanager
-def get_db() -> Generator[Session, None, None]:
+def get_db(read_only: bool = False) -> Generator[Session, None, None]:
     """
     Context manager for database sessions.
     
+    Inside a Flask request this joins the request's unit of work: every
+    block shares one session and identity map, and the transaction is
+    committed once when the request finishes. Outside a request it opens
+    and commits a standalone session.
+    
+    Blocks marked read_only are served by a read replica (round-robin)
+    when replicas are configured, unless the current request or user has
+    just written, in which case they stay on the primary.
+    
+    Args:
+        read_only (bool): Whether the block only reads
+    
     Yields:
         Session: SQLAlchemy database session
         
@@ -138,6 +673,16 @@ def get_db() -> Generator[Session, None, None]:
         with get_db() as db:
             user = db.query(User).filter(User.email == email).first()
     """
+    if read_only and _should_read_from_replica():
+        with _replica_session() as db:
+            yield db
+        return
+    
+    if has_request_context() and RequestSessionLocal is not None:
+        with _join_request_session() as db:
+            yield db
+        return
+    
     db = get_db_session()
     try:
         yield db
@@ -150,6 +695,81 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def run_after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """
+    Run a callback once the session's transaction has really committed.
+    
+    Inside a request, get_db() blocks only release savepoints; the callback
+    waits for the request's unit of work to commit. It is dropped if the
+    transaction rolls back instead. Use it for side effects such as cache
+    eviction that must not happen while other sessions can still read the
+    old rows.
+    
+    Args:
+        db (Session): Session whose transaction the callback waits for
+        callback (callable): Function called with no arguments
+    """
+    db.info.setdefault('after_commit_callbacks', []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session):
+    # after_commit also fires for savepoints; wait for the real commit
+    if session.in_nested_transaction():
+        return
+    for callback in session.info.pop('after_commit_callbacks', []):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"After-commit callback failed: {str(e)}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session):
+    if not session.in_nested_transaction():
+        session.info.pop('after_commit_callbacks', None)
+
+
+def insert_ignore(db: Session, table, **values) -> bool:
+    """
+    Insert a row unless one with the same key already exists.
+    
+    Uses the dialect's native conflict handling (ON CONFLICT DO NOTHING on
+    SQLite/PostgreSQL, INSERT IGNORE on MySQL), so membership rows in the
+    association tables are added with a single statement and no prior read.
+    
+    Args:
+        db (Session): Active database session
+        table: Table to insert into
+        **values: Column values for the new row
+        
+    Returns:
+        bool: True if a row was inserted, False if it already existed
+    """
+    dialect = db.get_bind().dialect.name
+    
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table).values(**values).on_conflict_do_nothing()
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        statement = insert(table).values(**values).on_conflict_do_nothing()
+    elif dialect in ('mysql', 'mariadb'):
+        from sqlalchemy import insert
+        statement = insert(table).values(**values).prefix_with('IGNORE')
+    else:
+        from sqlalchemy import insert
+        from sqlalchemy.exc import IntegrityError
+        try:
+            with db.begin_nested():
+                db.execute(insert(table).values(**values))
+            return True
+        except IntegrityError:
+            return False
+    
+    return db.execute(statement).rowcount > 0
+
+
 def check_database_connection() -> bool:
     """
     Check if the database connection is working.
@@ -184,15 +804,86 @@ def get_database_info() -> dict:
     if engine is None:
         return {"status": "not_initialized"}
     
+    pool_stats = get_pool_stats()
+    replicas = [
+        {
+            "url": str(replica.url).replace(replica.url.password or "", "***") if replica.url.password else str(replica.url),
+            "pool": get_pool_stats(replica)
+        }
+        for replica in replica_engines
+    ]
     return {
         "status": "initialized",
         "url": str(engine.url).replace(engine.url.password or "", "***") if engine.url.password else str(engine.url),
         "driver": engine.dialect.name,
-        "pool_size": engine.pool.size() if hasattr(engine.pool, 'size') else "unknown",
+        "pool_size": pool_stats.get("size", "unknown"),
+        "pool": pool_stats,
+        "replicas": replicas,
         "connection_active": check_database_connection()
     }
 
 
+def get_table_sizes() -> Dict[str, int]:
+    """
+    Count the rows in every model table.
+    
+    Returns:
+        dict: Row count per table name
+    """
+    global engine
+    
+    if engine is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    
+    from sqlalchemy import func, inspect, select
+    
+    existing = set(inspect(engine).get_table_names())
+    with engine.connect() as connection:
+        return {
+            table.name: connection.execute(select(func.count()).select_from(table)).scalar()
+            for table in Base.metadata.sorted_tables
+            if table.name in existing
+        }
+
+
+def get_pool_stats(target_engine=None) -> dict:
+    """
+    Get live connection pool statistics.
+    
+    Args:
+        target_engine (Engine, optional): Engine to inspect; defaults to the primary
+    
+    Returns:
+        dict: Pool class, size and current checked-in/out/overflow counts,
+            plus the active SQLite pragmas when applicable
+    """
+    target_engine = target_engine or engine
+    
+    if target_engine is None:
+        return {}
+    
+    pool = target_engine.pool
+    stats = {"class": type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        value = getattr(pool, name, None)
+        if value is not None:
+            stats[name] = value() if callable(value) else value
+    stats["status"] = pool.status()
+    
+    if target_engine.dialect.name == 'sqlite':
+        try:
+            from sqlalchemy import text
+            with target_engine.connect() as connection:
+                stats["sqlite"] = {
+                    pragma: connection.execute(text(f"PRAGMA {pragma}")).scalar()
+                    for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size')
+                }
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to read SQLite pragmas: {str(e)}")
+    
+    return stats
+
+
 # Database dependency for FastAPI-style dependency injection (if needed)
 def get_db_dependency() -> Generator[Session, None, None]:
     """
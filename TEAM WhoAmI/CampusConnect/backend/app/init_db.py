@@ -12,7 +12,7 @@ from datetime import datetime, timedelta
 # Add the parent directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import init_database, create_tables, get_db
+from app.database import init_database, create_tables, get_db, repair_counters
 from app.models.auth_models import User, Event, Group, Post, Comment
 from app.config import Config
 
@@ -355,6 +355,9 @@ def create_sample_relationships(users, events, groups, posts):
         
         db.commit()
     
+    # Relationships were added directly, so bring the counters in line
+    repair_counters()
+    
     print("Created sample relationships between users and content")
 
 def main():
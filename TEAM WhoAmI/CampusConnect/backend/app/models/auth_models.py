@@ -5,7 +5,7 @@ This module defines SQLAlchemy models for user authentication, profiles,
 and related functionality.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -181,6 +181,10 @@ class OTPCode(Base):
     # Relationships
     user = relationship("User", back_populates="otp_codes")
     
+    __table_args__ = (
+        Index('ix_otp_codes_lookup', 'user_id', 'purpose', 'is_used', 'expires_at'),
+    )
+    
     def is_expired(self) -> bool:
         """Check if OTP is expired."""
         return datetime.utcnow() > self.expires_at
@@ -199,10 +203,71 @@ class OTPCode(Base):
         self.used_at = datetime.utcnow()
 
 
+class RevokedToken(Base):
+    """Access token revocation, shared by every worker process."""
+    
+    __tablename__ = 'revoked_tokens'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(10), nullable=False)  # 'jti', 'sid' or 'sub'
+    value = Column(String(64), nullable=False)
+    revoked_at = Column(Float, nullable=False, index=True)  # Unix time, compared with the token's iat
+    expires_at = Column(DateTime, nullable=False, index=True)  # No token issued before this is still valid
+
+
+class OutboundEmail(Base):
+    """Queued outbound email, delivered by the background email worker."""
+    
+    __tablename__ = 'outbound_emails'
+    
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    
+    # Message
+    to_email = Column(String(255), nullable=False)
+    from_email = Column(String(255), nullable=True)
+    reply_to = Column(String(255), nullable=True)
+    subject = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=True)
+    text_content = Column(Text, nullable=True)
+    
+    # Delivery status
+    status = Column(String(20), nullable=False, default='pending')  # pending, sending, sent, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    next_attempt_at = Column(DateTime, default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('ix_outbound_emails_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    def to_dict(self) -> dict:
+        """Convert queued email to a delivery status dictionary."""
+        return {
+            'id': self.id,
+            'to_email': self.to_email,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
+
+
 class Event(Base):
     """Event model for campus events."""
     
     __tablename__ = 'events'
+    __table_args__ = (
+        Index('ix_events_active_category', 'is_active', 'category'),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(200), nullable=False)
@@ -217,6 +282,7 @@ class Event(Base):
     
     # Capacity
     max_attendees = Column(Integer, nullable=False)
+    attendee_count = Column(Integer, default=0, server_default='0', nullable=False)  # Denormalized from user_events
     
     # Media
     image_url = Column(String(500), nullable=True)
@@ -225,18 +291,13 @@ class Event(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Python-side so feed cursors compare in the stored format
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     attendees = relationship("User", secondary=user_events, back_populates="joined_events")
     saved_by_users = relationship("User", secondary=user_saved_events, back_populates="saved_events")
     
-    @property
-    def attendee_count(self) -> int:
-        """Get current attendee count."""
-        return len(self.attendees)
-    
     @property
     def available_spots(self) -> int:
         """Get available spots."""
@@ -280,6 +341,9 @@ class Group(Base):
     # Media
     image_url = Column(String(500), nullable=True)
     
+    # Membership
+    member_count = Column(Integer, default=0, server_default='0', nullable=False)  # Denormalized from user_groups
+    
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
     
@@ -290,11 +354,6 @@ class Group(Base):
     # Relationships
     members = relationship("User", secondary=user_groups, back_populates="joined_groups")
     
-    @property
-    def member_count(self) -> int:
-        """Get current member count."""
-        return len(self.members)
-    
     def to_dict(self) -> dict:
         """Convert group to dictionary for API responses."""
         return {
@@ -316,6 +375,10 @@ class Post(Base):
     """Post model for campus feed."""
     
     __tablename__ = 'posts'
+    __table_args__ = (
+        Index('ix_posts_active_created', 'is_active', 'created_at'),
+        Index('ix_posts_category_created', 'category', 'created_at'),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(200), nullable=False)
@@ -325,11 +388,15 @@ class Post(Base):
     # Author
     author_id = Column(String(36), ForeignKey('users.id'), nullable=False)
     
+    # Engagement counters, denormalized from post_likes and comments
+    like_count = Column(Integer, default=0, server_default='0', nullable=False)
+    comment_count = Column(Integer, default=0, server_default='0', nullable=False)
+    
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Python-side so feed cursors compare in the stored format
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
@@ -337,16 +404,6 @@ class Post(Base):
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
     liked_by_users = relationship("User", secondary=post_likes, back_populates="liked_posts")
     
-    @property
-    def like_count(self) -> int:
-        """Get current like count."""
-        return len(self.liked_by_users)
-    
-    @property
-    def comment_count(self) -> int:
-        """Get current comment count."""
-        return len(self.comments)
-    
     def to_dict(self) -> dict:
         """Convert post to dictionary for API responses."""
         return {
@@ -151,6 +151,15 @@ class CreateGroupRequest(BaseModel):
         populate_by_name = True
 
 
+class ViewerStateRequest(BaseModel):
+    """Request schema for batched liked/joined/saved lookups."""
+    post_ids: List[str] = Field(default_factory=list, max_items=100, alias="postIds")
+    event_ids: List[str] = Field(default_factory=list, max_items=100, alias="eventIds")
+
+    class Config:
+        populate_by_name = True
+
+
 class ApiResponse(BaseModel):
     """Standard API response schema."""
     success: bool
@@ -5,18 +5,22 @@ This module defines the Flask blueprint for authentication-related endpoints,
 including OTP sending, verification, login, and logout functionality.
 """
 
-from flask import Blueprint, request
+from flask import Blueprint, g, request
 from pydantic import BaseModel, EmailStr, Field, ValidationError
 from typing import Optional
 from app.services.auth_service import AuthService
 from app.services.email_service import EmailService
 from app.utils.helpers import (
     create_success_response,
+    create_error_response,
     create_validation_error_response,
     create_bad_request_response,
     create_internal_error_response,
+    create_rate_limited_response,
     handle_request_validation
 )
+from app.utils.auth import get_bearer_token
+from app.utils.tokens import looks_like_access_token
 
 # Create auth blueprint
 auth_bp = Blueprint('auth', __name__)
@@ -155,6 +159,9 @@ def send_otp():
         else:
             return create_bad_request_response("Invalid purpose. Must be 'authentication' or 'password_reset'")
         
+        if result.get('retry_after'):
+            return create_rate_limited_response(result['message'], result['retry_after'])
+        
         if result['success']:
             return create_success_response(result['message'], {
                 'expiry_minutes': result.get('expiry_minutes')
@@ -247,7 +254,9 @@ def login():
                 'last_name': result['user_data']['last_name'],
                 'full_name': result['user_data']['full_name'],
                 'profile_picture': result['user_data']['profile_picture'],
-                'session_token': result['session_token']
+                'session_token': result['session_token'],
+                'access_token': result['access_token'],
+                'expires_in': result['expires_in']
             }
             return create_success_response(result['message'], response_data)
         else:
@@ -285,6 +294,9 @@ def login_with_password():
             password=login_request.password
         )
         
+        if result.get('retry_after'):
+            return create_rate_limited_response(result['message'], result['retry_after'])
+        
         if result['success']:
             response_data = {
                 'user_id': result['user_data']['user_id'],
@@ -293,7 +305,9 @@ def login_with_password():
                 'last_name': result['user_data']['last_name'],
                 'full_name': result['user_data']['full_name'],
                 'profile_picture': result['user_data']['profile_picture'],
-                'session_token': result['session_token']
+                'session_token': result['session_token'],
+                'access_token': result['access_token'],
+                'expires_in': result['expires_in']
             }
             return create_success_response(result['message'], response_data)
         else:
@@ -339,6 +353,85 @@ def logout():
         return create_internal_error_response(str(e))
 
 
+@auth_bp.route('/auth/refresh', methods=['POST'])
+def refresh_access_token():
+    """
+    Exchange a session token for a new short-lived access token.
+    
+    Returns:
+        JSON response with the new access token
+    """
+    try:
+        # Session token from Authorization header or request body
+        session_token = get_bearer_token()
+        if session_token and looks_like_access_token(session_token):
+            session_token = None
+        
+        if not session_token and request.is_json:
+            request_data = request.get_json()
+            session_token = request_data.get('session_token') or request_data.get('sessionToken')
+        
+        if not session_token:
+            return create_bad_request_response("Session token is required in Authorization header or request body")
+        
+        result = AuthService.refresh_access_token(session_token)
+        
+        if result['success']:
+            return create_success_response(result['message'], {
+                'user_id': result['user_id'],
+                'access_token': result['access_token'],
+                'expires_in': result['expires_in']
+            })
+        else:
+            return create_error_response(
+                message=result['message'],
+                error_code="UNAUTHORIZED",
+                status_code=401
+            )
+        
+    except Exception as e:
+        return create_internal_error_response(str(e))
+
+
+@auth_bp.route('/auth/logout-all', methods=['POST'])
+def logout_all():
+    """
+    Emergency logout: end every session of the current user and revoke
+    their access tokens.
+    
+    Returns:
+        JSON response with logout result
+    """
+    try:
+        user_id = g.get('current_user_id')
+        if not user_id:
+            # Fall back to a session token for clients without an access token
+            session_token = get_bearer_token()
+            if session_token and not looks_like_access_token(session_token):
+                session_result = AuthService.verify_session(session_token)
+                if session_result['valid']:
+                    user_id = session_result['user_id']
+        
+        if not user_id:
+            return create_error_response(
+                message="A valid access token or session token is required",
+                error_code="UNAUTHORIZED",
+                status_code=401
+            )
+        
+        result = AuthService.logout_all_sessions(user_id)
+        
+        if result['success']:
+            return create_success_response(result['message'], {
+                'sessions_ended': result['sessions_ended']
+            })
+        else:
+            return create_bad_request_response(result['message'])
+        
+    except Exception as e:
+        return create_internal_error_response(str(e))
+
+
 @auth_bp.route('/auth/verify-session', methods=['POST'])
 def verify_session():
     """
@@ -364,8 +457,11 @@ def verify_session():
         if not session_token:
             return create_bad_request_response("Session token is required in Authorization header or request body")
         
-        # Verify session
-        result = AuthService.verify_session(session_token)
+        # Verify session (access tokens are checked without a database lookup)
+        if looks_like_access_token(session_token):
+            result = AuthService.verify_access_token(session_token)
+        else:
+            result = AuthService.verify_session(session_token)
         
         if result['valid']:
             response_data = {
@@ -625,7 +721,9 @@ def verify_signup():
                 'last_name': result['user_data']['last_name'],
                 'full_name': result['user_data']['full_name'],
                 'profile_picture': result['user_data']['profile_picture'],
-                'session_token': result['session_token']
+                'session_token': result['session_token'],
+                'access_token': result['access_token'],
+                'expires_in': result['expires_in']
             }
             return create_success_response(result['message'], response_data)
         else:
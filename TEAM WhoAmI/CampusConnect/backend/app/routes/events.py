@@ -5,9 +5,10 @@ This module defines the Flask blueprint for event-related API endpoints
 including retrieving events, getting individual events, and joining events.
 """
 
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 from pydantic import ValidationError
 from app.services.event_service import EventService
+from app.utils.pagination import InvalidCursorError, clamp_page_size
 from app.models.data_models import JoinEventRequest
 from app.utils.helpers import (
     create_success_response,
@@ -16,9 +17,11 @@ from app.utils.helpers import (
     create_internal_error_response,
     create_bad_request_response,
     handle_request_validation,
+    get_bool_arg,
     format_list_response,
     format_single_item_response
 )
+from app.utils.auth import get_current_user_id
 
 # Create the events blueprint
 events_bp = Blueprint('events', __name__)
@@ -27,14 +30,47 @@ events_bp = Blueprint('events', __name__)
 @events_bp.route('/events', methods=['GET'])
 def get_all_events():
     """
-    Get all available events.
+    Get a page of available events, newest first.
+    
+    Query parameters:
+        category: Only include events in this category
+        cursor: Cursor returned as pagination.next_cursor by the previous page
+        limit: Page size, capped at FEED_MAX_PAGE_SIZE
     
     Returns:
-        JSON response with list of all events
+        JSON response with list of events
     """
     try:
-        events = EventService.get_all_events()
-        return format_list_response(events, resource_name="events")
+        limit = clamp_page_size(
+            request.args.get('limit', type=int),
+            current_app.config['FEED_PAGE_SIZE'],
+            current_app.config['FEED_MAX_PAGE_SIZE']
+        )
+        
+        try:
+            page = EventService.get_events_page(
+                category=request.args.get('category'),
+                cursor=request.args.get('cursor'),
+                limit=limit
+            )
+        except InvalidCursorError as e:
+            return create_bad_request_response(str(e))
+        events = page['events']
+        
+        # Anonymous viewers have no viewer state; the flag is ignored for them
+        user_id = get_current_user_id()
+        if user_id and get_bool_arg(request, 'include_viewer_state'):
+            EventService.attach_viewer_state(events, user_id)
+        
+        return format_list_response(
+            events,
+            resource_name="events",
+            pagination={
+                "next_cursor": page['next_cursor'],
+                "has_more": page['has_more'],
+                "limit": limit
+            }
+        )
         
     except Exception as e:
         return create_internal_error_response(str(e))
@@ -73,7 +109,7 @@ def create_event():
     """
     try:
         # TODO: Add authentication check to get user_id
-        user_id = request.headers.get('X-User-ID', 'user-1')  # Temporary
+        user_id = get_current_user_id(default='user-1')  # Temporary
         
         # Handle both JSON and FormData
         if request.is_json:
@@ -267,6 +303,11 @@ def get_events_by_category(category):
         
         events = EventService.get_events_by_category(category)
         
+        # Anonymous viewers have no viewer state; the flag is ignored for them
+        user_id = get_current_user_id()
+        if user_id and get_bool_arg(request, 'include_viewer_state'):
+            EventService.attach_viewer_state(events, user_id)
+        
         return format_list_response(
             events,
             message=f"Events in category '{category}' retrieved successfully",
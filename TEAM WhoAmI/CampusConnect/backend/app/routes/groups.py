@@ -19,6 +19,7 @@ from app.utils.helpers import (
     format_list_response,
     format_single_item_response
 )
+from app.utils.auth import get_current_user_id
 
 # Create groups blueprint
 groups_bp = Blueprint('groups', __name__)
@@ -82,7 +83,7 @@ def create_group():
     """
     try:
         # TODO: Add authentication check to get user_id
-        user_id = request.headers.get('X-User-ID', 'user-1')  # Temporary
+        user_id = get_current_user_id(default='user-1')  # Temporary
         
         # Handle both JSON and FormData
         if request.is_json:
@@ -5,9 +5,10 @@ This module defines the Flask blueprint for post-related endpoints,
 including retrieving posts, creating posts, and liking posts.
 """
 
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 from pydantic import ValidationError
 from app.services.post_service import PostService
+from app.utils.pagination import InvalidCursorError, clamp_page_size
 from app.models.data_models import LikePostRequest, CreatePostRequest
 from app.utils.helpers import (
     create_success_response,
@@ -16,9 +17,11 @@ from app.utils.helpers import (
     create_internal_error_response,
     create_bad_request_response,
     handle_request_validation,
+    get_bool_arg,
     format_list_response,
     format_single_item_response
 )
+from app.utils.auth import get_current_user_id
 
 # Create posts blueprint
 posts_bp = Blueprint('posts', __name__)
@@ -27,7 +30,13 @@ posts_bp = Blueprint('posts', __name__)
 @posts_bp.route('/posts', methods=['GET'])
 def get_posts():
     """
-    Get all posts.
+    Get a page of posts, newest first.
+    
+    Query parameters:
+        category: Only include posts in this category
+        author: Only include posts by this author ID
+        cursor: Cursor returned as pagination.next_cursor by the previous page
+        limit: Page size, capped at FEED_MAX_PAGE_SIZE
     
     Returns:
         JSON response with list of posts or error message
@@ -36,18 +45,47 @@ def get_posts():
         # Get query parameters for filtering
         category = request.args.get('category')
         author = request.args.get('author')
+        limit = clamp_page_size(
+            request.args.get('limit', type=int),
+            current_app.config['FEED_PAGE_SIZE'],
+            current_app.config['FEED_MAX_PAGE_SIZE']
+        )
         
-        if category:
-            posts = PostService.get_posts_by_category(category)
+        try:
+            page = PostService.get_posts_page(
+                category=category,
+                author_id=author,
+                cursor=request.args.get('cursor'),
+                limit=limit
+            )
+        except InvalidCursorError as e:
+            return create_bad_request_response(str(e))
+        posts = page['posts']
+        
+        if category and author:
+            message = f"Posts by author '{author}' in category '{category}' retrieved successfully"
+        elif category:
             message = f"Posts for category '{category}' retrieved successfully"
         elif author:
-            posts = PostService.get_posts_by_author(author)
             message = f"Posts by author '{author}' retrieved successfully"
         else:
-            posts = PostService.get_all_posts()
             message = "Posts retrieved successfully"
         
-        return format_list_response(posts, message=message, resource_name="posts")
+        # Anonymous viewers have no viewer state; the flag is ignored for them
+        user_id = get_current_user_id()
+        if user_id and get_bool_arg(request, 'include_viewer_state'):
+            PostService.attach_viewer_state(posts, user_id)
+        
+        return format_list_response(
+            posts,
+            message=message,
+            resource_name="posts",
+            pagination={
+                "next_cursor": page['next_cursor'],
+                "has_more": page['has_more'],
+                "limit": limit
+            }
+        )
         
     except Exception as e:
         return create_internal_error_response(str(e))
@@ -68,7 +106,7 @@ def create_post():
 
         # TODO: Add authentication check to get user_id
         # For now, we'll use a placeholder
-        user_id = request.headers.get('X-User-ID', 'user-1')  # Temporary
+        user_id = get_current_user_id(default='user-1')  # Temporary
 
         # Handle both JSON and FormData
         if request.is_json:
@@ -160,7 +198,7 @@ def update_post(post_id):
     """
     try:
         # TODO: Add authentication check to get user_id
-        user_id = request.headers.get('X-User-ID', 'user-1')  # Temporary
+        user_id = get_current_user_id(default='user-1')  # Temporary
         
         # Validate request format
         validation_error = handle_request_validation(request, required_json=True)
@@ -200,7 +238,7 @@ def delete_post(post_id):
     """
     try:
         # TODO: Add authentication check to get user_id
-        user_id = request.headers.get('X-User-ID', 'user-1')  # Temporary
+        user_id = get_current_user_id(default='user-1')  # Temporary
         
         # Process delete request
         result = PostService.delete_post(post_id, user_id)
@@ -227,7 +265,7 @@ def like_post(post_id):
     """
     try:
         # TODO: Add authentication check to get user_id
-        user_id = request.headers.get('X-User-ID', 'user-1')  # Temporary
+        user_id = get_current_user_id(default='user-1')  # Temporary
         
         # Process like request
         result = PostService.like_post(post_id, user_id)
@@ -254,7 +292,7 @@ def unlike_post(post_id):
     """
     try:
         # TODO: Add authentication check to get user_id
-        user_id = request.headers.get('X-User-ID', 'user-1')  # Temporary
+        user_id = get_current_user_id(default='user-1')  # Temporary
         
         # Process unlike request
         result = PostService.unlike_post(post_id, user_id)
@@ -300,7 +338,7 @@ def add_post_comment(post_id):
     """
     try:
         # TODO: Add authentication check to get user_id
-        user_id = request.headers.get('X-User-ID', 'user-1')  # Temporary
+        user_id = get_current_user_id(default='user-1')  # Temporary
         
         # Validate request format
         validation_error = handle_request_validation(request, required_json=True)
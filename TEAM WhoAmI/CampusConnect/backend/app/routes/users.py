@@ -7,6 +7,7 @@ including retrieving user profiles, following users, and user posts.
 
 from flask import Blueprint, request
 from pydantic import ValidationError
+from app.models.data_models import ViewerStateRequest
 from app.utils.helpers import (
     create_success_response,
     create_validation_error_response,
@@ -14,9 +15,11 @@ from app.utils.helpers import (
     create_internal_error_response,
     create_bad_request_response,
     handle_request_validation,
+    get_bool_arg,
     format_list_response,
     format_single_item_response
 )
+from app.utils.auth import get_current_user_id
 
 # Create users blueprint
 users_bp = Blueprint('users', __name__)
@@ -75,12 +78,59 @@ def get_user_posts(user_id):
     try:
         from app.services.post_service import PostService
         posts = PostService.get_posts_by_author(user_id)
+        
+        # Anonymous viewers have no viewer state; the flag is ignored for them
+        viewer_id = get_current_user_id()
+        if viewer_id and get_bool_arg(request, 'include_viewer_state'):
+            PostService.attach_viewer_state(posts, viewer_id)
+        
         return format_list_response(posts, resource_name="posts")
         
     except Exception as e:
         return create_internal_error_response(str(e))
 
 
+@users_bp.route('/users/<user_id>/viewer-state', methods=['POST'])
+def get_viewer_state(user_id):
+    """
+    Get a user's liked/joined/saved state for a batch of posts and events.
+    
+    Replaces one status request per feed card with a single call that runs
+    one query per association table.
+    
+    Args:
+        user_id (str): The unique identifier of the viewing user
+        
+    Returns:
+        JSON response mapping post and event IDs to their state flags
+    """
+    try:
+        from app.services.post_service import PostService
+        from app.services.event_service import EventService
+        
+        # Validate request format
+        validation_error = handle_request_validation(request, required_json=True)
+        if validation_error:
+            return validation_error
+        
+        # Validate request data using Pydantic model
+        try:
+            state_request = ViewerStateRequest(**request.get_json())
+        except ValidationError as ve:
+            return create_validation_error_response(ve.errors())
+        
+        return create_success_response(
+            "Viewer state retrieved successfully",
+            {
+                "posts": PostService.get_viewer_state(state_request.post_ids, user_id),
+                "events": EventService.get_viewer_state(state_request.event_ids, user_id)
+            }
+        )
+        
+    except Exception as e:
+        return create_internal_error_response(str(e))
+
+
 @users_bp.route('/users/<user_id>/events', methods=['GET'])
 def get_user_events(user_id):
     """
@@ -9,11 +9,17 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Tuple
 from werkzeug.utils import secure_filename
 from PIL import Image
+from sqlalchemy.orm import joinedload
+from flask import current_app, has_app_context
 import logging
 
-from app.database import get_db
+from app.config import Config
+from app.database import get_db, run_after_commit
 from app.models.auth_models import User, UserSession, OTPCode
 from app.services.email_service import EmailService
+from app.services.rate_limiter import rate_limited
+from app.services.session_cache import session_cache
+from app.utils.tokens import InvalidTokenError, decode_access_token, encode_access_token, revoked_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +55,57 @@ class AuthService:
         """Generate a secure session token."""
         return secrets.token_urlsafe(32)
     
+    @classmethod
+    def _access_token_config(cls) -> Tuple[str, int]:
+        """Return (signing key, lifetime in seconds) for access tokens."""
+        settings = current_app.config if has_app_context() else vars(Config)
+        return settings['JWT_SECRET_KEY'], settings['JWT_ACCESS_TOKEN_EXPIRES']
+    
+    @classmethod
+    def issue_access_token(cls, user_id: str, session_id: str, email: str = None) -> Tuple[str, int]:
+        """
+        Issue a short-lived signed access token for a session.
+        
+        Args:
+            user_id: User ID
+            session_id: ID of the UserSession backing the token
+            email: User email, embedded as a convenience claim
+            
+        Returns:
+            Tuple of (access token, lifetime in seconds)
+        """
+        secret, expires_in = cls._access_token_config()
+        token = encode_access_token(user_id, session_id, secret, expires_in, {'email': email})
+        return token, expires_in
+    
+    @classmethod
+    def verify_access_token(cls, access_token: str) -> Dict[str, Any]:
+        """
+        Verify an access token without touching the database.
+        
+        Args:
+            access_token: Access token to verify
+            
+        Returns:
+            Dictionary with verification result and token claims
+        """
+        secret, _ = cls._access_token_config()
+        try:
+            claims = decode_access_token(access_token, secret)
+        except InvalidTokenError as e:
+            return {
+                'valid': False,
+                'message': str(e)
+            }
+        
+        return {
+            'valid': True,
+            'message': 'Access token is valid',
+            'user_id': claims['sub'],
+            'email': claims.get('email'),
+            'claims': claims
+        }
+    
     @classmethod
     def _allowed_file(cls, filename: str) -> bool:
         """Check if file extension is allowed."""
@@ -133,7 +190,8 @@ class AuthService:
                                 to_email=existing_user.email,
                                 recipient_name=existing_user.full_name,
                                 otp=otp_code,
-                                purpose='signup'
+                                purpose='signup',
+                                db=db
                             )
                         except Exception as e:
                             logger.error(f"Failed to send OTP email: {str(e)}")
@@ -200,7 +258,8 @@ class AuthService:
                         to_email=user.email,
                         recipient_name=user.full_name,
                         otp=otp_code,
-                        purpose='signup'
+                        purpose='signup',
+                        db=db
                     )
                 except Exception as e:
                     logger.error(f"Failed to send OTP email: {str(e)}")
@@ -234,6 +293,7 @@ class AuthService:
             }
     
     @classmethod
+    @rate_limited('otp_send')
     def send_authentication_otp(cls, email: str, user_name: str = None) -> Dict[str, Any]:
         """
         Send OTP for user authentication/login.
@@ -271,7 +331,8 @@ class AuthService:
                         to_email=user.email,
                         recipient_name=user_name or user.full_name,
                         otp=otp_code,
-                        purpose='authentication'
+                        purpose='authentication',
+                        db=db
                     )
                 except Exception as e:
                     logger.error(f"Failed to send authentication OTP email: {str(e)}")
@@ -292,6 +353,7 @@ class AuthService:
             }
     
     @classmethod
+    @rate_limited('otp_send')
     def send_password_reset_otp(cls, email: str, user_name: str = None) -> Dict[str, Any]:
         """
         Send OTP for password reset.
@@ -329,7 +391,8 @@ class AuthService:
                         to_email=user.email,
                         recipient_name=user_name or user.full_name,
                         otp=otp_code,
-                        purpose='password_reset'
+                        purpose='password_reset',
+                        db=db
                     )
                 except Exception as e:
                     logger.error(f"Failed to send password reset OTP email: {str(e)}")
@@ -350,6 +413,7 @@ class AuthService:
             }
 
     @classmethod
+    @rate_limited('password_login')
     def authenticate_with_password(cls, email: str, password: str) -> Dict[str, Any]:
         """
         Authenticate user with email and password.
@@ -396,6 +460,8 @@ class AuthService:
                     expires_at=datetime.utcnow() + timedelta(days=30)
                 )
                 db.add(session)
+                db.flush()
+                access_token, expires_in = cls.issue_access_token(user.id, session.id, user.email)
                 
                 db.commit()
                 
@@ -404,7 +470,9 @@ class AuthService:
                     'success': True,
                     'message': 'Login successful',
                     'user_data': user.to_dict(),
-                    'session_token': session_token
+                    'session_token': session_token,
+                    'access_token': access_token,
+                    'expires_in': expires_in
                 }
                 
         except Exception as e:
@@ -469,6 +537,8 @@ class AuthService:
                     expires_at=datetime.utcnow() + timedelta(days=30)
                 )
                 db.add(session)
+                db.flush()
+                access_token, expires_in = cls.issue_access_token(user.id, session.id, user.email)
                 
                 db.commit()
                 
@@ -477,7 +547,9 @@ class AuthService:
                     'success': True,
                     'message': 'Login successful',
                     'user_data': user.to_dict(),
-                    'session_token': session_token
+                    'session_token': session_token,
+                    'access_token': access_token,
+                    'expires_in': expires_in
                 }
                 
         except Exception as e:
@@ -543,6 +615,8 @@ class AuthService:
                     expires_at=datetime.utcnow() + timedelta(days=30)
                 )
                 db.add(session)
+                db.flush()
+                access_token, expires_in = cls.issue_access_token(user.id, session.id, user.email)
                 
                 db.commit()
                 
@@ -551,7 +625,9 @@ class AuthService:
                     'success': True,
                     'message': 'Account verified successfully',
                     'user_data': user.to_dict(),
-                    'session_token': session_token
+                    'session_token': session_token,
+                    'access_token': access_token,
+                    'expires_in': expires_in
                 }
                 
         except Exception as e:
@@ -622,6 +698,8 @@ class AuthService:
                     expires_at=datetime.utcnow() + timedelta(days=30)
                 )
                 db.add(session)
+                db.flush()
+                access_token, expires_in = cls.issue_access_token(user.id, session.id, user.email)
                 
                 db.commit()
                 
@@ -630,7 +708,9 @@ class AuthService:
                     'success': True,
                     'message': 'Authentication successful',
                     'user_data': user.to_dict(),
-                    'session_token': session_token
+                    'session_token': session_token,
+                    'access_token': access_token,
+                    'expires_in': expires_in
                 }
                 
         except Exception as e:
@@ -645,16 +725,28 @@ class AuthService:
         """
         Verify session token and return user data.
         
+        Recently verified sessions are served from the in-process session
+        cache; last_used is written back at most once per flush interval.
+        
         Args:
             session_token: Session token to verify
             
         Returns:
             Dictionary with verification result and user data
         """
+        cached = session_cache.get(session_token)
+        if cached:
+            if session_cache.claim_last_used_flush(session_token):
+                cls._flush_session_last_used(cached['session_id'])
+            return cls._session_result(cached['user_data'], cached['session_id'])
+        
         try:
+            read_at = session_cache.clock()
             with get_db() as db:
                 # Find session
-                session = db.query(UserSession).filter(
+                session = db.query(UserSession).options(
+                    joinedload(UserSession.user)
+                ).filter(
                     UserSession.session_token == session_token,
                     UserSession.is_active == True
                 ).first()
@@ -673,17 +765,26 @@ class AuthService:
                         'message': 'Session expired'
                     }
                 
+                if not session.user.is_active:
+                    return {
+                        'valid': False,
+                        'message': 'Account is deactivated'
+                    }
+                
                 # Update last used
                 session.last_used = datetime.utcnow()
                 db.commit()
                 
                 user_data = session.user.to_dict()
-                return {
-                    'valid': True,
-                    'user_data': user_data,
-                    'user_id': user_data['user_id'],
-                    'email': user_data['email']
-                }
+                session_cache.put(
+                    session_token,
+                    session_id=session.id,
+                    user_id=session.user_id,
+                    user_data=user_data,
+                    expires_at=session.expires_at,
+                    read_at=read_at
+                )
+                return cls._session_result(user_data, session.id)
                 
         except Exception as e:
             logger.error(f"Error verifying session: {str(e)}")
@@ -692,6 +793,226 @@ class AuthService:
                 'message': 'Session verification failed'
             }
     
+    @classmethod
+    def _session_result(cls, user_data: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+        """Build the verify_session result for a valid session."""
+        return {
+            'valid': True,
+            'message': 'Session is valid',
+            'session_id': session_id,
+            'user_data': dict(user_data),
+            'user_id': user_data['user_id'],
+            'email': user_data['email']
+        }
+    
+    @classmethod
+    def _flush_session_last_used(cls, session_id: str) -> None:
+        """Write a coalesced last_used timestamp for a cached session."""
+        try:
+            with get_db() as db:
+                db.query(UserSession).filter(UserSession.id == session_id).update(
+                    {UserSession.last_used: datetime.utcnow()},
+                    synchronize_session=False
+                )
+        except Exception as e:
+            logger.warning(f"Failed to update session last_used: {str(e)}")
+    
+    @classmethod
+    def logout_user(cls, session_token: str) -> Dict[str, Any]:
+        """
+        Invalidate a session token.
+        
+        Args:
+            session_token: Session token to invalidate
+            
+        Returns:
+            Dictionary with logout result
+        """
+        try:
+            with get_db() as db:
+                session_id = db.query(UserSession.id).filter(
+                    UserSession.session_token == session_token,
+                    UserSession.is_active == True
+                ).scalar()
+                if session_id:
+                    db.query(UserSession).filter(UserSession.id == session_id).update(
+                        {UserSession.is_active: False},
+                        synchronize_session=False
+                    )
+                    # Access tokens issued from this session stop working immediately
+                    revoked_tokens.revoke_session(session_id, db=db)
+                    run_after_commit(db, lambda: session_cache.evict(session_token))
+            
+            if not session_id:
+                return {
+                    'success': False,
+                    'message': 'Invalid session token'
+                }
+            
+            return {
+                'success': True,
+                'message': 'Logged out successfully'
+            }
+            
+        except Exception as e:
+            logger.error(f"Error logging out: {str(e)}")
+            return {
+                'success': False,
+                'message': 'Logout failed'
+            }
+    
+    @classmethod
+    def logout_all_sessions(cls, user_id: str) -> Dict[str, Any]:
+        """
+        Emergency logout: end every session of a user and revoke their access tokens.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dictionary with logout result
+        """
+        try:
+            with get_db() as db:
+                ended = db.query(UserSession).filter(
+                    UserSession.user_id == user_id,
+                    UserSession.is_active == True
+                ).update({UserSession.is_active: False}, synchronize_session=False)
+                revoked_tokens.revoke_user(user_id, db=db)
+                run_after_commit(db, lambda: session_cache.evict_user(user_id))
+            
+            logger.info(f"Ended {ended} sessions for user: {user_id}")
+            return {
+                'success': True,
+                'message': 'Logged out of all sessions',
+                'sessions_ended': ended
+            }
+            
+        except Exception as e:
+            logger.error(f"Error logging out all sessions: {str(e)}")
+            return {
+                'success': False,
+                'message': 'Logout failed'
+            }
+    
+    @classmethod
+    def refresh_access_token(cls, session_token: str) -> Dict[str, Any]:
+        """
+        Exchange a valid session token for a fresh access token.
+        
+        Args:
+            session_token: Long-lived session token
+            
+        Returns:
+            Dictionary with the new access token
+        """
+        result = cls.verify_session(session_token)
+        if not result['valid']:
+            return {
+                'success': False,
+                'message': result['message']
+            }
+        
+        access_token, expires_in = cls.issue_access_token(
+            result['user_id'], result['session_id'], result['email']
+        )
+        return {
+            'success': True,
+            'message': 'Access token refreshed',
+            'user_id': result['user_id'],
+            'access_token': access_token,
+            'expires_in': expires_in
+        }
+    
+    @classmethod
+    def extend_session(cls, session_token: str, hours: int = 24) -> Dict[str, Any]:
+        """
+        Extend the expiry of an active session.
+        
+        Args:
+            session_token: Session token to extend
+            hours: Hours from now until the session expires
+            
+        Returns:
+            Dictionary with extension result
+        """
+        try:
+            with get_db() as db:
+                session = db.query(UserSession).filter(
+                    UserSession.session_token == session_token,
+                    UserSession.is_active == True
+                ).first()
+                
+                if not session or session.is_expired():
+                    run_after_commit(db, lambda: session_cache.evict(session_token))
+                    return {
+                        'success': False,
+                        'message': 'Invalid or expired session token'
+                    }
+                
+                session.extend_session(hours)
+                expires_at = session.expires_at
+                run_after_commit(db, lambda: session_cache.update_expiry(session_token, expires_at))
+                db.commit()
+            
+            return {
+                'success': True,
+                'message': 'Session extended',
+                'expires_at': expires_at.isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error extending session: {str(e)}")
+            return {
+                'success': False,
+                'message': 'Session extension failed'
+            }
+    
+    @classmethod
+    def deactivate_user(cls, user_id: str) -> Dict[str, Any]:
+        """
+        Deactivate a user account and end all of its sessions.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dictionary with deactivation result
+        """
+        try:
+            with get_db() as db:
+                user = db.query(User).filter(User.id == user_id).first()
+                if not user:
+                    return {
+                        'success': False,
+                        'message': 'User not found'
+                    }
+                
+                user.is_active = False
+                user.updated_at = datetime.utcnow()
+                db.query(UserSession).filter(
+                    UserSession.user_id == user_id,
+                    UserSession.is_active == True
+                ).update({UserSession.is_active: False}, synchronize_session=False)
+                revoked_tokens.revoke_user(user_id, db=db)
+                run_after_commit(db, lambda: session_cache.evict_user(user_id))
+                db.commit()
+                
+                email = user.email
+            
+            logger.info(f"User deactivated: {email}")
+            return {
+                'success': True,
+                'message': 'Account deactivated'
+            }
+            
+        except Exception as e:
+            logger.error(f"Error deactivating user: {str(e)}")
+            return {
+                'success': False,
+                'message': 'Account deactivation failed'
+            }
+    
     @classmethod
     def update_profile(cls, user_id: str, profile_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -732,6 +1053,7 @@ class AuthService:
                     user.update_full_name()
                 
                 user.updated_at = datetime.utcnow()
+                run_after_commit(db, lambda: session_cache.evict_user(user_id))
                 db.commit()
                 
                 logger.info(f"Profile updated for user: {user.email}")
@@ -790,6 +1112,7 @@ class AuthService:
                 user.profile_picture_url = picture_url
                 user.profile_picture_filename = picture_url.split('/')[-1]
                 user.updated_at = datetime.utcnow()
+                run_after_commit(db, lambda: session_cache.evict_user(user_id))
                 db.commit()
                 
                 logger.info(f"Profile picture updated for user: {user.email}")
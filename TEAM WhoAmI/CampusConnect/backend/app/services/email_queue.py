@@ -0,0 +1,349 @@
+"""
+Durable outbound email queue.
+
+Request handlers store messages in the outbound_emails table with
+EmailQueue.enqueue() and return immediately. A background EmailWorker
+claims due messages, delivers them over SMTP and records the outcome,
+retrying failures with exponential backoff until max_attempts is reached.
+Message bodies are cleared once an email is sent or has failed for good,
+and AuthDataReaper deletes those rows after its grace period.
+
+When enqueue() is given the caller's session, a queued OTP email is
+committed (or rolled back) together with the OTP row it belongs to.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from sqlalchemy import event, func, or_
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.auth_models import OutboundEmail
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# Session.info flag set by enqueue(); the worker is woken once it commits
+_ENQUEUED_FLAG = 'outbound_email_enqueued'
+
+
+class EmailQueue:
+    """Service class for the outbound email queue."""
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    @classmethod
+    def enqueue(
+        cls,
+        to_email: str,
+        subject: str,
+        html_content: str = None,
+        text_content: str = None,
+        from_email: str = None,
+        reply_to: str = None,
+        max_attempts: int = None,
+        db: Session = None
+    ) -> str:
+        """
+        Store an email for background delivery.
+
+        Pass the caller's session as db to queue the email in the same
+        transaction as the caller's own writes (e.g. the OTP row).
+
+        Args:
+            to_email (str): Recipient email address
+            subject (str): Email subject
+            html_content (str, optional): HTML content of the email
+            text_content (str, optional): Plain text content of the email
+            from_email (str, optional): Sender address; defaults to MAIL_DEFAULT_SENDER at send time
+            reply_to (str, optional): Reply-To address
+            max_attempts (int, optional): Delivery attempts before giving up
+            db (Session, optional): Session to queue the email in
+
+        Returns:
+            str: ID of the queued email
+        """
+        if max_attempts is None:
+            max_attempts = current_app.config.get('EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+
+        if db is None:
+            with get_db() as db:
+                return cls.enqueue(
+                    to_email, subject, html_content, text_content,
+                    from_email, reply_to, max_attempts, db=db
+                )
+
+        email = OutboundEmail(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            from_email=from_email,
+            reply_to=reply_to,
+            max_attempts=max_attempts,
+            next_attempt_at=datetime.utcnow()
+        )
+        db.add(email)
+        db.flush()
+        db.info[_ENQUEUED_FLAG] = True
+
+        logger.info(f"Email queued for {to_email}: {email.id}")
+        return email.id
+
+    @classmethod
+    def process_due(cls, limit: int = None) -> int:
+        """
+        Deliver queued emails whose next attempt is due.
+
+        Messages left in 'sending' by a worker that died are picked up
+        again once EMAIL_QUEUE_LEASE_SECONDS have passed.
+
+        Args:
+            limit (int, optional): Maximum number of emails to deliver
+
+        Returns:
+            int: Number of emails attempted
+        """
+        if limit is None:
+            limit = current_app.config.get('EMAIL_QUEUE_BATCH_SIZE', 50)
+
+        attempted = 0
+        for email_id in cls._due_ids(limit):
+            claimed = cls._claim(email_id)
+            if claimed is None:
+                continue  # Another worker got there first
+
+            attempted += 1
+            error = None
+            try:
+                message = EmailService.build_message(
+                    to_email=claimed['to_email'],
+                    subject=claimed['subject'],
+                    html_content=claimed['html_content'],
+                    text_content=claimed['text_content'],
+                    from_email=claimed['from_email'],
+                    reply_to=claimed['reply_to']
+                )
+                EmailService.get_smtp_pool().send(message)
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+
+            cls._record_result(email_id, claimed['attempts'], claimed['max_attempts'], error)
+
+        return attempted
+
+    @classmethod
+    def get_status(cls, email_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the delivery status of a queued email.
+
+        Args:
+            email_id (str): ID returned by enqueue()
+
+        Returns:
+            dict: Delivery status, or None if the email does not exist
+        """
+        with get_db(read_only=True) as db:
+            email = db.query(OutboundEmail).filter(OutboundEmail.id == email_id).first()
+            return email.to_dict() if email else None
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Count queued emails by delivery status.
+
+        Returns:
+            dict: Number of emails per status
+        """
+        with get_db(read_only=True) as db:
+            rows = db.query(OutboundEmail.status, func.count(OutboundEmail.id)).group_by(
+                OutboundEmail.status
+            ).all()
+
+        stats = {status: 0 for status in (cls.STATUS_PENDING, cls.STATUS_SENDING, cls.STATUS_SENT, cls.STATUS_FAILED)}
+        stats.update({status: count for status, count in rows})
+        return stats
+
+    @classmethod
+    def retry_delay(cls, attempts: int) -> timedelta:
+        """
+        Backoff before the next attempt: base * 2^(attempts - 1), capped.
+
+        Args:
+            attempts (int): Attempts made so far
+
+        Returns:
+            timedelta: Delay before the next attempt
+        """
+        base = current_app.config.get('EMAIL_QUEUE_RETRY_BASE_SECONDS', 30)
+        cap = current_app.config.get('EMAIL_QUEUE_RETRY_MAX_SECONDS', 3600)
+        return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+    @classmethod
+    def _due_filter(cls, now: datetime):
+        """Rows that are ready for an attempt, including abandoned claims."""
+        lease = timedelta(seconds=current_app.config.get('EMAIL_QUEUE_LEASE_SECONDS', 300))
+        return or_(
+            (OutboundEmail.status == cls.STATUS_PENDING) & (OutboundEmail.next_attempt_at <= now),
+            (OutboundEmail.status == cls.STATUS_SENDING) & (OutboundEmail.updated_at <= now - lease)
+        )
+
+    @classmethod
+    def _due_ids(cls, limit: int) -> list:
+        """Return IDs of due emails, oldest first."""
+        now = datetime.utcnow()
+        with get_db() as db:
+            rows = db.query(OutboundEmail.id).filter(cls._due_filter(now)).order_by(
+                OutboundEmail.next_attempt_at
+            ).limit(limit).all()
+        return [row[0] for row in rows]
+
+    @classmethod
+    def _claim(cls, email_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically mark an email as sending and count the attempt.
+
+        Returns:
+            dict: Message fields and attempt counters, or None if the email
+            was claimed by someone else in the meantime
+        """
+        now = datetime.utcnow()
+        with get_db() as db:
+            claimed = db.query(OutboundEmail).filter(
+                OutboundEmail.id == email_id,
+                cls._due_filter(now)
+            ).update({
+                OutboundEmail.status: cls.STATUS_SENDING,
+                OutboundEmail.attempts: OutboundEmail.attempts + 1,
+                OutboundEmail.updated_at: now
+            }, synchronize_session=False)
+            if not claimed:
+                return None
+
+            email = db.query(OutboundEmail).filter(OutboundEmail.id == email_id).one()
+            return {
+                'to_email': email.to_email,
+                'subject': email.subject,
+                'html_content': email.html_content,
+                'text_content': email.text_content,
+                'from_email': email.from_email,
+                'reply_to': email.reply_to,
+                'attempts': email.attempts,
+                'max_attempts': email.max_attempts
+            }
+
+    @classmethod
+    def _record_result(cls, email_id: str, attempts: int, max_attempts: int, error: Optional[str]) -> None:
+        """Record a delivery outcome and schedule a retry if needed."""
+        now = datetime.utcnow()
+        with get_db() as db:
+            email = db.query(OutboundEmail).filter(OutboundEmail.id == email_id).one()
+            email.updated_at = now
+
+            if error is None:
+                email.status = cls.STATUS_SENT
+                email.sent_at = now
+                email.last_error = None
+                # Bodies can hold one-time codes; drop them once they are no longer needed
+                email.html_content = email.text_content = None
+                logger.info(f"Email {email_id} delivered to {email.to_email}")
+            elif attempts >= max_attempts:
+                email.status = cls.STATUS_FAILED
+                email.last_error = error
+                email.html_content = email.text_content = None
+                logger.error(f"Email {email_id} failed after {attempts} attempts: {error}")
+            else:
+                email.status = cls.STATUS_PENDING
+                email.last_error = error
+                email.next_attempt_at = now + cls.retry_delay(attempts)
+                logger.warning(f"Email {email_id} attempt {attempts} failed, retrying at {email.next_attempt_at}: {error}")
+
+
+class EmailWorker:
+    """Background thread that drains the outbound email queue."""
+
+    def __init__(self):
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app) -> None:
+        """
+        Start the worker thread for an application, if not already running.
+
+        Args:
+            app (Flask): Application whose config and database the worker uses
+        """
+        if self.running:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(app, app.config.get('EMAIL_QUEUE_POLL_SECONDS', 5)),
+            name='email-queue-worker',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop the worker thread after its current batch."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        """Ask the worker to check the queue now instead of at the next poll."""
+        self._wake.set()
+
+    def _run(self, app, poll_seconds: float) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            attempted = 0
+            try:
+                with app.app_context():
+                    attempted = EmailQueue.process_due()
+            except Exception as e:
+                logger.error(f"Email worker error: {str(e)}")
+
+            # Keep draining while there is work; otherwise sleep until woken
+            if not attempted:
+                self._wake.wait(poll_seconds)
+
+
+# Process-wide worker; woken whenever a transaction that queued email commits
+email_worker = EmailWorker()
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_worker_after_enqueue(session):
+    # after_commit also fires for savepoints; wait for the real commit
+    if session.in_nested_transaction():
+        return
+    if session.info.pop(_ENQUEUED_FLAG, False):
+        email_worker.wake()
+
+
+def init_email_worker(app) -> None:
+    """
+    Start the background email worker unless disabled in config.
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    if app.config.get('EMAIL_QUEUE_WORKER_ENABLED', True):
+        email_worker.start(app)
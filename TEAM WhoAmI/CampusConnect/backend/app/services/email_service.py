@@ -12,13 +12,21 @@ import string
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from flask import current_app
 import logging
+import threading
+
+from app.services.email_templates import email_templates
+from app.services.smtp_pool import SMTPConnectionPool
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Shared SMTP connection pool, created on first send
+_smtp_pool = None
+_smtp_pool_lock = threading.Lock()
+
 
 class EmailService:
     """Service class for handling email operations."""
@@ -61,6 +69,7 @@ class EmailService:
             mail_use_ssl = current_app.config.get('MAIL_USE_SSL', False)
             mail_username = current_app.config.get('MAIL_USERNAME')
             mail_password = current_app.config.get('MAIL_PASSWORD')
+            mail_timeout = current_app.config.get('MAIL_TIMEOUT', 30)
             
             logger.info(f"Email config - Server: {mail_server}, Port: {mail_port}, TLS: {mail_use_tls}, Username: {mail_username}")
             
@@ -71,10 +80,10 @@ class EmailService:
             if mail_use_ssl:
                 # Use SSL connection
                 context = ssl.create_default_context()
-                server = smtplib.SMTP_SSL(mail_server, mail_port, context=context)
+                server = smtplib.SMTP_SSL(mail_server, mail_port, context=context, timeout=mail_timeout)
             else:
                 # Use regular SMTP connection
-                server = smtplib.SMTP(mail_server, mail_port)
+                server = smtplib.SMTP(mail_server, mail_port, timeout=mail_timeout)
                 
                 if mail_use_tls:
                     # Start TLS encryption
@@ -92,6 +101,37 @@ class EmailService:
             logger.error(f"Failed to create SMTP connection: {str(e)}")
             raise Exception(f"Email service unavailable: {str(e)}")
     
+    @staticmethod
+    def get_smtp_pool() -> SMTPConnectionPool:
+        """
+        Return the process-wide SMTP connection pool, creating it on first use.
+        
+        Returns:
+            SMTPConnectionPool: Pool of sessions opened by create_smtp_connection()
+        """
+        global _smtp_pool
+        
+        with _smtp_pool_lock:
+            if _smtp_pool is None:
+                _smtp_pool = SMTPConnectionPool(
+                    EmailService.create_smtp_connection,
+                    max_size=current_app.config.get('SMTP_POOL_SIZE', 4),
+                    max_idle_seconds=current_app.config.get('SMTP_POOL_MAX_IDLE_SECONDS', 240),
+                    noop_after_seconds=current_app.config.get('SMTP_POOL_NOOP_AFTER_SECONDS', 30),
+                    max_messages_per_connection=current_app.config.get('SMTP_POOL_MAX_MESSAGES_PER_CONNECTION', 100)
+                )
+            return _smtp_pool
+    
+    @staticmethod
+    def reset_smtp_pool() -> None:
+        """Close pooled SMTP sessions and drop the pool (after config changes)."""
+        global _smtp_pool
+        
+        with _smtp_pool_lock:
+            pool, _smtp_pool = _smtp_pool, None
+        if pool is not None:
+            pool.close_all()
+    
     @staticmethod
     def create_otp_email_template(
         recipient_name: str,
@@ -114,141 +154,67 @@ class EmailService:
         if expiry_minutes is None:
             expiry_minutes = current_app.config.get('OTP_EXPIRY_MINUTES', 10)
         
-        subject = f"Your CampusConnect {purpose.title()} Code"
-        
-        # HTML template
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{subject}</title>
-            <style>
-                body {{
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                    background-color: #f4f4f4;
-                }}
-                .container {{
-                    background-color: white;
-                    padding: 30px;
-                    border-radius: 10px;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                }}
-                .header {{
-                    text-align: center;
-                    margin-bottom: 30px;
-                }}
-                .logo {{
-                    font-size: 28px;
-                    font-weight: bold;
-                    color: #2563eb;
-                    margin-bottom: 10px;
-                }}
-                .otp-container {{
-                    background-color: #f8fafc;
-                    border: 2px dashed #2563eb;
-                    border-radius: 8px;
-                    padding: 20px;
-                    text-align: center;
-                    margin: 20px 0;
-                }}
-                .otp-code {{
-                    font-size: 32px;
-                    font-weight: bold;
-                    color: #2563eb;
-                    letter-spacing: 8px;
-                    margin: 10px 0;
-                }}
-                .warning {{
-                    background-color: #fef3c7;
-                    border-left: 4px solid #f59e0b;
-                    padding: 15px;
-                    margin: 20px 0;
-                    border-radius: 4px;
-                }}
-                .footer {{
-                    text-align: center;
-                    margin-top: 30px;
-                    padding-top: 20px;
-                    border-top: 1px solid #e5e7eb;
-                    color: #6b7280;
-                    font-size: 14px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <div class="logo">CampusConnect</div>
-                    <h2>Your {purpose.title()} Code</h2>
-                </div>
-                
-                <p>Hello {recipient_name},</p>
-                
-                <p>You have requested a {purpose} code for your CampusConnect account. Please use the following code to complete your {purpose}:</p>
-                
-                <div class="otp-container">
-                    <div class="otp-code">{otp}</div>
-                    <p><strong>This code will expire in {expiry_minutes} minutes</strong></p>
-                </div>
-                
-                <div class="warning">
-                    <strong>Security Notice:</strong>
-                    <ul style="margin: 10px 0; padding-left: 20px;">
-                        <li>Never share this code with anyone</li>
-                        <li>CampusConnect will never ask for this code via phone or email</li>
-                        <li>If you didn't request this code, please ignore this email</li>
-                    </ul>
-                </div>
-                
-                <p>If you're having trouble with {purpose}, please contact our support team.</p>
-                
-                <div class="footer">
-                    <p>This is an automated message from CampusConnect.<br>
-                    Please do not reply to this email.</p>
-                    <p>&copy; 2024 CampusConnect. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
+        # Static parts are pre-rendered per purpose; only name and code vary
+        return email_templates.render_otp_email(
+            recipient_name=recipient_name,
+            otp=otp,
+            purpose=purpose,
+            expiry_minutes=expiry_minutes
+        )
+    
+    @staticmethod
+    def build_message(
+        to_email: str,
+        subject: str,
+        html_content: str = None,
+        text_content: str = None,
+        from_email: str = None,
+        reply_to: str = None
+    ) -> MIMEMultipart:
         """
+        Build a MIME message with plain text and HTML alternatives.
         
-        # Plain text version
-        text_content = f"""
-        CampusConnect - Your {purpose.title()} Code
-        
-        Hello {recipient_name},
-        
-        You have requested a {purpose} code for your CampusConnect account.
-        
-        Your {purpose} code is: {otp}
-        
-        This code will expire in {expiry_minutes} minutes.
-        
-        SECURITY NOTICE:
-        - Never share this code with anyone
-        - CampusConnect will never ask for this code via phone or email
-        - If you didn't request this code, please ignore this email
-        
-        If you're having trouble with {purpose}, please contact our support team.
-        
-        This is an automated message from CampusConnect.
-        Please do not reply to this email.
-        
-        © 2024 CampusConnect. All rights reserved.
+        Args:
+            to_email (str): Recipient email address
+            subject (str): Email subject
+            html_content (str, optional): HTML content of the email
+            text_content (str, optional): Plain text content of the email
+            from_email (str, optional): Sender email address
+            reply_to (str, optional): Reply-To address
+            
+        Returns:
+            MIMEMultipart: Message ready to send
+            
+        Raises:
+            ValueError: If no sender address is configured
         """
-        
-        return {
-            'subject': subject,
-            'html': html_content,
-            'text': text_content
-        }
+        if from_email is None:
+            from_email = current_app.config.get('MAIL_DEFAULT_SENDER')
+        if reply_to is None:
+            reply_to = current_app.config.get('MAIL_REPLY_TO')
+
+        if not from_email:
+            raise ValueError("No sender email address configured")
+
+        # Create message
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = from_email
+        message['To'] = to_email
+        if reply_to:
+            message.add_header('Reply-To', reply_to)
+
+        # Add text content
+        if text_content:
+            text_part = MIMEText(text_content, 'plain')
+            message.attach(text_part)
+
+        # Add HTML content
+        if html_content:
+            html_part = MIMEText(html_content, 'html')
+            message.attach(html_part)
+
+        return message
     
     @staticmethod
     def send_email(
@@ -262,6 +228,9 @@ class EmailService:
         """
         Send an email using SMTP.
         
+        This blocks until the server accepts the message; request handlers
+        should use EmailQueue.enqueue() instead.
+        
         Args:
             to_email (str): Recipient email address
             subject (str): Email subject
@@ -273,35 +242,17 @@ class EmailService:
             bool: True if email sent successfully, False otherwise
         """
         try:
-            if from_email is None:
-                from_email = current_app.config.get('MAIL_DEFAULT_SENDER')
-            if reply_to is None:
-                reply_to = current_app.config.get('MAIL_REPLY_TO')
-
-            if not from_email:
-                raise ValueError("No sender email address configured")
-
-            # Create message
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = from_email
-            message['To'] = to_email
-            if reply_to:
-                message.add_header('Reply-To', reply_to)
-
-            # Add text content
-            if text_content:
-                text_part = MIMEText(text_content, 'plain')
-                message.attach(text_part)
-
-            # Add HTML content
-            if html_content:
-                html_part = MIMEText(html_content, 'html')
-                message.attach(html_part)
+            message = EmailService.build_message(
+                to_email=to_email,
+                subject=subject,
+                html_content=html_content,
+                text_content=text_content,
+                from_email=from_email,
+                reply_to=reply_to
+            )
 
-            # Create SMTP connection and send email
-            with EmailService.create_smtp_connection() as server:
-                server.send_message(message)
+            # Send over a pooled SMTP session
+            EmailService.get_smtp_pool().send(message)
 
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -310,21 +261,61 @@ class EmailService:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
     
+    @staticmethod
+    def send_bulk(emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send many emails through one pooled SMTP session.
+        
+        Intended for batch jobs such as event reminders and digests, not
+        for request handlers.
+        
+        Args:
+            emails (List[Dict]): Keyword arguments for build_message(), one dict per email
+            
+        Returns:
+            List[Dict[str, Any]]: One result per email with 'to_email', 'success' and 'error'
+        """
+        results = [None] * len(emails)
+        messages = []
+        positions = []
+        for index, email in enumerate(emails):
+            try:
+                messages.append(EmailService.build_message(**email))
+                positions.append(index)
+            except Exception as e:
+                results[index] = str(e)
+        
+        errors = EmailService.get_smtp_pool().send_bulk(messages) if messages else []
+        for index, error in zip(positions, errors):
+            results[index] = error
+        
+        sent = sum(1 for error in results if error is None)
+        logger.info(f"Bulk send finished: {sent}/{len(emails)} emails sent")
+        return [
+            {'to_email': email.get('to_email'), 'success': error is None, 'error': error}
+            for email, error in zip(emails, results)
+        ]
+    
     @staticmethod
     def send_otp_email(
         to_email: str,
         recipient_name: str,
         otp: str = None,
-        purpose: str = "authentication"
+        purpose: str = "authentication",
+        db=None
     ) -> Dict[str, Any]:
         """
-        Send an OTP email to the specified recipient.
+        Queue an OTP email for the specified recipient.
+        
+        Returns as soon as the message is stored in the outbound queue; the
+        SMTP round trip happens in the background email worker.
         
         Args:
             to_email (str): Recipient email address
             recipient_name (str): Name of the recipient
             otp (str, optional): OTP code. If not provided, a new one will be generated
             purpose (str): Purpose of the OTP
+            db (Session, optional): Caller's session, so the email is queued in its transaction
             
         Returns:
             Dict[str, Any]: Result containing success status, OTP, and expiry time
@@ -346,28 +337,24 @@ class EmailService:
                 expiry_minutes=expiry_minutes
             )
             
-            # Send email
-            success = EmailService.send_email(
+            # Queue the email; the background worker delivers it
+            from app.services.email_queue import EmailQueue
+            email_id = EmailQueue.enqueue(
                 to_email=to_email,
                 subject=email_template['subject'],
                 html_content=email_template['html'],
-                text_content=email_template['text']
+                text_content=email_template['text'],
+                db=db
             )
             
-            if success:
-                return {
-                    'success': True,
-                    'message': f'OTP sent successfully to {to_email}',
-                    'otp': otp,
-                    'expiry_time': expiry_time.isoformat(),
-                    'expiry_minutes': expiry_minutes
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': 'Failed to send OTP email',
-                    'error': 'EMAIL_SEND_FAILED'
-                }
+            return {
+                'success': True,
+                'message': f'OTP queued for delivery to {to_email}',
+                'otp': otp,
+                'email_id': email_id,
+                'expiry_time': expiry_time.isoformat(),
+                'expiry_minutes': expiry_minutes
+            }
                 
         except Exception as e:
             logger.error(f"Error in send_otp_email: {str(e)}")
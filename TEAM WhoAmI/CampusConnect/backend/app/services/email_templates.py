@@ -0,0 +1,180 @@
+"""
+Compiled email template registry.
+
+Email bodies live as Jinja2 templates under app/templates/email. Compiled
+templates are kept in a bytecode cache so new processes skip parsing, and
+each (template, purpose, expiry) combination is rendered once with
+placeholders for the per-message fields. Rendering an email afterwards is
+only a join of the static parts with the escaped recipient name and code.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import escape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'email')
+
+# Fields substituted per message; everything else is pre-rendered
+MESSAGE_FIELDS = ('recipient_name', 'otp')
+
+# Human-readable purpose names used in subjects and body text
+PURPOSE_LABELS = {
+    'signup': 'signup',
+    'login': 'login',
+    'authentication': 'authentication',
+    'password_reset': 'password reset',
+}
+
+
+def purpose_label(purpose: str) -> str:
+    """Return the display name for an OTP purpose."""
+    return PURPOSE_LABELS.get(purpose, purpose.replace('_', ' '))
+
+
+class _PrerenderedTemplate:
+    """A rendered template split around its per-message placeholders."""
+
+    def __init__(self, parts: List[str], fields: List[str], escape_html: bool):
+        self.parts = parts
+        self.fields = fields
+        self.escape_html = escape_html
+
+    def render(self, values: Dict[str, str]) -> str:
+        pieces = [self.parts[0]]
+        for field, static in zip(self.fields, self.parts[1:]):
+            value = str(values[field])
+            pieces.append(str(escape(value)) if self.escape_html else value)
+            pieces.append(static)
+        return ''.join(pieces)
+
+
+class EmailTemplateRegistry:
+    """Loads, compiles and pre-renders email templates."""
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR, cache_dir: Optional[str] = None):
+        """
+        Args:
+            template_dir: Directory containing the email templates
+            cache_dir: Directory for compiled template bytecode; defaults
+                to a per-user temporary directory
+        """
+        self.template_dir = template_dir
+        self._prerendered = {}
+        self._lock = threading.Lock()
+        self.environment = self._build_environment(cache_dir)
+
+    def configure(self, cache_dir: Optional[str]) -> None:
+        """
+        Switch to a different bytecode cache directory.
+
+        Args:
+            cache_dir: Directory for compiled template bytecode
+        """
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with self._lock:
+            self.environment = self._build_environment(cache_dir)
+            self._prerendered.clear()
+
+    def _build_environment(self, cache_dir: Optional[str]) -> Environment:
+        return Environment(
+            loader=FileSystemLoader(self.template_dir),
+            autoescape=select_autoescape(['html']),
+            bytecode_cache=FileSystemBytecodeCache(cache_dir, '%s.campus_connect.cache'),
+            keep_trailing_newline=True
+        )
+
+    def render_full(self, name: str, **context) -> str:
+        """Render a template with Jinja2 directly, without pre-rendering."""
+        return self.environment.get_template(name).render(**context)
+
+    def render(self, name: str, static_context: Dict[str, object], values: Dict[str, str]) -> str:
+        """
+        Render a template from its pre-rendered static parts.
+
+        Args:
+            name: Template file name, e.g. 'otp.html'
+            static_context: Values shared by every message of this kind
+            values: Per-message values for MESSAGE_FIELDS
+
+        Returns:
+            str: Rendered email body
+        """
+        key = (name, tuple(sorted(static_context.items())))
+        template = self._prerendered.get(key)
+        if template is None:
+            with self._lock:
+                template = self._prerendered.get(key)
+                if template is None:
+                    template = self._prerender(name, static_context)
+                    self._prerendered[key] = template
+        return template.render(values)
+
+    def render_otp_email(self, recipient_name: str, otp: str, purpose: str, expiry_minutes: int) -> Dict[str, str]:
+        """
+        Render the OTP email for one recipient.
+
+        Returns:
+            Dict[str, str]: Dictionary containing 'subject', 'html', and 'text' content
+        """
+        label = purpose_label(purpose)
+        subject = f"Your CampusConnect {label.title()} Code"
+        static_context = {
+            'subject': subject,
+            'purpose_label': label,
+            'purpose_title': label.title(),
+            'expiry_minutes': expiry_minutes,
+        }
+        values = {'recipient_name': recipient_name, 'otp': otp}
+        return {
+            'subject': subject,
+            'html': self.render('otp.html', static_context, values),
+            'text': self.render('otp.txt', static_context, values)
+        }
+
+    def clear(self) -> None:
+        """Drop pre-rendered templates (after editing template files)."""
+        with self._lock:
+            self._prerendered.clear()
+
+    def _prerender(self, name: str, static_context: Dict[str, object]) -> _PrerenderedTemplate:
+        """Render once with unique markers in place of the per-message fields."""
+        markers = {field: f"\x00{field}\x00" for field in MESSAGE_FIELDS}
+        rendered = self.render_full(name, **static_context, **markers)
+
+        parts, fields = self._split(rendered, markers)
+        return _PrerenderedTemplate(parts, fields, escape_html=name.endswith('.html'))
+
+    @staticmethod
+    def _split(rendered: str, markers: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """Split rendered text into static parts and the fields between them."""
+        parts, fields = [], []
+        rest = rendered
+        while True:
+            positions = [(rest.find(marker), field) for field, marker in markers.items() if marker in rest]
+            if not positions:
+                parts.append(rest)
+                return parts, fields
+            index, field = min(positions)
+            parts.append(rest[:index])
+            fields.append(field)
+            rest = rest[index + len(markers[field]):]
+
+
+# Process-wide registry used by EmailService
+email_templates = EmailTemplateRegistry()
+
+
+def init_email_templates(app) -> None:
+    """
+    Point the template registry at the configured bytecode cache directory.
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    cache_dir = app.config.get('EMAIL_TEMPLATE_CACHE_DIR')
+    if cache_dir:
+        email_templates.configure(cache_dir)
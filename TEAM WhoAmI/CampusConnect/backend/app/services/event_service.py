@@ -9,9 +9,12 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
-from app.database import get_db
+from sqlalchemy import delete, exists
+
+from app.database import get_db, insert_ignore
 from app.models.auth_models import Event, User, user_events, user_saved_events
 from app.models.data_models import JoinEventRequest, ApiResponse
+from app.utils.pagination import decode_cursor, paginate_by_created
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +31,7 @@ class EventService:
             List of event dictionaries
         """
         try:
-            with get_db() as db:
+            with get_db(read_only=True) as db:
                 events = db.query(Event).filter(Event.is_active == True).all()
                 return [event.to_dict() for event in events]
         except Exception as e:
@@ -36,6 +39,49 @@ class EventService:
             # Return mock data as fallback
             return cls._get_mock_events()
     
+    @classmethod
+    def get_events_page(
+        cls,
+        category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Retrieve one page of active events, newest first.
+        
+        Args:
+            category (str, optional): Only include events in this category
+            cursor (str, optional): Cursor returned with the previous page
+            limit (int): Page size
+            
+        Returns:
+            Dictionary with 'events', 'next_cursor' and 'has_more'
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor else None
+        
+        try:
+            with get_db(read_only=True) as db:
+                query = db.query(Event).filter(Event.is_active == True)
+                if category:
+                    query = query.filter(Event.category == category)
+                
+                page = paginate_by_created(query, Event, after, limit)
+                return {
+                    "events": [event.to_dict() for event in page["items"]],
+                    "next_cursor": page["next_cursor"],
+                    "has_more": page["has_more"]
+                }
+        except Exception as e:
+            logger.error(f"Error retrieving events page: {str(e)}")
+            # Return mock data as fallback
+            mock_events = cls._get_mock_events()
+            if category:
+                mock_events = [event for event in mock_events if event["category"] == category]
+            return {"events": mock_events[:limit], "next_cursor": None, "has_more": False}
+    
     @classmethod
     def get_event_by_id(cls, event_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -48,7 +94,7 @@ class EventService:
             Event dictionary if found, None otherwise
         """
         try:
-            with get_db() as db:
+            with get_db(read_only=True) as db:
                 event = db.query(Event).filter(
                     Event.id == event_id,
                     Event.is_active == True
@@ -97,22 +143,29 @@ class EventService:
                         "message": "User not found"
                     }
                 
-                # Check if user is already registered
-                if user in event.attendees:
+                # Register the user; an existing row means they already joined
+                if not insert_ignore(db, user_events, user_id=user_id, event_id=event_id):
                     return {
                         "success": False,
                         "message": "You are already registered for this event"
                     }
                 
-                # Check if event is full
-                if event.attendee_count >= event.max_attendees:
+                # Reserve a spot; the conditional update keeps concurrent joins
+                # from overbooking the event
+                reserved = db.query(Event).filter(
+                    Event.id == event_id,
+                    Event.attendee_count < Event.max_attendees
+                ).update(
+                    {Event.attendee_count: Event.attendee_count + 1},
+                    synchronize_session=False
+                )
+                if not reserved:
+                    db.rollback()
                     return {
                         "success": False,
                         "message": "Event is full"
                     }
                 
-                # Add user to event attendees
-                event.attendees.append(user)
                 db.commit()
                 
                 logger.info(f"User {user.email} joined event {event.title}")
@@ -167,15 +220,24 @@ class EventService:
                         "message": "User not found"
                     }
                 
-                # Check if user is registered
-                if user not in event.attendees:
+                # Unregister the user; no matching row means they never joined
+                removed = db.execute(
+                    delete(user_events).where(
+                        user_events.c.user_id == user_id,
+                        user_events.c.event_id == event_id
+                    )
+                ).rowcount
+                if not removed:
                     return {
                         "success": False,
                         "message": "You are not registered for this event"
                     }
                 
-                # Remove user from event attendees
-                event.attendees.remove(user)
+                # Release the spot
+                db.query(Event).filter(Event.id == event_id, Event.attendee_count > 0).update(
+                    {Event.attendee_count: Event.attendee_count - 1},
+                    synchronize_session=False
+                )
                 db.commit()
                 
                 logger.info(f"User {user.email} left event {event.title}")
@@ -230,15 +292,13 @@ class EventService:
                         "message": "User not found"
                     }
                 
-                # Check if event is already saved
-                if event in user.saved_events:
+                # Save the event; an existing row means it was already saved
+                if not insert_ignore(db, user_saved_events, user_id=user_id, event_id=event_id):
                     return {
                         "success": False,
                         "message": "Event is already saved"
                     }
                 
-                # Add event to user's saved events
-                user.saved_events.append(event)
                 db.commit()
                 
                 logger.info(f"User {user.email} saved event {event.title}")
@@ -292,15 +352,19 @@ class EventService:
                         "message": "User not found"
                     }
                 
-                # Check if event is saved
-                if event not in user.saved_events:
+                # Unsave the event; no matching row means it was never saved
+                removed = db.execute(
+                    delete(user_saved_events).where(
+                        user_saved_events.c.user_id == user_id,
+                        user_saved_events.c.event_id == event_id
+                    )
+                ).rowcount
+                if not removed:
                     return {
                         "success": False,
                         "message": "Event is not saved"
                     }
                 
-                # Remove event from user's saved events
-                user.saved_events.remove(event)
                 db.commit()
                 
                 logger.info(f"User {user.email} unsaved event {event.title}")
@@ -332,7 +396,7 @@ class EventService:
             Dictionary containing joined and saved events
         """
         try:
-            with get_db() as db:
+            with get_db(read_only=True) as db:
                 user = db.query(User).filter(User.id == user_id).first()
                 if not user:
                     return {
@@ -371,7 +435,7 @@ class EventService:
             Dictionary containing user's relationship to the event
         """
         try:
-            with get_db() as db:
+            with get_db(read_only=True) as db:
                 event = db.query(Event).filter(
                     Event.id == event_id,
                     Event.is_active == True
@@ -390,8 +454,18 @@ class EventService:
                         "message": "User not found"
                     }
                 
-                is_joined = user in event.attendees
-                is_saved = event in user.saved_events
+                is_joined = db.query(
+                    exists().where(
+                        user_events.c.user_id == user_id,
+                        user_events.c.event_id == event_id
+                    )
+                ).scalar()
+                is_saved = db.query(
+                    exists().where(
+                        user_saved_events.c.user_id == user_id,
+                        user_saved_events.c.event_id == event_id
+                    )
+                ).scalar()
                 
                 return {
                     "success": True,
@@ -409,6 +483,62 @@ class EventService:
                 "message": "Failed to check event status"
             }
     
+    @classmethod
+    def get_viewer_state(cls, event_ids: List[str], user_id: str) -> Dict[str, Dict[str, bool]]:
+        """
+        Look up whether a user joined or saved each of a batch of events.
+        
+        Args:
+            event_ids (List[str]): IDs of the events being rendered
+            user_id (str): The ID of the viewing user
+            
+        Returns:
+            Dict: Mapping of event ID to {'is_joined': bool, 'is_saved': bool}
+        """
+        event_ids = list(dict.fromkeys(event_ids))
+        if not event_ids:
+            return {}
+        
+        try:
+            with get_db(read_only=True) as db:
+                joined = {
+                    event_id for (event_id,) in db.query(user_events.c.event_id).filter(
+                        user_events.c.user_id == user_id,
+                        user_events.c.event_id.in_(event_ids)
+                    )
+                }
+                saved = {
+                    event_id for (event_id,) in db.query(user_saved_events.c.event_id).filter(
+                        user_saved_events.c.user_id == user_id,
+                        user_saved_events.c.event_id.in_(event_ids)
+                    )
+                }
+        except Exception as e:
+            logger.error(f"Error retrieving viewer state for user {user_id}: {str(e)}")
+            joined, saved = set(), set()
+        
+        return {
+            event_id: {"is_joined": event_id in joined, "is_saved": event_id in saved}
+            for event_id in event_ids
+        }
+    
+    @classmethod
+    def attach_viewer_state(cls, events: List[Dict[str, Any]], user_id: str) -> List[Dict[str, Any]]:
+        """
+        Embed the viewing user's joined/saved state into serialized events.
+        
+        Args:
+            events (List[Dict]): Events as returned by the listing methods
+            user_id (str): The ID of the viewing user
+            
+        Returns:
+            List[Dict]: The same events with 'is_joined' and 'is_saved' flags added
+        """
+        state = cls.get_viewer_state([event["id"] for event in events], user_id)
+        for event in events:
+            event.update(state.get(event["id"], {"is_joined": False, "is_saved": False}))
+        return events
+    
     @classmethod
     def _get_mock_events(cls) -> List[Dict[str, Any]]:
         """
@@ -502,7 +632,7 @@ class EventService:
             List of events in the specified category
         """
         try:
-            with get_db() as db:
+            with get_db(read_only=True) as db:
                 events = db.query(Event).filter(
                     Event.category == category,
                     Event.is_active == True
@@ -7,9 +7,12 @@ and managing post data with database integration.
 """
 
 from typing import List, Optional, Dict, Any
+from sqlalchemy import delete, exists
+from sqlalchemy.orm import Session, joinedload
 from app.models.data_models import LikePostRequest, CreatePostRequest, ApiResponse
-from app.models.auth_models import Post, User, Comment
-from app.database import get_db
+from app.models.auth_models import Post, User, Comment, post_likes
+from app.database import get_db, insert_ignore
+from app.utils.pagination import decode_cursor, paginate_by_created
 import uuid
 from datetime import datetime
 import logging
@@ -20,6 +23,87 @@ logger = logging.getLogger(__name__)
 class PostService:
     """Service class for handling post-related business logic."""
 
+    @classmethod
+    def _feed_query(cls, db: Session):
+        """
+        Build the query used by every post listing.
+        
+        Authors are joined in and like/comment counts are read from the
+        persisted counter columns, so a page of posts is serialized from a
+        single SELECT instead of three lazy loads per post.
+        
+        Args:
+            db (Session): Active database session
+            
+        Returns:
+            Query: Query over active posts with authors eagerly loaded
+        """
+        return (
+            db.query(Post)
+            .options(joinedload(Post.author))
+            .filter(Post.is_active == True)
+        )
+
+    @classmethod
+    def _serialize_feed(cls, posts) -> List[Dict[str, Any]]:
+        """
+        Serialize posts produced by _feed_query.
+        
+        Args:
+            posts: Iterable of Post instances
+            
+        Returns:
+            List[Dict]: Posts formatted for API responses
+        """
+        return [post.to_dict() for post in posts]
+
+    @classmethod
+    def get_viewer_state(cls, post_ids: List[str], user_id: str) -> Dict[str, Dict[str, bool]]:
+        """
+        Look up whether a user liked each of a batch of posts.
+        
+        Args:
+            post_ids (List[str]): IDs of the posts being rendered
+            user_id (str): The ID of the viewing user
+            
+        Returns:
+            Dict: Mapping of post ID to {'is_liked': bool}
+        """
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return {}
+        
+        try:
+            with get_db(read_only=True) as db:
+                liked = {
+                    post_id for (post_id,) in db.query(post_likes.c.post_id).filter(
+                        post_likes.c.user_id == user_id,
+                        post_likes.c.post_id.in_(post_ids)
+                    )
+                }
+        except Exception as e:
+            logger.error(f"Error retrieving viewer state for user {user_id}: {str(e)}")
+            liked = set()
+        
+        return {post_id: {"is_liked": post_id in liked} for post_id in post_ids}
+
+    @classmethod
+    def attach_viewer_state(cls, posts: List[Dict[str, Any]], user_id: str) -> List[Dict[str, Any]]:
+        """
+        Embed the viewing user's like state into serialized posts.
+        
+        Args:
+            posts (List[Dict]): Posts as returned by the listing methods
+            user_id (str): The ID of the viewing user
+            
+        Returns:
+            List[Dict]: The same posts with an 'is_liked' flag added
+        """
+        state = cls.get_viewer_state([post["id"] for post in posts], user_id)
+        for post in posts:
+            post.update(state.get(post["id"], {"is_liked": False}))
+        return posts
+
     @classmethod
     def get_all_posts(cls) -> List[Dict[str, Any]]:
         """
@@ -29,13 +113,59 @@ class PostService:
             List[Dict]: List of all posts from database
         """
         try:
-            with get_db() as db:
-                posts = db.query(Post).filter(Post.is_active == True).order_by(Post.created_at.desc()).all()
-                return [post.to_dict() for post in posts]
+            with get_db(read_only=True) as db:
+                posts = cls._feed_query(db).order_by(Post.created_at.desc()).all()
+                return cls._serialize_feed(posts)
         except Exception as e:
             logger.error(f"Error retrieving posts: {str(e)}")
             return []
 
+    @classmethod
+    def get_posts_page(
+        cls,
+        category: Optional[str] = None,
+        author_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Retrieve one page of the post feed, newest first.
+        
+        Filters are combined in a single query and pages are fetched by
+        (created_at, id) keyset rather than OFFSET.
+        
+        Args:
+            category (str, optional): Only include posts in this category
+            author_id (str, optional): Only include posts by this author
+            cursor (str, optional): Cursor returned with the previous page
+            limit (int): Page size
+            
+        Returns:
+            Dict: {'posts': [...], 'next_cursor': str or None, 'has_more': bool}
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor else None
+        
+        try:
+            with get_db(read_only=True) as db:
+                query = cls._feed_query(db)
+                if category:
+                    query = query.filter(Post.category == category)
+                if author_id:
+                    query = query.filter(Post.author_id == author_id)
+                
+                page = paginate_by_created(query, Post, after, limit)
+                return {
+                    "posts": cls._serialize_feed(page["items"]),
+                    "next_cursor": page["next_cursor"],
+                    "has_more": page["has_more"]
+                }
+        except Exception as e:
+            logger.error(f"Error retrieving posts page: {str(e)}")
+            return {"posts": [], "next_cursor": None, "has_more": False}
+
     @classmethod
     def get_post_by_id(cls, post_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -48,8 +178,8 @@ class PostService:
             Optional[Dict]: The post if found, None otherwise
         """
         try:
-            with get_db() as db:
-                post = db.query(Post).filter(Post.id == post_id, Post.is_active == True).first()
+            with get_db(read_only=True) as db:
+                post = cls._feed_query(db).filter(Post.id == post_id).first()
                 return post.to_dict() if post else None
         except Exception as e:
             logger.error(f"Error retrieving post {post_id}: {str(e)}")
@@ -85,15 +215,18 @@ class PostService:
                         message="User not found"
                     )
                 
-                # Check if user has already liked this post
-                if user in post.liked_by_users:
+                # Add like; an existing row means the user already liked it
+                if not insert_ignore(db, post_likes, user_id=user_id, post_id=post_id):
                     return ApiResponse(
                         success=False,
                         message="You have already liked this post"
                     )
                 
-                # Add like
-                post.liked_by_users.append(user)
+                # Bump the counter in the same transaction
+                db.query(Post).filter(Post.id == post_id).update(
+                    {Post.like_count: Post.like_count + 1},
+                    synchronize_session=False
+                )
                 db.commit()
                 
                 logger.info(f"User {user.email} liked post {post.title}")
@@ -145,15 +278,24 @@ class PostService:
                         message="User not found"
                     )
                 
-                # Check if user has liked this post
-                if user not in post.liked_by_users:
+                # Remove like; no matching row means the user never liked it
+                removed = db.execute(
+                    delete(post_likes).where(
+                        post_likes.c.user_id == user_id,
+                        post_likes.c.post_id == post_id
+                    )
+                ).rowcount
+                if not removed:
                     return ApiResponse(
                         success=False,
                         message="You haven't liked this post"
                     )
                 
-                # Remove like
-                post.liked_by_users.remove(user)
+                # Drop the counter in the same transaction
+                db.query(Post).filter(Post.id == post_id, Post.like_count > 0).update(
+                    {Post.like_count: Post.like_count - 1},
+                    synchronize_session=False
+                )
                 db.commit()
                 
                 logger.info(f"User {user.email} unliked post {post.title}")
@@ -333,12 +475,11 @@ class PostService:
             List[Dict]: List of posts in the specified category
         """
         try:
-            with get_db() as db:
-                posts = db.query(Post).filter(
-                    Post.category == category,
-                    Post.is_active == True
+            with get_db(read_only=True) as db:
+                posts = cls._feed_query(db).filter(
+                    Post.category == category
                 ).order_by(Post.created_at.desc()).all()
-                return [post.to_dict() for post in posts]
+                return cls._serialize_feed(posts)
         except Exception as e:
             logger.error(f"Error retrieving posts by category {category}: {str(e)}")
             return []
@@ -355,12 +496,11 @@ class PostService:
             List[Dict]: List of posts by the specified author
         """
         try:
-            with get_db() as db:
-                posts = db.query(Post).filter(
-                    Post.author_id == author_id,
-                    Post.is_active == True
+            with get_db(read_only=True) as db:
+                posts = cls._feed_query(db).filter(
+                    Post.author_id == author_id
                 ).order_by(Post.created_at.desc()).all()
-                return [post.to_dict() for post in posts]
+                return cls._serialize_feed(posts)
         except Exception as e:
             logger.error(f"Error retrieving posts by author {author_id}: {str(e)}")
             return []
@@ -404,6 +544,10 @@ class PostService:
                 )
                 
                 db.add(comment)
+                db.query(Post).filter(Post.id == post_id).update(
+                    {Post.comment_count: Post.comment_count + 1},
+                    synchronize_session=False
+                )
                 db.commit()
                 db.refresh(comment)
                 
@@ -433,7 +577,7 @@ class PostService:
             List[Dict]: List of comments for the post
         """
         try:
-            with get_db() as db:
+            with get_db(read_only=True) as db:
                 comments = db.query(Comment).filter(
                     Comment.post_id == post_id,
                     Comment.is_active == True
@@ -456,16 +600,13 @@ class PostService:
             bool: True if user has liked the post, False otherwise
         """
         try:
-            with get_db() as db:
-                post = db.query(Post).filter(Post.id == post_id).first()
-                if not post:
-                    return False
-                
-                user = db.query(User).filter(User.id == user_id).first()
-                if not user:
-                    return False
-                
-                return user in post.liked_by_users
+            with get_db(read_only=True) as db:
+                return db.query(
+                    exists().where(
+                        post_likes.c.user_id == user_id,
+                        post_likes.c.post_id == post_id
+                    )
+                ).scalar()
         except Exception as e:
             logger.error(f"Error checking if user {user_id} liked post {post_id}: {str(e)}")
             return False
\ No newline at end of file
@@ -0,0 +1,336 @@
+"""
+Token-bucket rate limiting for authentication endpoints.
+
+Each OTP request costs an SMTP send and each password login a hash
+computation, so both are throttled per client IP and per email address.
+Every (scope, kind, value) key has a bucket holding up to `capacity`
+tokens that refills evenly over `period` seconds; a call takes one token
+from each of its buckets or is refused with the seconds until one frees up.
+
+Buckets live in memory by default. The SQLite backend keeps them in a
+shared database file so every worker process on a host sees the same
+counts. Backend errors never block a login; the call is allowed and the
+error is logged.
+"""
+
+import functools
+import inspect
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from flask import has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# scope -> kind -> "capacity/period_seconds"
+DEFAULT_LIMITS = {
+    'otp_send': {'email': '3/600', 'ip': '20/600'},
+    'password_login': {'email': '5/300', 'ip': '30/300'},
+}
+
+# (key, capacity, period_seconds)
+BucketSpec = Tuple[str, int, float]
+
+
+def parse_limit(value: str) -> Tuple[int, float]:
+    """
+    Parse a "capacity/period_seconds" limit such as "5/300".
+
+    Raises:
+        ValueError: If the value is malformed or not positive
+    """
+    capacity, _, period = str(value).partition('/')
+    capacity, period = int(capacity), float(period)
+    if capacity <= 0 or period <= 0:
+        raise ValueError(f"Invalid rate limit {value!r}")
+    return capacity, period
+
+
+def _refill(tokens: float, updated_at: float, capacity: int, period: float, now: float) -> float:
+    """Return the bucket level after refilling since updated_at."""
+    return min(float(capacity), tokens + (now - updated_at) * capacity / period)
+
+
+def _take(levels: List[float], buckets: List[BucketSpec]) -> float:
+    """
+    Decide whether one token can be taken from every bucket.
+
+    Returns:
+        float: 0 if allowed, otherwise seconds until every bucket has a token
+    """
+    retry_after = 0.0
+    for level, (_, capacity, period) in zip(levels, buckets):
+        if level < 1:
+            retry_after = max(retry_after, (1 - level) * period / capacity)
+    return retry_after
+
+
+class MemoryBackend:
+    """Buckets in a dict, shared by the threads of one process."""
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated_at, period)
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def acquire(self, buckets: List[BucketSpec], now: float) -> float:
+        with self._lock:
+            levels = []
+            for key, capacity, period in buckets:
+                tokens, updated_at, _ = self._buckets.get(key, (capacity, now, period))
+                levels.append(_refill(tokens, updated_at, capacity, period, now))
+
+            retry_after = _take(levels, buckets)
+            if not retry_after:
+                for level, (key, _, period) in zip(levels, buckets):
+                    self._buckets[key] = (level - 1, now, period)
+
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                self._purge(now)
+            return retry_after
+
+    def _purge(self, now: float) -> None:
+        """Drop buckets that have been idle long enough to be full again."""
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if now - bucket[1] < bucket[2]
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file shared by every worker process on the host."""
+
+    def __init__(self, path: str, timeout: float = 5):
+        """
+        Args:
+            path: Database file; created if missing
+            timeout: Seconds to wait for another process's write lock
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._calls = 0
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated_at REAL NOT NULL, period REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def acquire(self, buckets: List[BucketSpec], now: float) -> float:
+        connection = self._connect()
+        # BEGIN IMMEDIATE takes the write lock up front, so the read and
+        # update below are atomic across processes
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            for key, capacity, period in buckets:
+                row = connection.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                levels.append(_refill(tokens, updated_at, capacity, period, now))
+
+            retry_after = _take(levels, buckets)
+            if not retry_after:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at, period) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(key, level - 1, now, period) for level, (key, _, period) in zip(levels, buckets)]
+                )
+
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                connection.execute("DELETE FROM rate_limit_buckets WHERE ? - updated_at >= period", (now,))
+            connection.execute("COMMIT")
+            return retry_after
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def reset(self) -> None:
+        connection = self._connect()
+        connection.execute("DELETE FROM rate_limit_buckets")
+
+
+class RateLimiter:
+    """Applies per-scope limits to IP and email buckets."""
+
+    def __init__(self, backend=None, limits: Optional[Mapping[str, Mapping[str, str]]] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            backend: Bucket storage; defaults to MemoryBackend
+            limits: scope -> kind ('ip' or 'email') -> "capacity/period_seconds"
+            clock: Wall-clock time source (shared between processes)
+        """
+        self.backend = backend or MemoryBackend()
+        self.clock = clock
+        self.enabled = True
+        self.limits = {}
+        self.set_limits(limits or DEFAULT_LIMITS)
+        self.stats = {'allowed': 0, 'limited': 0, 'errors': 0}
+
+    def set_limits(self, limits: Mapping[str, Mapping[str, str]]) -> None:
+        """Replace the limits for every scope."""
+        self.limits = {
+            scope: {kind: parse_limit(value) for kind, value in kinds.items() if value}
+            for scope, kinds in limits.items()
+        }
+
+    def configure(self, settings: Mapping[str, Any]) -> None:
+        """
+        Apply RATE_LIMIT_* settings.
+
+        Limits are read from RATE_LIMIT_<SCOPE>_PER_<KIND>, e.g.
+        RATE_LIMIT_OTP_SEND_PER_EMAIL = "3/600"; an empty value disables
+        that bucket.
+
+        Args:
+            settings (Mapping): Configuration values, normally app.config
+        """
+        self.enabled = settings.get('RATE_LIMIT_ENABLED', True)
+        self.set_limits({
+            scope: {
+                kind: settings.get(f"RATE_LIMIT_{scope.upper()}_PER_{kind.upper()}", default)
+                for kind, default in kinds.items()
+            }
+            for scope, kinds in DEFAULT_LIMITS.items()
+        })
+
+        if settings.get('RATE_LIMIT_BACKEND', 'memory') == 'sqlite':
+            path = settings.get('RATE_LIMIT_SQLITE_PATH') or os.path.join(
+                tempfile.gettempdir(), 'campus_connect_rate_limits.db'
+            )
+            self.backend = SQLiteBackend(path)
+        else:
+            self.backend = MemoryBackend()
+
+    def hit(self, scope: str, ip: Optional[str] = None, email: Optional[str] = None) -> float:
+        """
+        Take one token from each of the scope's IP and email buckets.
+
+        Args:
+            scope: Limit scope, e.g. 'otp_send'
+            ip: Client IP address, if known
+            email: Email address the call targets, if any
+
+        Returns:
+            float: 0 if the call is allowed, otherwise seconds to wait
+        """
+        if not self.enabled:
+            return 0.0
+
+        limits = self.limits.get(scope, {})
+        values = {'ip': ip, 'email': email.strip().lower() if email else None}
+        buckets = [
+            (f"{scope}:{kind}:{values[kind]}", capacity, period)
+            for kind, (capacity, period) in limits.items()
+            if values.get(kind)
+        ]
+        if not buckets:
+            return 0.0
+
+        try:
+            retry_after = self.backend.acquire(buckets, self.clock())
+        except Exception as e:
+            # Fail open: a broken limiter must not lock users out
+            self.stats['errors'] += 1
+            logger.error(f"Rate limiter error for {scope}: {str(e)}")
+            return 0.0
+
+        self.stats['limited' if retry_after else 'allowed'] += 1
+        if retry_after:
+            logger.info(f"Rate limited {scope} for ip={ip} email={values['email']}")
+        return retry_after
+
+    def reset(self) -> None:
+        """Empty every bucket."""
+        self.backend.reset()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the backend, limits and allow/limit counters."""
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__,
+            'limits': self.limits,
+            **self.stats
+        }
+
+
+# Process-wide limiter used by rate_limited()
+rate_limiter = RateLimiter()
+
+
+def get_client_ip() -> Optional[str]:
+    """Return the client IP of the current request, if there is one."""
+    if not has_request_context():
+        return None
+    return request.remote_addr
+
+
+def rate_limited(scope: str) -> Callable:
+    """
+    Throttle a service method per client IP and per its `email` argument.
+
+    When the limit is hit the method is not called; it returns a failure
+    result with error 'rate_limited' and 'retry_after' in whole seconds,
+    which routes turn into a 429 with a Retry-After header. Apply it below
+    @classmethod.
+
+    Args:
+        scope: Limit scope, a key of DEFAULT_LIMITS
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            email = signature.bind_partial(*args, **kwargs).arguments.get('email')
+            retry_after = rate_limiter.hit(scope, ip=get_client_ip(), email=email)
+            if retry_after:
+                seconds = max(1, int(retry_after + 0.999))
+                return {
+                    'success': False,
+                    'error': 'rate_limited',
+                    'message': f'Too many attempts. Please try again in {seconds} seconds.',
+                    'retry_after': seconds
+                }
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def init_rate_limiter(app) -> None:
+    """
+    Configure the rate limiter from a Flask application's config.
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    rate_limiter.configure(app.config)
@@ -0,0 +1,167 @@
+"""
+Background cleanup of expired authentication data.
+
+Every OTP request and login adds a row to otp_codes or user_sessions, and
+nothing removed them once they stopped being usable. AuthDataReaper deletes
+expired or used OTP codes and inactive or expired sessions in small
+chunks, each in its own transaction so writers are never blocked for long,
+and records table sizes after each run. Token revocations are deleted once
+every token they could cover has expired, and sent or failed outbound
+emails once they are older than the grace period.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import or_
+
+from app.database import get_db, get_table_sizes
+from app.models.auth_models import OTPCode, OutboundEmail, RevokedToken, UserSession
+
+logger = logging.getLogger(__name__)
+
+
+class AuthDataReaper:
+    """Deletes dead OTP codes, sessions and finished emails in chunks."""
+
+    def __init__(self, batch_size: int = 500, grace_minutes: int = 60, interval_seconds: int = 3600):
+        """
+        Args:
+            batch_size: Rows deleted per transaction
+            grace_minutes: How long expired or used rows are kept before deletion
+            interval_seconds: Time between background runs
+        """
+        self.batch_size = batch_size
+        self.grace_minutes = grace_minutes
+        self.interval_seconds = interval_seconds
+        self.last_run = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def configure(self, settings) -> None:
+        """
+        Apply AUTH_REAPER_* settings.
+
+        Args:
+            settings (Mapping): Configuration values, normally app.config
+        """
+        self.batch_size = settings.get('AUTH_REAPER_BATCH_SIZE', self.batch_size)
+        self.grace_minutes = settings.get('AUTH_REAPER_GRACE_MINUTES', self.grace_minutes)
+        self.interval_seconds = settings.get('AUTH_REAPER_INTERVAL_SECONDS', self.interval_seconds)
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Delete dead OTP codes, sessions, revocations and delivered emails,
+        then measure table sizes.
+
+        Returns:
+            dict: Rows deleted per table, table sizes and timing
+        """
+        started = datetime.utcnow()
+        cutoff = started - timedelta(minutes=self.grace_minutes)
+
+        deleted = {
+            'otp_codes': self._delete_in_chunks(
+                OTPCode,
+                or_(
+                    OTPCode.expires_at < cutoff,
+                    (OTPCode.is_used == True) & (OTPCode.used_at < cutoff)
+                )
+            ),
+            'user_sessions': self._delete_in_chunks(
+                UserSession,
+                or_(
+                    UserSession.expires_at < cutoff,
+                    (UserSession.is_active == False) & (UserSession.last_used < cutoff)
+                )
+            ),
+            'revoked_tokens': self._delete_in_chunks(RevokedToken, RevokedToken.expires_at < started),
+            'outbound_emails': self._delete_in_chunks(
+                OutboundEmail,
+                OutboundEmail.status.in_(['sent', 'failed']) & (OutboundEmail.updated_at < cutoff)
+            ),
+        }
+
+        self.last_run = {
+            'started_at': started.isoformat(),
+            'duration_ms': round((datetime.utcnow() - started).total_seconds() * 1000, 1),
+            'deleted': deleted,
+            'table_sizes': get_table_sizes(),
+        }
+        logger.info(f"Auth data reaper deleted {deleted}; table sizes {self.last_run['table_sizes']}")
+        return self.last_run
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the settings and the outcome of the last run."""
+        return {
+            'running': self.running,
+            'batch_size': self.batch_size,
+            'grace_minutes': self.grace_minutes,
+            'interval_seconds': self.interval_seconds,
+            'last_run': self.last_run,
+        }
+
+    def _delete_in_chunks(self, model, condition) -> int:
+        """Delete matching rows batch_size at a time; return the number deleted."""
+        total = 0
+        while True:
+            with get_db() as db:
+                ids = [row[0] for row in db.query(model.id).filter(condition).limit(self.batch_size).all()]
+                if ids:
+                    db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            total += len(ids)
+            if len(ids) < self.batch_size:
+                return total
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app) -> None:
+        """
+        Run the reaper every interval_seconds in a background thread.
+
+        Args:
+            app (Flask): Application whose database the reaper cleans
+        """
+        if self.running:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(app,), name='auth-data-reaper', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, app) -> None:
+        while not self._stop.is_set():
+            try:
+                with app.app_context():
+                    self.run_once()
+            except Exception as e:
+                logger.error(f"Auth data reaper error: {str(e)}")
+            self._stop.wait(self.interval_seconds)
+
+
+# Process-wide reaper
+auth_reaper = AuthDataReaper()
+
+
+def init_reaper(app) -> None:
+    """
+    Configure the reaper and start it unless disabled in config.
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    auth_reaper.configure(app.config)
+    if app.config.get('AUTH_REAPER_ENABLED', True):
+        auth_reaper.start(app)
@@ -0,0 +1,221 @@
+"""
+In-process cache of verified session tokens.
+
+AuthService.verify_session runs on every authenticated request. This module
+keeps recently verified sessions in a bounded LRU with a TTL so repeat
+lookups skip the user_sessions and users tables, and coalesces last_used
+updates so each session is written back at most once per flush interval.
+
+Entries are keyed on a SHA-256 digest of the token, so raw tokens are never
+held in memory beyond the request that presented them. The cache is per
+process: logout, session extension and deactivation evict entries here
+once their transaction commits, and the TTL bounds how long another worker
+process can serve a stale entry. Evictions leave short-lived tombstones so
+a verification that read the session before the commit cannot re-cache it.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+
+
+def hash_token(session_token: str) -> str:
+    """Return the cache key for a session token."""
+    return hashlib.sha256(session_token.encode('utf-8')).hexdigest()
+
+
+class SessionCache:
+    """Thread-safe LRU/TTL cache of verified sessions."""
+
+    # How long an eviction blocks put() calls whose database read predates it
+    TOMBSTONE_SECONDS = 60
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 300,
+                 last_used_flush_seconds: int = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.last_used_flush_seconds = last_used_flush_seconds
+        self._entries = OrderedDict()  # token hash -> entry dict
+        self._keys_by_user = {}  # user id -> set of token hashes
+        self._evicted_keys = {}  # token hash -> monotonic time of eviction
+        self._evicted_users = {}  # user id -> monotonic time of eviction
+        self._lock = threading.Lock()
+
+    def configure(self, settings: Mapping[str, Any]) -> None:
+        """
+        Apply SESSION_CACHE_* settings and drop existing entries.
+
+        Args:
+            settings (Mapping): Configuration values, normally app.config
+        """
+        with self._lock:
+            self.max_entries = settings.get('SESSION_CACHE_MAX_ENTRIES', self.max_entries)
+            self.ttl_seconds = settings.get('SESSION_CACHE_TTL_SECONDS', self.ttl_seconds)
+            self.last_used_flush_seconds = settings.get(
+                'SESSION_LAST_USED_FLUSH_SECONDS', self.last_used_flush_seconds
+            )
+            self._clear_locked()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are cached at all."""
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, session_token: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a verified session.
+
+        Args:
+            session_token: Raw session token
+
+        Returns:
+            Copy of the cached entry, or None on a miss, TTL expiry or
+            session expiry
+        """
+        key = hash_token(session_token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if now - entry['cached_at'] > self.ttl_seconds or datetime.utcnow() > entry['expires_at']:
+                self._remove_locked(key)
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry)
+
+    @staticmethod
+    def clock() -> float:
+        """Current time on the cache's clock, for put(read_at=...)."""
+        return time.monotonic()
+
+    def put(self, session_token: str, session_id: str, user_id: str,
+            user_data: Dict[str, Any], expires_at: datetime,
+            read_at: Optional[float] = None) -> None:
+        """
+        Cache a session that was just verified against the database.
+
+        The database path always writes last_used, so the flush clock for
+        the entry starts now.
+
+        Args:
+            read_at: clock() value taken before the database read; the
+                entry is not cached if the session or user was evicted
+                since then
+        """
+        if not self.enabled:
+            return
+
+        key = hash_token(session_token)
+        now = time.monotonic()
+        with self._lock:
+            if read_at is not None and (
+                self._evicted_keys.get(key, float('-inf')) >= read_at
+                or self._evicted_users.get(user_id, float('-inf')) >= read_at
+            ):
+                return
+            self._remove_locked(key)
+            self._entries[key] = {
+                'session_id': session_id,
+                'user_id': user_id,
+                'user_data': user_data,
+                'expires_at': expires_at,
+                'cached_at': now,
+                'last_used_flushed_at': now,
+            }
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove_locked(oldest_key)
+
+    def claim_last_used_flush(self, session_token: str) -> bool:
+        """
+        Decide whether this hit should write last_used back to the database.
+
+        Returns True at most once per flush interval per session; the caller
+        that gets True is responsible for the write.
+        """
+        key = hash_token(session_token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry['last_used_flushed_at'] < self.last_used_flush_seconds:
+                return False
+            entry['last_used_flushed_at'] = now
+            return True
+
+    def update_expiry(self, session_token: str, expires_at: datetime) -> None:
+        """Record a new expiry for a cached session (after extension)."""
+        key = hash_token(session_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['expires_at'] = expires_at
+
+    def evict(self, session_token: str) -> None:
+        """Drop one session (after logout)."""
+        key = hash_token(session_token)
+        with self._lock:
+            self._remove_locked(key)
+            self._evicted_keys[key] = time.monotonic()
+            self._prune_tombstones_locked()
+
+    def evict_user(self, user_id: str) -> None:
+        """Drop every session of a user (after deactivation or profile changes)."""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove_locked(key)
+            self._evicted_users[user_id] = time.monotonic()
+            self._prune_tombstones_locked()
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and settings for diagnostics."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'last_used_flush_seconds': self.last_used_flush_seconds,
+            }
+
+    def _remove_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_keys = self._keys_by_user.get(entry['user_id'])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[entry['user_id']]
+
+    def _prune_tombstones_locked(self) -> None:
+        cutoff = time.monotonic() - self.TOMBSTONE_SECONDS
+        for tombstones in (self._evicted_keys, self._evicted_users):
+            for name in [name for name, evicted_at in tombstones.items() if evicted_at < cutoff]:
+                del tombstones[name]
+
+    def _clear_locked(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+
+# Process-wide cache used by AuthService
+session_cache = SessionCache()
+
+
+def init_session_cache(app) -> None:
+    """
+    Configure the session cache from a Flask application's config.
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    session_cache.configure(app.config)
@@ -0,0 +1,227 @@
+"""
+Pool of authenticated SMTP connections.
+
+Opening an SMTP session costs a TCP connect, a TLS handshake and AUTH.
+SMTPConnectionPool keeps sessions open between messages, checks idle ones
+with NOOP before reuse, and replaces a session when the server drops it
+(421, disconnect or timeout). send_bulk() pushes a batch of messages
+through a single session.
+"""
+
+import logging
+import smtplib
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from typing import Callable, Dict, Generator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def is_connection_error(error: Exception) -> bool:
+    """
+    Check whether an SMTP error means the session itself is unusable.
+
+    Message-level errors (refused recipients, rejected data) leave the
+    session usable; 421 replies, disconnects and timeouts do not.
+    """
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    return isinstance(error, (smtplib.SMTPServerDisconnected, socket.timeout, TimeoutError, ConnectionError))
+
+
+class _PooledConnection:
+    """An open SMTP session with usage bookkeeping."""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of reusable SMTP sessions."""
+
+    def __init__(
+        self,
+        factory: Callable[[], smtplib.SMTP],
+        max_size: int = 4,
+        max_idle_seconds: float = 240,
+        noop_after_seconds: float = 30,
+        max_messages_per_connection: int = 100
+    ):
+        """
+        Args:
+            factory: Opens a connected, authenticated SMTP session
+            max_size: Maximum number of open sessions
+            max_idle_seconds: Idle sessions older than this are closed, not reused
+            noop_after_seconds: Idle sessions older than this are checked with NOOP
+            max_messages_per_connection: Sessions are recycled after this many messages
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.noop_after_seconds = noop_after_seconds
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle = []  # Most recently used last
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.stats = {'opened': 0, 'reused': 0, 'discarded': 0, 'sent': 0}
+
+    @contextmanager
+    def connection(self) -> Generator[_PooledConnection, None, None]:
+        """
+        Check out a healthy session, returning it to the pool afterwards.
+
+        Sessions that raise a connection error are closed instead of
+        being returned.
+        """
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except Exception as e:
+            if conn is not None and is_connection_error(e):
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._checkin(conn)
+            self._slots.release()
+
+    def send(self, message: Message) -> None:
+        """
+        Send one message, reconnecting once if the session was dropped.
+
+        Raises:
+            Exception: The SMTP error if the message could not be sent
+        """
+        for attempt in range(2):
+            try:
+                with self.connection() as conn:
+                    self._send_on(conn, message)
+                return
+            except Exception as e:
+                if attempt or not is_connection_error(e):
+                    raise
+                logger.info(f"SMTP session dropped ({str(e)}), reconnecting")
+
+    def send_bulk(self, messages: List[Message]) -> List[Optional[str]]:
+        """
+        Send many messages through one session.
+
+        The session is replaced if the server drops it or it reaches
+        max_messages_per_connection; a message interrupted by a dropped
+        session is retried once on the new one.
+
+        Args:
+            messages: Messages to send
+
+        Returns:
+            List with None for each delivered message, or its error text
+        """
+        results = []
+        remaining = list(messages)
+        while remaining:
+            try:
+                with self.connection() as conn:
+                    while remaining and conn.messages_sent < self.max_messages_per_connection:
+                        message = remaining[0]
+                        try:
+                            self._send_on(conn, message)
+                            results.append(None)
+                        except Exception as e:
+                            if is_connection_error(e):
+                                raise
+                            results.append(str(e) or e.__class__.__name__)
+                        remaining.pop(0)
+            except Exception as e:
+                if not is_connection_error(e) or not remaining:
+                    # The session could not be opened; fail the rest of the batch
+                    error = str(e) or e.__class__.__name__
+                    results.extend(error for _ in remaining)
+                    break
+                # Retry the interrupted message once on a fresh session
+                message = remaining.pop(0)
+                try:
+                    self.send(message)
+                    results.append(None)
+                except Exception as retry_error:
+                    results.append(str(retry_error) or retry_error.__class__.__name__)
+        return results
+
+    def close_all(self) -> None:
+        """Close every idle session."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    def _send_on(self, conn: _PooledConnection, message: Message) -> None:
+        conn.server.send_message(message)
+        conn.messages_sent += 1
+        conn.last_used = time.monotonic()
+        self._count('sent')
+
+    def _checkout(self) -> _PooledConnection:
+        """Take the most recently used healthy session, or open a new one."""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                break
+
+            idle_for = time.monotonic() - conn.last_used
+            if idle_for > self.max_idle_seconds or conn.messages_sent >= self.max_messages_per_connection:
+                self._discard(conn)
+                continue
+            if idle_for > self.noop_after_seconds and not self._is_alive(conn):
+                self._discard(conn)
+                continue
+
+            self._count('reused')
+            return conn
+
+        conn = _PooledConnection(self.factory())
+        self._count('opened')
+        return conn
+
+    def _checkin(self, conn: _PooledConnection) -> None:
+        if conn.messages_sent >= self.max_messages_per_connection:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    def _is_alive(self, conn: _PooledConnection) -> bool:
+        try:
+            code, _ = conn.server.noop()
+            return code == 250
+        except Exception:
+            return False
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _discard(self, conn: _PooledConnection) -> None:
+        self._count('discarded')
+        self._close(conn)
+
+    def _close(self, conn: _PooledConnection) -> None:
+        try:
+            conn.server.quit()
+        except Exception:
+            try:
+                conn.server.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return pool counters and the number of idle sessions."""
+        with self._lock:
+            return dict(self.stats, idle=len(self._idle))
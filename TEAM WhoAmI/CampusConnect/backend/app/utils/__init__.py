@@ -14,6 +14,7 @@ from .helpers import (
     create_bad_request_response,
     create_method_not_allowed_response,
     handle_request_validation,
+    get_bool_arg,
     safe_dict_conversion,
     format_list_response,
     format_single_item_response
@@ -28,6 +29,7 @@ __all__ = [
     'create_bad_request_response',
     'create_method_not_allowed_response',
     'handle_request_validation',
+    'get_bool_arg',
     'safe_dict_conversion',
     'format_list_response',
     'format_single_item_response'
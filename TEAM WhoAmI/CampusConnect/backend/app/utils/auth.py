@@ -0,0 +1,100 @@
+"""
+Request authentication middleware.
+
+Resolves the current user from a signed access token in the Authorization
+header before each request, without a database lookup. Routes read the
+result through get_current_user_id(). Requests carrying an access token
+that fails verification are rejected with 401.
+"""
+
+from typing import Optional
+
+from flask import g, has_request_context, request
+
+from app.utils.tokens import (
+    DatabaseRevocationStore,
+    InvalidTokenError,
+    decode_access_token,
+    looks_like_access_token,
+    revoked_tokens
+)
+
+# Endpoints that take the session token in the body, so a stale access
+# token in the header must not lock the client out of them
+TOKEN_EXEMPT_ENDPOINTS = {
+    'auth.refresh_access_token',
+    'auth.logout',
+    'auth.verify_session',
+}
+
+
+def get_bearer_token() -> Optional[str]:
+    """Return the Bearer token from the Authorization header, if any."""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header[7:].strip() or None
+    return None
+
+
+def get_current_user_id(default: Optional[str] = None) -> Optional[str]:
+    """
+    Return the authenticated user for the current request.
+
+    Without an access token, falls back to the X-User-ID header used
+    before access tokens existed, then to default. Requests with an
+    invalid access token never get here; the middleware rejects them.
+
+    Args:
+        default (str, optional): Value returned when no user is identified
+
+    Returns:
+        str: User ID, or default
+    """
+    if not has_request_context():
+        return default
+    return g.get('current_user_id') or request.headers.get('X-User-ID', default)
+
+
+def init_auth_middleware(app) -> None:
+    """
+    Resolve the current user from access tokens on every request.
+
+    Sets g.current_user_id and g.access_token_claims for a valid token.
+    An invalid, expired or revoked token gets a 401 instead of falling
+    back to anonymous or header-based identification. Requests without a
+    token pass through; routes decide whether authentication is required.
+
+    Args:
+        app (Flask): Flask application instance
+    """
+    revoked_tokens.configure(
+        max_age=app.config['JWT_ACCESS_TOKEN_EXPIRES'],
+        sync_seconds=app.config.get('TOKEN_REVOCATION_SYNC_SECONDS', 5),
+        store=DatabaseRevocationStore()
+    )
+
+    @app.before_request
+    def _resolve_current_user():
+        g.current_user_id = None
+        g.access_token_claims = None
+
+        token = get_bearer_token()
+        if not token or not looks_like_access_token(token):
+            return None
+
+        try:
+            claims = decode_access_token(token, app.config['JWT_SECRET_KEY'])
+        except InvalidTokenError as e:
+            g.auth_error = str(e)
+            if request.endpoint in TOKEN_EXEMPT_ENDPOINTS:
+                return None
+            from app.utils.helpers import create_error_response
+            return create_error_response(
+                message=str(e),
+                error_code="UNAUTHORIZED",
+                status_code=401
+            )
+
+        g.current_user_id = claims['sub']
+        g.access_token_claims = claims
+        return None
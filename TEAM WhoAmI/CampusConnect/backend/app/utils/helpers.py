@@ -13,7 +13,8 @@ from app.models.data_models import ApiResponse, ApiErrorResponse
 def create_success_response(
     message: str,
     data: Optional[Any] = None,
-    status_code: int = 200
+    status_code: int = 200,
+    pagination: Optional[Dict[str, Any]] = None
 ) -> tuple:
     """
     Create a standardized success response.
@@ -22,6 +23,7 @@ def create_success_response(
         message (str): Success message
         data (Any, optional): Response data
         status_code (int): HTTP status code (default: 200)
+        pagination (Dict, optional): Cursor metadata for paginated lists
         
     Returns:
         tuple: (JSON response, status_code)
@@ -34,6 +36,9 @@ def create_success_response(
     if data is not None:
         response_data['data'] = data
     
+    if pagination is not None:
+        response_data['pagination'] = pagination
+    
     return jsonify(response_data), status_code
 
 
@@ -146,6 +151,26 @@ def create_bad_request_response(message: str, details: Optional[Dict[str, Any]]
     )
 
 
+def create_rate_limited_response(message: str, retry_after: int) -> tuple:
+    """
+    Create a standardized 429 too many requests response.
+    
+    Args:
+        message (str): Error message
+        retry_after (int): Seconds the client should wait before retrying
+        
+    Returns:
+        tuple: (JSON response, status_code, headers)
+    """
+    response, status_code = create_error_response(
+        message=message,
+        error_code="TOO_MANY_REQUESTS",
+        status_code=429,
+        details={"retry_after": retry_after}
+    )
+    return response, status_code, {"Retry-After": str(retry_after)}
+
+
 def create_method_not_allowed_response(allowed_methods: list = None) -> tuple:
     """
     Create a standardized 405 method not allowed response.
@@ -193,6 +218,24 @@ def handle_request_validation(request, required_json: bool = True) -> Optional[t
     return None
 
 
+def get_bool_arg(request, name: str, default: bool = False) -> bool:
+    """
+    Read a boolean query string argument.
+    
+    Args:
+        request: Flask request object
+        name (str): Query parameter name
+        default (bool): Value used when the parameter is absent
+        
+    Returns:
+        bool: True for '1', 'true', 'yes' or 'on' (case-insensitive)
+    """
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 def safe_dict_conversion(obj: Any) -> Any:
     """
     Safely convert Pydantic models to dictionaries for JSON serialization.
@@ -220,7 +263,8 @@ def safe_dict_conversion(obj: Any) -> Any:
 def format_list_response(
     items: list,
     message: str = None,
-    resource_name: str = "items"
+    resource_name: str = "items",
+    pagination: Optional[Dict[str, Any]] = None
 ) -> tuple:
     """
     Format a list of items into a standardized response.
@@ -229,6 +273,7 @@ def format_list_response(
         items (list): List of items to return
         message (str, optional): Custom success message
         resource_name (str): Name of the resource for default message
+        pagination (Dict, optional): Cursor metadata for paginated lists
         
     Returns:
         tuple: (JSON response, status_code)
@@ -242,7 +287,8 @@ def format_list_response(
     return create_success_response(
         message=message,
         data=items_data,
-        status_code=200
+        status_code=200,
+        pagination=pagination
     )
 
 
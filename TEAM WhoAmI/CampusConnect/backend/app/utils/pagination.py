@@ -0,0 +1,115 @@
+"""
+Cursor pagination utilities for feed endpoints.
+
+This module provides keyset pagination over (created_at, id) so feed pages
+are fetched with an index range scan instead of OFFSET, and stay stable
+while new rows are inserted at the head of the feed.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """
+    Encode a feed position into an opaque cursor string.
+    
+    Args:
+        created_at (datetime): Creation timestamp of the last item on the page
+        item_id (str): ID of the last item on the page
+        
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = f"{created_at.isoformat()}|{item_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor (str): Cursor from a previous page
+        
+    Returns:
+        Tuple[datetime, str]: The (created_at, id) position
+        
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|', 1)
+        return datetime.fromisoformat(created_at), item_id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def clamp_page_size(limit: Optional[int], default: int, maximum: int) -> int:
+    """
+    Bound a requested page size.
+    
+    Args:
+        limit (int, optional): Requested page size
+        default (int): Page size used when none was requested
+        maximum (int): Largest page size allowed
+        
+    Returns:
+        int: Page size between 1 and maximum
+    """
+    if limit is None:
+        return default
+    return max(1, min(limit, maximum))
+
+
+def paginate_by_created(
+    query,
+    model,
+    after: Optional[Tuple[datetime, str]],
+    limit: int
+) -> Dict[str, Any]:
+    """
+    Fetch one page of a query ordered newest first.
+    
+    Args:
+        query: SQLAlchemy query over model, with filters already applied
+        model: Mapped class with created_at and id columns
+        after (Tuple, optional): Decoded (created_at, id) of the previous page's last item
+        limit (int): Page size
+        
+    Returns:
+        Dict: {'items': [...], 'next_cursor': str or None, 'has_more': bool}
+    """
+    if after:
+        created_at, item_id = after
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < item_id)
+        ))
+    
+    rows: List[Any] = (
+        query.order_by(model.created_at.desc(), model.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    return {
+        'items': rows,
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    }
@@ -0,0 +1,271 @@
+"""
+Signed access token utilities.
+
+Access tokens are compact HS256 JWTs signed with JWT_SECRET_KEY. They are
+short-lived and verified without touching the database; the long-lived
+session_token stored in user_sessions is what gets exchanged for a fresh
+one. A revocation list covers emergency logout before a token's natural
+expiry; it is checked in memory and, once configured with a store, shared
+with other worker processes through the revoked_tokens table.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HEADER = {'alg': 'HS256', 'typ': 'JWT'}
+
+
+class InvalidTokenError(ValueError):
+    """Raised when an access token is malformed, forged, expired or revoked."""
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def _sign(signing_input: bytes, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode('utf-8'), signing_input, hashlib.sha256).digest())
+
+
+def looks_like_access_token(token: str) -> bool:
+    """Tell access tokens apart from session tokens, which contain no dots."""
+    return token.count('.') == 2
+
+
+def encode_access_token(user_id: str, session_id: str, secret: str, expires_in: int,
+                        extra_claims: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Create a signed access token.
+
+    Args:
+        user_id (str): User the token authenticates (sub claim)
+        session_id (str): UserSession the token was issued from (sid claim)
+        secret (str): Signing key
+        expires_in (int): Lifetime in seconds
+        extra_claims (dict, optional): Additional claims such as email
+
+    Returns:
+        str: Encoded token
+    """
+    # Sub-second iat so a login right after a user revocation is not caught by it
+    now = time.time()
+    claims = dict(extra_claims or {})
+    claims.update({
+        'sub': user_id,
+        'sid': session_id,
+        'jti': secrets.token_urlsafe(12),
+        'iat': now,
+        'exp': int(now) + expires_in,
+        'type': 'access',
+    })
+    signing_input = '.'.join([
+        _b64encode(json.dumps(_HEADER, separators=(',', ':')).encode('utf-8')),
+        _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8')),
+    ]).encode('ascii')
+    return f"{signing_input.decode('ascii')}.{_sign(signing_input, secret)}"
+
+
+def decode_access_token(token: str, secret: str) -> Dict[str, Any]:
+    """
+    Verify an access token and return its claims.
+
+    Args:
+        token (str): Encoded token
+        secret (str): Signing key
+
+    Returns:
+        dict: Token claims
+
+    Raises:
+        InvalidTokenError: If the signature, expiry, type or revocation
+            check fails
+    """
+    try:
+        header_segment, claims_segment, signature = token.split('.')
+        signing_input = f"{header_segment}.{claims_segment}".encode('ascii')
+        if not hmac.compare_digest(signature, _sign(signing_input, secret)):
+            raise InvalidTokenError("Invalid token signature")
+        header = json.loads(_b64decode(header_segment))
+        claims = json.loads(_b64decode(claims_segment))
+    except InvalidTokenError:
+        raise
+    except (ValueError, UnicodeError, binascii.Error) as e:
+        raise InvalidTokenError("Malformed access token") from e
+
+    if header.get('alg') != 'HS256' or claims.get('type') != 'access':
+        raise InvalidTokenError("Unsupported token type")
+    if not isinstance(claims.get('exp'), int) or claims['exp'] <= time.time():
+        raise InvalidTokenError("Access token expired")
+    if revoked_tokens.is_revoked(claims):
+        raise InvalidTokenError("Access token revoked")
+    return claims
+
+
+class DatabaseRevocationStore:
+    """Keeps revocations in the revoked_tokens table so every worker sees them."""
+
+    def save(self, kind: str, value: str, revoked_at: float, expires_at: float, db=None) -> None:
+        """
+        Record a revocation.
+
+        Args:
+            db (Session, optional): Session to add the row to, so it commits
+                with the caller's transaction; a new one is opened otherwise
+        """
+        from app.database import get_db
+        from app.models.auth_models import RevokedToken
+
+        row = RevokedToken(kind=kind, value=value, revoked_at=revoked_at,
+                           expires_at=datetime.utcfromtimestamp(expires_at))
+        if db is not None:
+            db.add(row)
+            return
+        with get_db() as db:
+            db.add(row)
+
+    def load_since(self, since: float) -> List[Tuple[str, str, float, float]]:
+        """Return unexpired (kind, value, revoked_at, expires_at) rows revoked at or after since."""
+        from sqlalchemy import select
+        from app import database
+        from app.models.auth_models import RevokedToken
+
+        query = select(RevokedToken.kind, RevokedToken.value, RevokedToken.revoked_at, RevokedToken.expires_at).where(
+            RevokedToken.revoked_at >= since,
+            RevokedToken.expires_at > datetime.utcnow()
+        )
+        # A separate connection, so checks never join a caller's transaction
+        with database.engine.connect() as connection:
+            rows = connection.execute(query).all()
+        epoch = datetime(1970, 1, 1)
+        return [(kind, value, revoked_at, (expires_at - epoch).total_seconds())
+                for kind, value, revoked_at, expires_at in rows]
+
+
+class RevocationList:
+    """
+    Revoked access tokens.
+
+    Tokens can be revoked individually (jti), per session (sid) or per user
+    (every token issued before now). Entries only need to outlive the
+    longest access token, so each one is dropped after max_age seconds.
+
+    Checks run against memory. With a store configured, revocations are
+    also saved there and other processes' revocations are loaded every
+    sync_seconds, so a revocation reaches every worker within that delay.
+    """
+
+    # Revocations are loaded with this much overlap, covering rows whose
+    # transaction committed a while after their revoked_at
+    SYNC_OVERLAP_SECONDS = 60
+
+    def __init__(self, max_age: int = 3600, sync_seconds: float = 5, store=None):
+        self.max_age = max_age
+        self.sync_seconds = sync_seconds
+        self.store = store
+        self._entries = {}  # (kind, value) -> (revoked_at, forget_at)
+        self._lock = threading.Lock()
+        self._next_sync = 0.0
+        self._loaded_until = None  # Wall-clock time of the last successful load
+
+    def configure(self, max_age: int, sync_seconds: float, store=None) -> None:
+        """Apply settings and attach a shared store."""
+        with self._lock:
+            self.max_age = max_age
+            self.sync_seconds = sync_seconds
+            self.store = store
+            self._next_sync = 0.0
+            self._loaded_until = None
+
+    def revoke_token(self, jti: str, db=None) -> None:
+        """Revoke a single access token."""
+        self._add('jti', jti, db)
+
+    def revoke_session(self, session_id: str, db=None) -> None:
+        """Revoke every access token issued from a session."""
+        self._add('sid', session_id, db)
+
+    def revoke_user(self, user_id: str, db=None) -> None:
+        """Revoke every access token issued to a user so far."""
+        self._add('sub', user_id, db)
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        """Check decoded claims against the list."""
+        self._sync()
+        if not self._entries:
+            return False
+
+        with self._lock:
+            for kind in ('jti', 'sid', 'sub'):
+                entry = self._entries.get((kind, claims.get(kind)))
+                if entry is None:
+                    continue
+                # User revocations only cover tokens issued before them
+                if kind != 'sub' or claims.get('iat', 0) < entry[0]:
+                    return True
+        return False
+
+    def clear(self) -> None:
+        """Drop all revocations held in memory."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, kind: str, value: str, db=None) -> None:
+        now = time.time()
+        self._remember(kind, value, now, now + self.max_age)
+        self._purge()
+        if self.store is not None:
+            self.store.save(kind, value, now, now + self.max_age, db=db)
+
+    def _remember(self, kind: str, value: str, revoked_at: float, forget_at: float) -> None:
+        with self._lock:
+            current = self._entries.get((kind, value))
+            if current is None or current[0] < revoked_at:
+                self._entries[(kind, value)] = (revoked_at, forget_at)
+
+    def _purge(self) -> None:
+        """Drop revocations that have outlived every token they could cover."""
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (_, forget_at) in self._entries.items() if forget_at <= now]:
+                del self._entries[key]
+
+    def _sync(self) -> None:
+        """Load revocations made by other processes, at most every sync_seconds."""
+        now = time.time()
+        if self.store is None or now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_seconds
+
+        loaded_until = self._loaded_until
+        since = loaded_until - self.SYNC_OVERLAP_SECONDS if loaded_until is not None else 0
+        try:
+            rows = self.store.load_since(since)
+        except Exception as e:
+            logger.error(f"Failed to load token revocations: {str(e)}")
+            return
+        for kind, value, revoked_at, forget_at in rows:
+            self._remember(kind, value, revoked_at, forget_at)
+        self._loaded_until = now
+        self._purge()
+
+
+# Process-wide revocation list used by AuthService and the auth middleware
+revoked_tokens = RevocationList()
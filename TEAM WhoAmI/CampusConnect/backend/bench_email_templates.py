@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark OTP email template rendering.
+
+Renders 10k OTP emails with a full Jinja2 render per message and with the
+pre-rendered static parts used by EmailService, checks that both produce
+identical output, and compares cold template loading with and without a
+warm bytecode cache.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.email_templates import EmailTemplateRegistry, purpose_label
+
+RENDER_COUNT = 10000
+PURPOSES = ['signup', 'login', 'password_reset']
+EXPIRY_MINUTES = 10
+
+
+def full_render(registry, name, otp, purpose):
+    """Render both bodies with Jinja2 for every message."""
+    label = purpose_label(purpose)
+    context = {
+        'subject': f"Your CampusConnect {label.title()} Code",
+        'purpose_label': label,
+        'purpose_title': label.title(),
+        'expiry_minutes': EXPIRY_MINUTES,
+        'recipient_name': name,
+        'otp': otp,
+    }
+    return {
+        'subject': context['subject'],
+        'html': registry.render_full('otp.html', **context),
+        'text': registry.render_full('otp.txt', **context)
+    }
+
+
+def prerendered(registry, name, otp, purpose):
+    """Render both bodies from pre-rendered static parts."""
+    return registry.render_otp_email(name, otp, purpose, EXPIRY_MINUTES)
+
+
+def bench(label, fn):
+    """Render RENDER_COUNT emails with fn and print the timing."""
+    start = time.perf_counter()
+    for i in range(RENDER_COUNT):
+        fn(f"Student {i}", f"{i:06d}", PURPOSES[i % len(PURPOSES)])
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {RENDER_COUNT} emails  {elapsed * 1000:8.1f} ms  "
+          f"{elapsed / RENDER_COUNT * 1e6:6.1f} µs/email")
+    return elapsed
+
+
+def cold_load(cache_dir):
+    """Time loading both templates into a fresh registry."""
+    registry = EmailTemplateRegistry(cache_dir=cache_dir)
+    start = time.perf_counter()
+    registry.environment.get_template('otp.html')
+    registry.environment.get_template('otp.txt')
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the template rendering benchmark."""
+    print("Benchmarking email template rendering...")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        registry = EmailTemplateRegistry(cache_dir=cache_dir)
+
+        # Both paths must produce the same email, including HTML escaping
+        for purpose in PURPOSES:
+            args = ("Ana <O'Brien> & co", "123456", purpose)
+            if full_render(registry, *args) != prerendered(registry, *args):
+                print(f"✗ Pre-rendered output differs from a full render ({purpose})")
+                return False
+        print("✓ Pre-rendered output matches a full Jinja2 render")
+
+        full = bench("full render", lambda *args: full_render(registry, *args))
+        fast = bench("pre-rendered", lambda *args: prerendered(registry, *args))
+        print(f"✓ Pre-rendering is {full / fast:.1f}x faster per email")
+
+        # The first registry wrote bytecode for both templates
+        warm = cold_load(cache_dir)
+        with tempfile.TemporaryDirectory() as empty_dir:
+            cold = cold_load(empty_dir)
+        print(f"  template load: {cold * 1000:.2f} ms compiling, {warm * 1000:.2f} ms from bytecode cache")
+
+    return fast < full
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
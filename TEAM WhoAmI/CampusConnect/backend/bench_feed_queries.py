@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark the post feed serialization path.
+
+Seeds a throwaway SQLite database with increasing numbers of posts, likes
+and comments, then counts the SQL statements issued by the post listing
+endpoints. The query count should stay constant as the feed grows.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+from app import database
+from app.database import init_database, create_tables, get_db, repair_counters
+from app.models.auth_models import User, Post, Comment
+from app.services.post_service import PostService
+
+POST_COUNTS = [10, 100, 1000]
+LIKERS = 5
+COMMENTS_PER_POST = 3
+
+
+def seed(post_count: int) -> None:
+    """Insert post_count posts spread over a handful of authors."""
+    with get_db() as db:
+        users = []
+        for i in range(LIKERS):
+            user = User(
+                email=f"bench{i}@campus.edu",
+                first_name="Bench",
+                last_name=str(i),
+                full_name=f"Bench {i}",
+                major="Computer Science",
+                year_of_study="3rd Year",
+            )
+            user.set_password("password")
+            users.append(user)
+        db.add_all(users)
+        db.flush()
+
+        for i in range(post_count):
+            post = Post(
+                title=f"Post {i}",
+                description="Benchmark post",
+                category="general",
+                author_id=users[i % LIKERS].id,
+            )
+            post.liked_by_users.extend(users)
+            post.comments.extend(
+                Comment(content="Nice", author_id=users[j].id)
+                for j in range(COMMENTS_PER_POST)
+            )
+            db.add(post)
+
+
+def count_queries(fn):
+    """Run fn and return (result, statements executed, elapsed seconds)."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+    return result, len(statements), elapsed
+
+
+def main():
+    """Run the feed benchmark for each post count."""
+    print("Benchmarking post feed queries...")
+    author_id = None
+    counts = set()
+
+    for post_count in POST_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            init_database(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            create_tables()
+            seed(post_count)
+            repair_counters()
+
+            with get_db() as db:
+                author_id = db.query(User.id).first()[0]
+
+            listings = {
+                "get_all_posts": PostService.get_all_posts,
+                "get_posts_by_category": lambda: PostService.get_posts_by_category("general"),
+                "get_posts_by_author": lambda: PostService.get_posts_by_author(author_id),
+            }
+            for name, fn in listings.items():
+                posts, queries, elapsed = count_queries(fn)
+                assert all(p["likes"] == LIKERS and p["comments"] == COMMENTS_PER_POST for p in posts)
+                counts.add((name, queries))
+                print(f"  {post_count:>5} posts  {name:<22} {len(posts):>5} rows  "
+                      f"{queries} queries  {elapsed * 1000:8.1f} ms")
+
+            database.engine.dispose()
+
+    per_listing = {}
+    for name, queries in counts:
+        per_listing.setdefault(name, set()).add(queries)
+    if all(len(q) == 1 for q in per_listing.values()):
+        print("✓ Query count is constant as the feed grows")
+        return True
+
+    print("✗ Query count grows with the number of posts")
+    return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Expired authentication data cleanup script.
+Deletes expired or used OTP codes and inactive or expired sessions, then
+prints the size of every table. The application runs the same cleanup in
+the background; use this for a one-off run or from cron.
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import init_database, create_tables
+from app.services.reaper import AuthDataReaper
+from app.config import Config
+
+def main():
+    """Delete dead OTP codes and sessions."""
+    print("Reaping expired CampusConnect auth data...")
+    
+    try:
+        init_database(Config.SQLALCHEMY_DATABASE_URI, echo=False)
+        create_tables()
+        
+        reaper = AuthDataReaper(
+            batch_size=Config.AUTH_REAPER_BATCH_SIZE,
+            grace_minutes=Config.AUTH_REAPER_GRACE_MINUTES
+        )
+        result = reaper.run_once()
+        for table, rows in result['deleted'].items():
+            print(f"✓ {table}: {rows} row(s) deleted")
+        
+        print("\nTable sizes:")
+        for table, rows in result['table_sizes'].items():
+            print(f"  {table:<24} {rows}")
+        
+        print(f"\n🎉 Cleanup completed in {result['duration_ms']} ms!")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Cleanup failed: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Counter consistency repair script.
+Recomputes the like, comment, attendee and member counters from the
+association tables. Run after bulk imports or manual database edits.
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import init_database, create_tables, repair_counters
+from app.config import Config
+
+def main():
+    """Repair the denormalized counters."""
+    print("Repairing CampusConnect counters...")
+    
+    try:
+        init_database(Config.SQLALCHEMY_DATABASE_URI, echo=False)
+        create_tables()
+        
+        repaired = repair_counters()
+        for column, rows in repaired.items():
+            print(f"✓ {column}: {rows} row(s) corrected")
+        
+        print("\n🎉 Counter repair completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Counter repair failed: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
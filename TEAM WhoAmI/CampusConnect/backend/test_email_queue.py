@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test the outbound email queue against a local SMTP server.
+
+Runs an aiosmtpd server on localhost, requests an OTP and checks that the
+request returns before delivery, that the background worker delivers the
+message, and that failed deliveries are retried with backoff and finally
+marked as failed.
+"""
+
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+
+def free_port():
+    """Return a free TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+from app import create_app
+from app.config import ProductionConfig
+from app.database import get_db
+from app.models.auth_models import User, OTPCode, OutboundEmail
+from app.services.auth_service import AuthService
+from app.services.email_queue import EmailQueue, email_worker
+from app.services.reaper import AuthDataReaper
+
+
+def make_config(tmp_dir, smtp_port):
+    """Build a test configuration sending through the local SMTP server."""
+    class EmailQueueTestConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp_dir, 'email.db')}"
+        AUTH_REAPER_ENABLED = False
+        MAIL_SERVER = '127.0.0.1'
+        MAIL_PORT = smtp_port
+        MAIL_USE_TLS = False
+        MAIL_USERNAME = 'mailer@campus.edu'
+        MAIL_PASSWORD = 'secret'
+        MAIL_DEFAULT_SENDER = 'mailer@campus.edu'
+        EMAIL_QUEUE_WORKER_ENABLED = True
+        EMAIL_QUEUE_POLL_SECONDS = 1
+        EMAIL_QUEUE_RETRY_BASE_SECONDS = 1
+
+    return EmailQueueTestConfig
+
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps every delivered message."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 Message accepted for delivery'
+
+
+def authenticator(server, session, envelope, mechanism, auth_data):
+    """Accept the configured test credentials only."""
+    return AuthResult(success=auth_data.login == b'mailer@campus.edu' and auth_data.password == b'secret')
+
+
+def start_smtp(handler, port):
+    """Start a local SMTP server with AUTH enabled over plain text."""
+    controller = Controller(
+        handler,
+        hostname='127.0.0.1',
+        port=port,
+        authenticator=authenticator,
+        auth_require_tls=False
+    )
+    controller.start()
+    return controller
+
+
+def wait_for(predicate, timeout=10):
+    """Poll predicate until it returns a truthy value or timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = predicate()
+        if result:
+            return result
+        time.sleep(0.1)
+    return None
+
+
+def latest_email_id():
+    """Return the ID of the most recently queued email."""
+    with get_db() as db:
+        return db.query(OutboundEmail.id).order_by(OutboundEmail.created_at.desc()).first()[0]
+
+
+def test_email_queue():
+    """OTP emails are queued, delivered, retried and finally failed."""
+    handler = RecordingHandler()
+    port = free_port()
+    controller = start_smtp(handler, port)
+    tmp_dir = tempfile.mkdtemp(prefix="campus_connect_email_")
+
+    try:
+        app = create_app(make_config(tmp_dir, port))
+        with app.app_context():
+            with get_db() as db:
+                user = User(
+                    email="queue@campus.edu",
+                    first_name="Queue",
+                    last_name="Test",
+                    full_name="Queue Test",
+                    major="Computer Science",
+                    year_of_study="3rd Year",
+                    is_verified=True,
+                )
+                user.set_password("password")
+                db.add(user)
+
+            # Requesting an OTP only queues the email
+            start = time.perf_counter()
+            result = AuthService.send_authentication_otp("queue@campus.edu")
+            elapsed = time.perf_counter() - start
+            assert result['success'], result
+            print(f"✓ OTP request returned in {elapsed * 1000:.1f} ms")
+
+            # The worker delivers it in the background
+            email_id = latest_email_id()
+            status = wait_for(lambda: (EmailQueue.get_status(email_id) or {}).get('status') == 'sent')
+            assert status, EmailQueue.get_status(email_id)
+            with get_db() as db:
+                code = db.query(OTPCode.code).first()[0]
+            assert handler.messages and code in handler.messages[0].content.decode()
+            print("✓ Worker delivered the OTP email")
+
+            # The stored copy of the code is cleared once delivered
+            with get_db() as db:
+                email = db.query(OutboundEmail).filter(OutboundEmail.id == email_id).one()
+                assert email.html_content is None and email.text_content is None
+            print("✓ Sent email body cleared")
+
+            # Deliveries that fail are retried with backoff
+            controller.stop()
+            email_id = EmailQueue.enqueue("queue@campus.edu", "Retry test", text_content="Hello")
+            retried = wait_for(lambda: EmailQueue.get_status(email_id)['attempts'] >= 1
+                               and EmailQueue.get_status(email_id)['status'] == 'pending')
+            assert retried, EmailQueue.get_status(email_id)
+            assert EmailQueue.get_status(email_id)['last_error']
+            print("✓ Failed delivery recorded and scheduled for retry")
+
+            controller = start_smtp(handler, port)
+            status = wait_for(lambda: EmailQueue.get_status(email_id)['status'] == 'sent')
+            assert status, EmailQueue.get_status(email_id)
+            print(f"✓ Retry delivered after {EmailQueue.get_status(email_id)['attempts']} attempts")
+
+            # Emails give up after max_attempts
+            controller.stop()
+            email_id = EmailQueue.enqueue("queue@campus.edu", "Give up", text_content="Hello", max_attempts=2)
+            failed = wait_for(lambda: EmailQueue.get_status(email_id)['status'] == 'failed')
+            assert failed, EmailQueue.get_status(email_id)
+            print("✓ Email marked failed after max attempts")
+
+            print(f"✓ Queue stats: {EmailQueue.get_stats()}")
+
+            # Sent and failed emails are reaped after the grace period
+            reaped = AuthDataReaper(grace_minutes=0).run_once()['deleted']['outbound_emails']
+            assert reaped == 3, reaped
+            print("✓ Reaper deleted sent and failed emails")
+
+    finally:
+        email_worker.stop()
+        try:
+            controller.stop()
+        except Exception:
+            pass
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    """Run the email queue checks."""
+    print("Testing outbound email queue...")
+    try:
+        test_email_queue()
+        return True
+    except AssertionError as e:
+        print(f"✗ Email queue test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"✗ Email queue test errored: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test cursor pagination of the post and event feeds.
+
+Seeds feeds where several rows share one created_at second, some of them
+stored in the old second-resolution format, then follows next_cursor from
+the first page to the last and checks that every row is returned exactly
+once.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from app import create_app
+from app.config import ProductionConfig
+from app.database import create_tables, get_db
+from app.models.auth_models import Event, Post, User
+
+ROWS = 7
+PAGE_SIZE = 3
+LEGACY_CREATED_AT = '2026-01-01 12:00:00'
+
+
+def make_config(tmp_dir):
+    """Build a test configuration storing the database under tmp_dir."""
+    class FeedTestConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp_dir, 'feed.db')}"
+        EMAIL_QUEUE_WORKER_ENABLED = False
+        AUTH_REAPER_ENABLED = False
+
+    return FeedTestConfig
+
+
+def seed():
+    """Create ROWS posts and events; most share one second in the old format."""
+    with get_db() as db:
+        user = User(
+            email="feed@campus.edu",
+            first_name="Feed",
+            last_name="Test",
+            full_name="Feed Test",
+            major="Computer Science",
+            year_of_study="3rd Year",
+        )
+        user.set_password("password")
+        db.add(user)
+        db.flush()
+        for i in range(ROWS):
+            db.add(Post(title=f"post {i}", description="Feed test", category="general", author_id=user.id))
+            db.add(Event(title=f"event {i}", description="Feed test", category="academic", date="2026-01-01",
+                         time="12:00", location="Hall", organizer="Feed", max_attendees=10))
+
+    # Rows written by the old func.now() default: same second, no microseconds
+    with get_db() as db:
+        for table in ('posts', 'events'):
+            db.execute(text(f"UPDATE {table} SET created_at = :legacy WHERE title NOT LIKE '% 0'"),
+                       {'legacy': LEGACY_CREATED_AT})
+
+    with get_db() as db:
+        return {
+            'posts': {post_id for (post_id,) in db.query(Post.id)},
+            'events': {event_id for (event_id,) in db.query(Event.id)},
+        }
+
+
+def walk(client, url):
+    """Follow next_cursor from the first page; return every ID in order."""
+    ids, cursor = [], None
+    for _ in range(ROWS + 1):
+        response = client.get(url, query_string={'limit': PAGE_SIZE, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        ids.extend(item['id'] for item in body['data'])
+        cursor = body['pagination']['next_cursor']
+        if not cursor:
+            return ids
+    raise AssertionError(f"{url} did not reach its last page: {ids}")
+
+
+def test_feed_pagination():
+    """Every post and event appears exactly once across the pages."""
+    with tempfile.TemporaryDirectory(prefix="campus_connect_feed_") as tmp_dir:
+        app = create_app(make_config(tmp_dir))
+        client = app.test_client()
+        with app.app_context():
+            expected = seed()
+            # Startup rewrites the old-format timestamps
+            create_tables()
+
+        for resource, url in (('posts', '/api/posts'), ('events', '/api/events')):
+            ids = walk(client, url)
+            assert len(ids) == len(set(ids)), f"{resource} repeated: {ids}"
+            assert set(ids) == expected[resource], f"{resource} missing: {expected[resource] - set(ids)}"
+            print(f"✓ {len(ids)} {resource} over {-(-len(ids) // PAGE_SIZE)} pages, no duplicates or gaps")
+
+
+def main():
+    """Run the feed pagination tests."""
+    print("Testing feed cursor pagination...")
+    try:
+        test_feed_pagination()
+        return True
+    except AssertionError as e:
+        print(f"✗ Feed pagination test failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test token-bucket rate limiting of the auth endpoints.
+
+Checks bucket refill with a fake clock, that several processes sharing the
+SQLite backend never admit more calls than the bucket holds, and that
+/api/auth/login-password and /api/auth/send-otp answer 429 with a
+Retry-After header once a client is over its limit.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.config import ProductionConfig
+from app.database import get_db
+from app.models.auth_models import User
+from app.services.rate_limiter import MemoryBackend, RateLimiter, SQLiteBackend, rate_limiter
+
+PROCESSES = 4
+CALLS_PER_PROCESS = 25
+SHARED_CAPACITY = 30
+
+
+def make_config(tmp_dir):
+    """Build a test configuration storing everything under tmp_dir."""
+    class RateLimitTestConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp_dir, 'app.db')}"
+        EMAIL_QUEUE_WORKER_ENABLED = False
+        AUTH_REAPER_ENABLED = False
+        RATE_LIMIT_BACKEND = 'sqlite'
+        RATE_LIMIT_SQLITE_PATH = os.path.join(tmp_dir, 'rate_limits.db')
+        RATE_LIMIT_PASSWORD_LOGIN_PER_EMAIL = '3/60'
+        RATE_LIMIT_OTP_SEND_PER_IP = '2/60'
+
+    return RateLimitTestConfig
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refill():
+    """Buckets allow a burst, then one call per refill interval."""
+    clock = FakeClock()
+    limiter = RateLimiter(MemoryBackend(), {'login': {'email': '3/60', 'ip': '10/60'}}, clock=clock)
+
+    assert [limiter.hit('login', ip='1.1.1.1', email='a@campus.edu') for _ in range(3)] == [0, 0, 0]
+    retry_after = limiter.hit('login', ip='1.1.1.1', email='A@campus.edu ')
+    assert abs(retry_after - 20) < 1e-6, retry_after
+    print("✓ Burst of 3 allowed, 4th refused with a 20 s wait")
+
+    # Other emails are unaffected, and a refused call took no IP token
+    assert limiter.hit('login', ip='1.1.1.1', email='b@campus.edu') == 0
+    clock.now += 20
+    assert limiter.hit('login', ip='1.1.1.1', email='a@campus.edu') == 0
+    assert limiter.hit('login', ip='1.1.1.1', email='a@campus.edu') > 0
+    print("✓ One token refilled after 20 s; buckets are per email")
+
+    # The IP bucket caps a client rotating through email addresses
+    results = [limiter.hit('login', ip='2.2.2.2', email=f"user{i}@campus.edu") for i in range(12)]
+    assert results.count(0) == 10, results
+    print("✓ IP bucket stops a client rotating email addresses")
+
+
+def hammer(path, queue):
+    """Worker process: hit one shared bucket repeatedly."""
+    limiter = RateLimiter(SQLiteBackend(path), {'login': {'email': f"{SHARED_CAPACITY}/3600"}})
+    queue.put(sum(1 for _ in range(CALLS_PER_PROCESS) if limiter.hit('login', email='shared@campus.edu') == 0))
+
+
+def test_shared_backend():
+    """Processes sharing the SQLite backend admit exactly the bucket capacity."""
+    with tempfile.TemporaryDirectory(prefix="campus_connect_rate_limit_") as tmp_dir:
+        path = os.path.join(tmp_dir, "hammer.db")
+        SQLiteBackend(path)
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=hammer, args=(path, queue)) for _ in range(PROCESSES)]
+        for worker in workers:
+            worker.start()
+        allowed = sum(queue.get(timeout=60) for _ in workers)
+        for worker in workers:
+            worker.join()
+    assert allowed == SHARED_CAPACITY, allowed
+    print(f"✓ {PROCESSES} processes x {CALLS_PER_PROCESS} calls admitted exactly {allowed} via SQLite")
+
+
+def test_routes():
+    """Auth routes return 429 with Retry-After when limited."""
+    with tempfile.TemporaryDirectory(prefix="campus_connect_rate_limit_") as tmp_dir:
+        check_routes(create_app(make_config(tmp_dir)))
+
+
+def check_routes(app):
+    """Exercise the limited auth routes of app."""
+    client = app.test_client()
+    with app.app_context():
+        with get_db() as db:
+            user = User(
+                email="limit@campus.edu",
+                first_name="Rate",
+                last_name="Limit",
+                full_name="Rate Limit",
+                major="Computer Science",
+                year_of_study="3rd Year",
+                is_verified=True,
+            )
+            user.set_password("correct-password")
+            db.add(user)
+
+    assert rate_limiter.get_stats()['backend'] == 'SQLiteBackend'
+    rate_limiter.reset()
+
+    payload = {'email': 'limit@campus.edu', 'password': 'wrong-password'}
+    statuses = [client.post('/api/auth/login-password', json=payload).status_code for _ in range(3)]
+    assert statuses == [400, 400, 400], statuses
+    response = client.post('/api/auth/login-password', json=dict(payload, password='correct-password'))
+    assert response.status_code == 429, response.get_json()
+    assert int(response.headers['Retry-After']) == 20, response.headers
+    assert response.get_json()['error'] == 'TOO_MANY_REQUESTS'
+    print(f"✓ 4th password login refused: 429, Retry-After {response.headers['Retry-After']}")
+
+    # The OTP limit is per client IP across both purposes
+    otp = {'email': 'nobody@campus.edu'}
+    first = client.post('/api/auth/send-otp', json=otp, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+    second = client.post('/api/auth/send-otp', json=dict(otp, purpose='password_reset'),
+                         environ_base={'REMOTE_ADDR': '10.0.0.1'})
+    third = client.post('/api/auth/send-otp', json=otp, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+    other = client.post('/api/auth/send-otp', json=otp, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert (first.status_code, second.status_code) == (400, 400)
+    assert third.status_code == 429 and 'Retry-After' in third.headers
+    assert other.status_code == 400
+    print("✓ OTP sends limited per IP across purposes")
+
+
+def main():
+    """Run the rate limiter tests."""
+    print("Testing auth rate limiting...")
+    try:
+        test_bucket_refill()
+        test_shared_backend()
+        test_routes()
+        return True
+    except AssertionError as e:
+        print(f"✗ Rate limiter test failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
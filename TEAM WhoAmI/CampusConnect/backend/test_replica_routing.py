@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test read-replica routing with local SQLite files.
+
+Creates a primary database and two "replicas" (file copies with a marker
+in the post title so each copy can be told apart), then checks that feed
+reads rotate across the replicas and that a user's reads go back to the
+primary right after their own write. Only an authenticated user is
+pinned; a client-sent X-User-ID header is not trusted for routing.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import sqlite3
+
+from app import create_app
+from app import database
+from app.config import ProductionConfig
+from app.database import get_db
+from app.models.auth_models import User, Post
+from app.utils.tokens import encode_access_token
+
+
+def make_config(primary, replicas):
+    """Build a test configuration reading from the replica files."""
+    class ReplicaTestConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{primary}"
+        DATABASE_REPLICA_URLS = [f"sqlite:///{path}" for path in replicas]
+        DB_READ_YOUR_WRITES_SECONDS = 1
+        EMAIL_QUEUE_WORKER_ENABLED = False
+        AUTH_REAPER_ENABLED = False
+
+    return ReplicaTestConfig
+
+
+def seed_and_replicate(primary, replicas):
+    """Seed the primary and copy it to each replica with a distinct title."""
+    with get_db() as db:
+        users = []
+        for i in range(2):
+            user = User(
+                email=f"replica{i}@campus.edu",
+                first_name="Replica",
+                last_name=str(i),
+                full_name=f"Replica {i}",
+                major="Computer Science",
+                year_of_study="3rd Year",
+            )
+            user.set_password("password")
+            users.append(user)
+        db.add_all(users)
+        db.flush()
+        db.add(Post(title="primary", description="Routing test", category="general", author_id=users[0].id))
+        user_ids = [user.id for user in users]
+
+    # Close pooled connections so the WAL is checkpointed into the main file
+    database.engine.dispose()
+    for index, path in enumerate(replicas, start=1):
+        shutil.copyfile(primary, path)
+        with sqlite3.connect(path) as connection:
+            connection.execute("UPDATE posts SET title = ?", (f"replica{index}",))
+    return user_ids
+
+
+def auth_headers(app, user_id):
+    """Return headers carrying a valid access token for user_id."""
+    token = encode_access_token(user_id, 'replica-test-session', app.config['JWT_SECRET_KEY'], 3600)
+    return {'Authorization': f'Bearer {token}'}
+
+
+def feed_title(client, headers):
+    """Return (title, likes) of the only post as seen with headers."""
+    response = client.get('/api/posts', headers=headers)
+    post = response.get_json()['data'][0]
+    return post['title'], post['likes']
+
+
+def test_replica_routing():
+    """Reads rotate across replicas except right after the reader's own write."""
+    tmp_dir = tempfile.mkdtemp(prefix="campus_connect_replicas_")
+    primary = os.path.join(tmp_dir, "primary.db")
+    replicas = [os.path.join(tmp_dir, f"replica{i}.db") for i in (1, 2)]
+
+    try:
+        app = create_app(make_config(primary, replicas))
+        client = app.test_client()
+        reader_id, writer_id = seed_and_replicate(primary, replicas)
+        reader, writer = auth_headers(app, reader_id), auth_headers(app, writer_id)
+
+        # Feed reads rotate across both replicas
+        titles = {feed_title(client, reader)[0] for _ in range(4)}
+        assert titles == {"replica1", "replica2"}, titles
+        print(f"✓ Reads rotate across replicas: {sorted(titles)}")
+
+        # A write pins the writer to the primary
+        post_id = client.get('/api/posts').get_json()['data'][0]['id']
+        response = client.post(f'/api/posts/{post_id}/like', headers=writer)
+        assert response.status_code == 200, response.get_json()
+        assert feed_title(client, writer) == ("primary", 1)
+        print("✓ Writer reads their own write from the primary")
+
+        # Other users keep reading from replicas
+        assert feed_title(client, reader)[0].startswith("replica")
+        print("✓ Other users still read from replicas")
+
+        # Claiming the writer's ID in a header does not reach the primary
+        spoofed = {'X-User-ID': writer_id}
+        assert all(feed_title(client, spoofed)[0].startswith("replica") for _ in range(4))
+        print("✓ Unauthenticated X-User-ID header does not pin reads")
+
+        # Once the read-your-writes window passes, the writer is back on replicas
+        time.sleep(1.1)
+        assert feed_title(client, writer)[0].startswith("replica")
+        print("✓ Writer returns to replicas after the read-your-writes window")
+
+        info = database.get_database_info()
+        print(f"✓ {len(info['replicas'])} replicas reported by get_database_info()")
+
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    """Run the replica routing checks."""
+    print("Testing read-replica routing...")
+    try:
+        test_replica_routing()
+        return True
+    except AssertionError as e:
+        print(f"✗ Replica routing test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"✗ Replica routing test errored: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
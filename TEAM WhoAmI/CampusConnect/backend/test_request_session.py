@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test the request-scoped unit of work.
+
+Every get_db() block in a request shares one RequestSession: commit() only
+flushes, rollback() rolls back the block's savepoint, and the transaction
+commits once after the view returns. Registers a few throwaway routes and
+checks that a failing handler leaves nothing behind, that a failed or
+rolled-back inner block keeps the outer work, and that run_after_commit()
+callbacks run only after the real commit.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import jsonify
+
+from app import create_app
+from app import database
+from app.config import ProductionConfig
+from app.database import get_db, run_after_commit
+from app.models.auth_models import User
+
+
+def make_config(tmp_dir):
+    """Build a test configuration storing the database under tmp_dir."""
+    class RequestSessionTestConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp_dir, 'session.db')}"
+        EMAIL_QUEUE_WORKER_ENABLED = False
+        AUTH_REAPER_ENABLED = False
+
+    return RequestSessionTestConfig
+
+
+def new_user(name):
+    """Return an unsaved user with an email derived from name."""
+    user = User(
+        email=f"{name}@campus.edu",
+        first_name=name,
+        last_name="Test",
+        full_name=f"{name} Test",
+        major="Computer Science",
+        year_of_study="3rd Year",
+    )
+    user.set_password("password")
+    return user
+
+
+def committed_names():
+    """Return the first names visible to a separate connection."""
+    with database.engine.connect() as connection:
+        return {name for (name,) in connection.execute(User.__table__.select().with_only_columns(User.first_name))}
+
+
+def add_routes(app, callback_calls):
+    """Register the routes exercised by the test."""
+
+    def failing_handler():
+        with get_db() as db:
+            db.add(new_user("raised"))
+            db.commit()
+        raise RuntimeError("handler failed after writing")
+
+    def error_response():
+        with get_db() as db:
+            db.add(new_user("errored"))
+        return jsonify({'success': False}), 500
+
+    def nested_failure():
+        with get_db() as db:
+            db.add(new_user("outer"))
+            try:
+                with get_db() as inner:
+                    inner.add(new_user("inner"))
+                    inner.flush()
+                    raise ValueError("inner block failed")
+            except ValueError:
+                pass
+            db.add(new_user("after"))
+        return jsonify({'success': True})
+
+    def nested_rollback():
+        with get_db() as db:
+            db.add(new_user("kept"))
+            with get_db() as inner:
+                inner.add(new_user("discarded"))
+                inner.rollback()
+                inner.add(new_user("readded"))
+        return jsonify({'success': True})
+
+    def after_commit(status):
+        with get_db() as db:
+            db.add(new_user(f"callback{status}"))
+            run_after_commit(db, lambda: callback_calls.append(committed_names()))
+            db.commit()
+        # Neither the block's commit() nor leaving it is the real commit
+        return jsonify({'calls_during_request': len(callback_calls)}), status
+
+    app.add_url_rule('/test/failing-handler', view_func=failing_handler)
+    app.add_url_rule('/test/error-response', view_func=error_response)
+    app.add_url_rule('/test/nested-failure', view_func=nested_failure)
+    app.add_url_rule('/test/nested-rollback', view_func=nested_rollback)
+    app.add_url_rule('/test/after-commit/<int:status>', view_func=after_commit)
+
+
+def test_request_session():
+    """Request transactions commit once and roll back as a whole."""
+    with tempfile.TemporaryDirectory(prefix="campus_connect_session_") as tmp_dir:
+        app = create_app(make_config(tmp_dir))
+        callback_calls = []
+        add_routes(app, callback_calls)
+        client = app.test_client()
+
+        # A handler that raises after writing leaves nothing behind
+        assert client.get('/test/failing-handler').status_code == 500
+        assert "raised" not in committed_names()
+        print("✓ Writes of a handler that raised were rolled back")
+
+        # So does a handler that returns a 5xx response
+        assert client.get('/test/error-response').status_code == 500
+        assert "errored" not in committed_names()
+        print("✓ Writes of a handler that returned 500 were rolled back")
+
+        # A failed inner block rolls back to its savepoint only
+        assert client.get('/test/nested-failure').status_code == 200
+        names = committed_names()
+        assert {"outer", "after"} <= names and "inner" not in names, names
+        print("✓ Failed inner block discarded; outer work committed")
+
+        # rollback() inside a block undoes that block's savepoint only
+        assert client.get('/test/nested-rollback').status_code == 200
+        names = committed_names()
+        assert {"kept", "readded"} <= names and "discarded" not in names, names
+        print("✓ Inner rollback() kept the outer work")
+
+        # Callbacks wait for the real commit and see the committed rows
+        response = client.get('/test/after-commit/200')
+        assert response.get_json()['calls_during_request'] == 0
+        assert len(callback_calls) == 1 and "callback200" in callback_calls[0], callback_calls
+        print("✓ run_after_commit callback ran once, after the request committed")
+
+        # ...and never run when the request rolls back
+        client.get('/test/after-commit/500')
+        assert len(callback_calls) == 1, callback_calls
+        assert "callback500" not in committed_names()
+        print("✓ run_after_commit callback dropped on rollback")
+
+
+def main():
+    """Run the request session tests."""
+    print("Testing the request unit of work...")
+    try:
+        test_request_session()
+        return True
+    except AssertionError as e:
+        print(f"✗ Request session test failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -1,23 +1,54 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
 from flask_sqlalchemy import SQLAlchemy
+import click
+from sqlalchemy import and_, or_, case, event, func, inspect, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
+from werkzeug.utils import secure_filename, send_file as werkzeug_send_file
 from datetime import datetime
+from collections import OrderedDict, defaultdict
+import atexit
+import base64
+import binascii
+import hashlib
+import json
+import mimetypes
 import os
-import uuid
+import re
+import tempfile
+import threading
+import time
 from functools import wraps
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///notebazar.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///notebazar.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['BLOB_FOLDER'] = os.path.join('uploads', 'blobs')  # content-addressed note files
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['COUNTER_FLUSH_INTERVAL'] = 5  # seconds between view/download counter flushes
+app.config['COUNTER_FLUSH_EVENTS'] = 100  # flush early once this many increments are buffered
+app.config['FACET_CACHE_TTL'] = 300  # seconds; bounds staleness across worker processes
+# Rendered page cache for anonymous visitors: 'memory' (per process LRU) or 'filesystem' (shared by workers)
+app.config['PAGE_CACHE_ENABLED'] = True
+app.config['PAGE_CACHE_BACKEND'] = os.environ.get('PAGE_CACHE_BACKEND', 'memory')
+app.config['PAGE_CACHE_DIR'] = os.path.join(tempfile.gettempdir(), 'notebazar-page-cache')
+app.config['PAGE_CACHE_TTL'] = 60
+app.config['PAGE_CACHE_MAX_ENTRIES'] = 256
+# Let a front proxy serve note files: None, 'x-sendfile' (Apache/lighttpd) or 'x-accel-redirect' (nginx)
+app.config['DOWNLOAD_OFFLOAD'] = os.environ.get('DOWNLOAD_OFFLOAD') or None
+app.config['X_ACCEL_REDIRECT_PREFIX'] = '/protected-uploads/'  # internal nginx location aliased to UPLOAD_FOLDER
+app.config['X_ACCEL_BLOB_PREFIX'] = '/protected-blobs/'  # internal nginx location aliased to BLOB_FOLDER
 
 db = SQLAlchemy(app)
 
 # Create upload directory
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['BLOB_FOLDER'], exist_ok=True)
 
 # Models
 class User(db.Model):
@@ -41,14 +72,19 @@ class Note(db.Model):
     subject = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     filename = db.Column(db.String(200), nullable=False)
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 of the file: blob key and ETag
     price = db.Column(db.Integer, default=0)  # 0 for free notes
     uploader_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     downloads = db.Column(db.Integer, default=0)
     views = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination key
 
     purchases = db.relationship('Purchase', backref='note', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_note_created_at', 'created_at'),
+    )
+
 
 class Purchase(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -63,10 +99,15 @@ class ForumQuestion(db.Model):
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(100), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # keyset pagination key
 
     answers = db.relationship('ForumAnswer', backref='question', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_forum_question_created_at', 'created_at'),
+        db.Index('ix_forum_question_category_created_at', 'category', 'created_at'),
+    )
+
 
 class ForumAnswer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -85,7 +126,719 @@ class Comment(db.Model):
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_comment_target', 'target_type', 'target_id'),
+    )
+
+
+class Blob(db.Model):
+    # One stored file per distinct content, shared by every note with that content
+    hash = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class CoinTransaction(db.Model):
+    # Append-only coin ledger; a user's coins always equal the sum of their amounts
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    amount = db.Column(db.Integer, nullable=False)  # positive credit, negative debit
+    kind = db.Column(db.String(30), nullable=False)  # 'purchase', 'sale', 'reward', 'topup', 'signup_bonus', 'opening_balance', 'adjustment'
+    note_id = db.Column(db.Integer, db.ForeignKey('note.id'))
+    idempotency_key = db.Column(db.String(100), unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class UserStats(db.Model):
+    # Materialized uploader totals, kept current incrementally (see bump_user_stats)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_downloads = db.Column(db.Integer, default=0, nullable=False)
+    total_views = db.Column(db.Integer, default=0, nullable=False)
+    total_earnings = db.Column(db.Integer, default=0, nullable=False)
+    notes_uploaded = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Helper functions
+def init_db():
+    # create_all() skips columns and indexes on tables that already exist, so add them explicitly
+    db.create_all()
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                with db.engine.begin() as conn:
+                    conn.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    # Keyset pagination skips rows without a created_at and cannot make a cursor for them;
+    # give legacy rows the oldest timestamp so they sort last
+    for model in (Note, ForumQuestion):
+        oldest = db.session.query(func.min(model.created_at)).scalar() or datetime.utcnow()
+        model.query.filter(model.created_at.is_(None)).update({model.created_at: oldest}, synchronize_session=False)
+    db.session.commit()
+    init_search_indexes()
+
+def init_search_indexes():
+    """Create any missing FTS index whose base table already exists."""
+    existing = set(inspect(db.engine).get_table_names())
+    for search_index in (note_search, question_search):
+        if search_index.table in existing:
+            search_index.create()
+
+def load_comments(targets):
+    """Fetch comments for several targets in one query.
+
+    targets maps a target_type ('answer', 'question') to the ids to load.
+    Returns {target_type: {target_id: [comments oldest first]}}.
+    """
+    grouped = {target_type: {target_id: [] for target_id in ids} for target_type, ids in targets.items()}
+    conditions = [
+        and_(Comment.target_type == target_type, Comment.target_id.in_(list(ids)))
+        for target_type, ids in grouped.items() if ids
+    ]
+    if not conditions:
+        return grouped
+
+    comments = Comment.query.filter(or_(*conditions)).order_by(Comment.created_at, Comment.id).all()
+    for comment in comments:
+        grouped[comment.target_type][comment.target_id].append(comment)
+    return grouped
+
+class KeysetPage:
+    """One page of a (created_at, id) keyset listing, newest first."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def encode_cursor(item):
+    raw = json.dumps([item.created_at.isoformat(), item.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that cannot be decoded; answered with a 400."""
+
+def decode_cursor(cursor):
+    """Return the (created_at, id) key of an opaque cursor, or None if there is none.
+
+    Raises InvalidCursor if the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor(cursor)
+
+def keyset_paginate(query, model, after=None, before=None, per_page=12):
+    """Page through query newest first by seeking on (created_at, id) instead of OFFSET.
+
+    after/before are cursors from a previous page's next_cursor/prev_cursor.
+    Every page costs one indexed range scan of per_page + 1 rows.
+    """
+    key = tuple_(model.created_at, model.id)
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before is not None:
+        rows = query.filter(key > before).order_by(model.created_at.asc(), model.id.asc()).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after is not None:
+            query = query.filter(key < after)
+        rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = after is not None
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1]) if rows and has_next else None,
+        prev_cursor=encode_cursor(rows[0]) if rows and has_prev else None,
+    )
+
+class NoteCounters:
+    """Write-behind buffer for note view and download counters.
+
+    Increments are aggregated in memory and written to the note table in one
+    executemany of `views = views + ?` updates every COUNTER_FLUSH_INTERVAL
+    seconds or COUNTER_FLUSH_EVENTS increments, so page views no longer take
+    the SQLite write lock. Flushes only ever run on the background worker, so
+    a busy database can delay counts but never fail a page view.
+    """
+
+    FIELDS = ('views', 'downloads')
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._pending = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+        self._events = 0
+        self._worker = None
+        self._wake = threading.Event()
+
+    def incr(self, note_id, field, amount=1):
+        with self._lock:
+            self._pending[note_id][field] += amount
+            self._events += 1
+            flush_now = self._events >= self.app.config['COUNTER_FLUSH_EVENTS']
+        self._ensure_worker()
+        if flush_now:
+            self._wake.set()
+
+    def pending(self, note_id):
+        """Return the buffered, not yet flushed deltas for a note."""
+        with self._lock:
+            deltas = self._pending.get(note_id)
+            return dict(deltas) if deltas else dict.fromkeys(self.FIELDS, 0)
+
+    def pending_notes(self):
+        """Return {note_id: deltas} for every note with buffered increments."""
+        with self._lock:
+            return {note_id: dict(deltas) for note_id, deltas in self._pending.items()}
+
+    def apply(self, notes):
+        """Add buffered deltas to loaded notes so readers see near-real-time counts.
+
+        The values are set as committed state, so the session never writes them back.
+        """
+        for note in notes:
+            deltas = self.pending(note.id)
+            for field in self.FIELDS:
+                if deltas[field]:
+                    set_committed_value(note, field, (getattr(note, field) or 0) + deltas[field])
+        return notes
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+            self._events = 0
+        if not batch:
+            return 0
+
+        rows = [{'id': note_id, **deltas} for note_id, deltas in batch.items()]
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(db.text(
+                    'UPDATE note SET views = COALESCE(views, 0) + :views, '
+                    'downloads = COALESCE(downloads, 0) + :downloads WHERE id = :id'
+                ), rows)
+                # Keep the uploader's materialized totals in step with the note rows
+                conn.execute(db.text(
+                    'UPDATE user_stats SET total_views = total_views + :views, '
+                    'total_downloads = total_downloads + :downloads, '
+                    'total_earnings = total_earnings + :downloads * '
+                    '(SELECT MAX(COALESCE(price, 0), 0) FROM note WHERE id = :id) '
+                    'WHERE user_id = (SELECT uploader_id FROM note WHERE id = :id)'
+                ), rows)
+        except Exception:
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                for note_id, deltas in batch.items():
+                    for field in self.FIELDS:
+                        self._pending[note_id][field] += deltas[field]
+            self.app.logger.exception('Failed to flush note counters')
+            raise
+        return len(rows)
+
+    def flush_on_exit(self):
+        try:
+            with self.app.app_context():
+                self.flush()
+        except Exception:
+            pass
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name='note-counters', daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.app.config['COUNTER_FLUSH_INTERVAL'])
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                pass
+
+note_counters = NoteCounters(app)
+atexit.register(note_counters.flush_on_exit)
+
+def rebuild_user_stats(user_id=None, if_missing=False):
+    """Recompute UserStats from the note table for one user, or for everyone.
+
+    With if_missing, existing rows are kept and only absent ones are inserted.
+    """
+    query = db.session.query(
+        User.id,
+        func.count(Note.id),
+        func.coalesce(func.sum(Note.downloads), 0),
+        func.coalesce(func.sum(Note.views), 0),
+        func.coalesce(func.sum(case((Note.price > 0, Note.downloads * Note.price), else_=0)), 0),
+    ).outerjoin(Note, Note.uploader_id == User.id).group_by(User.id)
+
+    stats_query = UserStats.query
+    if user_id is not None:
+        query = query.filter(User.id == user_id)
+        stats_query = stats_query.filter(UserStats.user_id == user_id)
+
+    rows = query.all()
+    values = [
+        {'user_id': uid, 'notes_uploaded': uploaded, 'total_downloads': downloads,
+         'total_views': views, 'total_earnings': earnings}
+        for uid, uploaded, downloads, views, earnings in rows
+    ]
+    if if_missing:
+        if values:
+            db.session.execute(
+                sqlite_insert(UserStats.__table__).on_conflict_do_nothing(index_elements=['user_id']), values
+            )
+        return len(rows)
+
+    stats_query.delete(synchronize_session=False)
+    db.session.add_all(UserStats(**row) for row in values)
+    db.session.flush()
+    return len(rows)
+
+def bump_user_stats(user_id, **deltas):
+    """Atomically add deltas to a user's stats row, e.g. bump_user_stats(uid, notes_uploaded=1).
+
+    The change being counted must already be in the session: a missing row is
+    rebuilt from scratch, which picks it up.
+    """
+    values = {name: getattr(UserStats, name) + delta for name, delta in deltas.items()}
+    values['updated_at'] = datetime.utcnow()
+    result = db.session.execute(update(UserStats).where(UserStats.user_id == user_id).values(values))
+    if result.rowcount == 0:
+        rebuild_user_stats(user_id)
+
+def get_user_stats(user_id):
+    """Return a user's stats including counter increments that are not flushed yet."""
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        # Concurrent first reads both get here; the first insert wins and both read it back
+        rebuild_user_stats(user_id, if_missing=True)
+        db.session.commit()
+        stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        return None
+
+    pending = note_counters.pending_notes()
+    if pending:
+        notes = db.session.query(Note.id, Note.price) \
+            .filter(Note.uploader_id == user_id, Note.id.in_(list(pending))).all()
+        views = sum(pending[note_id]['views'] for note_id, _ in notes)
+        downloads = sum(pending[note_id]['downloads'] for note_id, _ in notes)
+        earnings = sum(pending[note_id]['downloads'] * max(price or 0, 0) for note_id, price in notes)
+        # Set as committed state, like NoteCounters.apply(), so the session never writes them back
+        set_committed_value(stats, 'total_views', stats.total_views + views)
+        set_committed_value(stats, 'total_downloads', stats.total_downloads + downloads)
+        set_committed_value(stats, 'total_earnings', stats.total_earnings + earnings)
+    return stats
+
+@app.cli.command('rebuild-user-stats')
+def rebuild_user_stats_command():
+    """Recompute every user's dashboard statistics from scratch."""
+    note_counters.flush()
+    count = rebuild_user_stats()
+    db.session.commit()
+    print(f'Rebuilt stats for {count} users')
+
+class SearchIndex:
+    """SQLite FTS5 index over some text columns of a model.
+
+    The index is an external-content table kept in sync by triggers, so every
+    insert, update and delete of the model (ORM or raw SQL) is reflected.
+    """
+
+    def __init__(self, model, columns, weights):
+        self.model = model
+        self.table = model.__tablename__
+        self.name = f'{self.table}_fts'
+        self.columns = columns
+        self.weights = weights
+
+    def create(self):
+        """Create the FTS table and triggers if missing, indexing existing rows.
+
+        Safe to run from several processes at once: the statements are all IF NOT EXISTS.
+        """
+        cols = ', '.join(self.columns)
+        new = ', '.join(f'new.{c}' for c in self.columns)
+        old = ', '.join(f'old.{c}' for c in self.columns)
+        with db.engine.begin() as conn:
+            exists = conn.execute(db.text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+            ), {'name': self.name}).first()
+            if exists:
+                return
+            conn.execute(db.text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5({cols}, content='{self.table}', "
+                f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+            conn.execute(db.text(
+                f'CREATE TRIGGER IF NOT EXISTS {self.name}_ai AFTER INSERT ON {self.table} BEGIN '
+                f'INSERT INTO {self.name}(rowid, {cols}) VALUES (new.id, {new}); END'
+            ))
+            conn.execute(db.text(
+                f'CREATE TRIGGER IF NOT EXISTS {self.name}_ad AFTER DELETE ON {self.table} BEGIN '
+                f"INSERT INTO {self.name}({self.name}, rowid, {cols}) VALUES ('delete', old.id, {old}); END"
+            ))
+            # Only text changes touch the index, not counter updates
+            conn.execute(db.text(
+                f'CREATE TRIGGER IF NOT EXISTS {self.name}_au AFTER UPDATE OF {cols} ON {self.table} BEGIN '
+                f"INSERT INTO {self.name}({self.name}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                f'INSERT INTO {self.name}(rowid, {cols}) VALUES (new.id, {new}); END'
+            ))
+            conn.execute(db.text(f"INSERT INTO {self.name}({self.name}) VALUES ('rebuild')"))
+
+    def rebuild(self):
+        with db.engine.begin() as conn:
+            conn.execute(db.text(f"INSERT INTO {self.name}({self.name}) VALUES ('rebuild')"))
+
+    @staticmethod
+    def match_expression(text, prefix=False, column=None):
+        """Turn user input into a safe FTS5 query: every word must match, quoted."""
+        terms = re.findall(r'\w+', text or '')
+        if not terms:
+            return None
+        quoted = ['"%s"' % term for term in terms]
+        if prefix:
+            quoted[-1] += '*'
+        expression = ' '.join(quoted)
+        return f'{column} : ({expression})' if column else expression
+
+    def matches(self, text, prefix=False, column=None):
+        """Subquery of (rowid, rank) for the matching rows, best first when ordered by rank."""
+        expression = self.match_expression(text, prefix, column)
+        if expression is None:
+            return None
+        weights = ', '.join(str(w) for w in self.weights)
+        return db.text(
+            f'SELECT rowid, bm25({self.name}, {weights}) AS rank FROM {self.name} WHERE {self.name} MATCH :match'
+        ).bindparams(match=expression).columns(rowid=db.Integer, rank=db.Float).subquery()
+
+    def filter(self, query, text, prefix=False):
+        """Restrict a model query to search hits, ordered by BM25 rank."""
+        hits = self.matches(text, prefix)
+        if hits is None:
+            return query.filter(db.false())
+        return query.join(hits, self.model.id == hits.c.rowid).order_by(hits.c.rank, self.model.id.desc())
+
+    def search(self, text, page=1, per_page=10, prefix=False):
+        return self.filter(self.model.query, text, prefix).paginate(page=page, per_page=per_page, error_out=False)
+
+    def suggest(self, text, limit=8):
+        """Typeahead: titles whose words start with what the user has typed so far."""
+        hits = self.matches(text, prefix=True, column='title')
+        if hits is None:
+            return []
+        rows = db.session.query(self.model.id, self.model.title).join(hits, self.model.id == hits.c.rowid) \
+            .order_by(hits.c.rank).limit(limit).all()
+        return [{'id': row_id, 'title': title} for row_id, title in rows]
+
+note_search = SearchIndex(Note, ('title', 'subject', 'description'), (10.0, 5.0, 1.0))
+question_search = SearchIndex(ForumQuestion, ('title', 'content'), (10.0, 1.0))
+
+class NoteFacets:
+    """In-process cache of the browse page facets (subject and price bucket counts).
+
+    Inserting, deleting or re-pricing a note invalidates the cache once the
+    transaction commits; FACET_CACHE_TTL bounds staleness in other workers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._facets = None
+        self._loaded_at = 0.0
+
+    def _load(self):
+        subject_rows = db.session.query(Note.subject, func.count(Note.id)) \
+            .group_by(Note.subject).order_by(Note.subject).all()
+        free, paid = db.session.query(
+            func.coalesce(func.sum(case((func.coalesce(Note.price, 0) <= 0, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Note.price > 0, 1), else_=0)), 0),
+        ).one()
+        return {
+            'subjects': [(subject, count) for subject, count in subject_rows],
+            'price': {'free': free, 'paid': paid},
+        }
+
+    def get(self):
+        with self._lock:
+            facets = self._facets
+            fresh = time.monotonic() - self._loaded_at < self.app.config['FACET_CACHE_TTL']
+        if facets is not None and fresh:
+            return facets
+        return self.warm()
+
+    def warm(self):
+        facets = self._load()
+        with self._lock:
+            self._facets = facets
+            self._loaded_at = time.monotonic()
+        return facets
+
+    def invalidate(self):
+        with self._lock:
+            self._facets = None
+
+    def subjects(self):
+        return self.get()['subjects']
+
+    def price_buckets(self):
+        return self.get()['price']
+
+note_facets = NoteFacets(app)
+
+class MemoryCacheBackend:
+    """Per-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generations = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires and expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl if ttl else 0, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, name):
+        with self._lock:
+            return self._generations.get(name, '0')
+
+    def bump_generation(self, name):
+        with self._lock:
+            self._generations[name] = str(time.time_ns())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class FileCacheBackend:
+    """Cache stored as files in one directory, shared by every worker process on the host."""
+
+    def __init__(self, directory, max_entries=1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.generations_dir = os.path.join(directory, 'generations')
+        os.makedirs(self.generations_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                expires = float(f.readline())
+                value = f.read()
+        except (OSError, ValueError):
+            return None
+        if expires and expires < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(f'{time.time() + ttl if ttl else 0}\n')
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+        self._prune()
+
+    def generation(self, name):
+        try:
+            with open(os.path.join(self.generations_dir, name), encoding='utf-8') as f:
+                return f.read() or '0'
+        except OSError:
+            return '0'
+
+    def bump_generation(self, name):
+        fd, tmp_path = tempfile.mkstemp(dir=self.generations_dir, prefix='.tmp-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(str(time.time_ns()))
+        os.replace(tmp_path, os.path.join(self.generations_dir, name))
+
+    def _prune(self):
+        names = [name for name in os.listdir(self.directory)
+                 if not name.startswith('.') and name != 'generations']
+        if len(names) <= self.max_entries:
+            return
+        paths = sorted((os.path.join(self.directory, name) for name in names), key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name == 'generations':
+                continue
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+class PageCache:
+    """Rendered HTML cache for anonymous visitors, with TTL and event-driven invalidation.
+
+    Each cached page declares the data it depends on ('notes', 'questions').
+    Invalidating a dependency bumps its generation marker in the backend,
+    which changes the keys of every page built on it; with the filesystem
+    backend this reaches all workers at once.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._backend = None
+        self._lock = threading.Lock()
+        self.metrics = dict.fromkeys(('hits', 'misses', 'stores', 'invalidations'), 0)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if self.app.config['PAGE_CACHE_BACKEND'] == 'filesystem':
+                self._backend = FileCacheBackend(self.app.config['PAGE_CACHE_DIR'],
+                                                 self.app.config['PAGE_CACHE_MAX_ENTRIES'])
+            else:
+                self._backend = MemoryCacheBackend(self.app.config['PAGE_CACHE_MAX_ENTRIES'])
+        return self._backend
+
+    def _count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def key(self, path, depends_on):
+        generations = ','.join(self.backend.generation(dependency) for dependency in depends_on)
+        return f'page:{path}:{generations}'
+
+    def get(self, key):
+        value = self.backend.get(key)
+        self._count('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value, self.app.config['PAGE_CACHE_TTL'])
+        self._count('stores')
+
+    def invalidate(self, dependency):
+        self.backend.bump_generation(dependency)
+        self._count('invalidations')
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.metrics)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else None
+        stats['backend'] = self.app.config['PAGE_CACHE_BACKEND']
+        return stats
+
+page_cache = PageCache(app)
+
+def cached_page(*depends_on):
+    """Serve a view's HTML from page_cache for anonymous visitors."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Logged-in pages, pending flash messages and searches are rendered fresh
+            if (not app.config['PAGE_CACHE_ENABLED'] or 'user_id' in session
+                    or session.get('_flashes') or request.args.get('q')):
+                return f(*args, **kwargs)
+            key = page_cache.key(request.full_path, depends_on)
+            html = page_cache.get(key)
+            if html is None:
+                html = f(*args, **kwargs)
+                if not isinstance(html, str):
+                    return html
+                page_cache.set(key, html)
+            return app.response_class(html, mimetype='text/html')
+        return decorated_function
+    return decorator
+
+def _mark_dirty(target, *caches):
+    inspect(target).session.info.setdefault('dirty_caches', set()).update(caches)
+
+@event.listens_for(Note, 'after_insert')
+@event.listens_for(Note, 'after_delete')
+def _note_changed(mapper, connection, target):
+    _mark_dirty(target, 'notes')
+
+@event.listens_for(Note, 'after_update')
+def _note_listing_changed(mapper, connection, target):
+    state = inspect(target)
+    if any(getattr(state.attrs, name).history.has_changes() for name in ('title', 'subject', 'price')):
+        _mark_dirty(target, 'notes')
+
+@event.listens_for(ForumQuestion, 'after_insert')
+@event.listens_for(ForumQuestion, 'after_delete')
+@event.listens_for(ForumAnswer, 'after_insert')
+@event.listens_for(ForumAnswer, 'after_delete')
+def _question_changed(mapper, connection, target):
+    _mark_dirty(target, 'questions')
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_caches(session):
+    # Only after commit, so a concurrent reader cannot re-cache uncommitted state
+    dirty = session.info.pop('dirty_caches', set())
+    if 'notes' in dirty:
+        note_facets.invalidate()
+    for dependency in dirty:
+        page_cache.invalidate(dependency)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty_caches(session):
+    session.info.pop('dirty_caches', None)
+
+@app.cli.command('reindex-search')
+def reindex_search_command():
+    """Rebuild the full-text search indexes from the note and forum tables."""
+    for search_index in (note_search, question_search):
+        search_index.create()
+        search_index.rebuild()
+        print(f'Reindexed {search_index.name}')
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -98,10 +851,290 @@ def allowed_file(filename):
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class InsufficientCoins(Exception):
+    pass
+
+class DuplicateTransaction(Exception):
+    pass
+
+class CoinLedger:
+    """Moves coins with guarded single-statement updates and records every move.
+
+    Balances are never read into Python and written back, so concurrent
+    requests cannot lose updates. Methods work in the current session; the
+    caller commits.
+    """
+
+    def _record(self, user_id, amount, kind, note_id=None, key=None):
+        db.session.add(CoinTransaction(user_id=user_id, amount=amount, kind=kind,
+                                       note_id=note_id, idempotency_key=key))
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            raise DuplicateTransaction(key)
+
+    def credit(self, user_id, amount, kind, note_id=None, key=None):
+        self._record(user_id, amount, kind, note_id, key)
+        db.session.execute(update(User).where(User.id == user_id).values(coins=User.coins + amount))
+
+    def debit(self, user_id, amount, kind, note_id=None, key=None):
+        self._record(user_id, -amount, kind, note_id, key)
+        result = db.session.execute(
+            update(User).where(User.id == user_id, User.coins >= amount).values(coins=User.coins - amount)
+        )
+        if result.rowcount == 0:
+            db.session.rollback()
+            raise InsufficientCoins()
+
+    def purchase(self, buyer_id, note):
+        """Charge the buyer, pay the uploader and record the purchase, at most once per buyer and note."""
+        self.debit(buyer_id, note.price, 'purchase', note.id, key=f'purchase:{buyer_id}:{note.id}')
+        self.credit(note.uploader_id, note.price, 'sale', note.id, key=f'sale:{buyer_id}:{note.id}')
+        db.session.add(Purchase(user_id=buyer_id, note_id=note.id))
+
+    def reconcile(self, fix=False):
+        """Compare every balance with its ledger. Returns [(user_id, coins, ledger_total)] mismatches.
+
+        Reporting only reads. With fix, an adjustment entry is written for each
+        mismatch so the ledger matches the balance, and users with coins but no
+        ledger history yet get an opening_balance entry.
+        """
+        ledger = CoinTransaction.__table__
+        totals = select(User.id, func.coalesce(User.coins, 0), func.count(ledger.c.id),
+                        func.coalesce(func.sum(ledger.c.amount), 0)) \
+            .select_from(User.__table__.outerjoin(ledger, ledger.c.user_id == User.id)) \
+            .group_by(User.id)
+        with db.engine.connect() as conn:
+            # Take the write lock up front so no purchase lands between the read and the fix
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+            mismatches, entries = [], []
+            for user_id, coins, entry_count, ledger_total in conn.execute(totals):
+                if not entry_count:
+                    if coins:
+                        entries.append({'user_id': user_id, 'amount': coins, 'kind': 'opening_balance'})
+                elif ledger_total != coins:
+                    mismatches.append((user_id, coins, ledger_total))
+                    entries.append({'user_id': user_id, 'amount': coins - ledger_total, 'kind': 'adjustment'})
+            if fix and entries:
+                conn.execute(ledger.insert(), entries)
+                conn.commit()
+            else:
+                conn.rollback()
+        return mismatches
+
+coin_ledger = CoinLedger()
+
+@app.cli.command('reconcile-coins')
+@click.option('--fix', is_flag=True, help='Record adjustment entries for mismatched balances.')
+def reconcile_coins_command(fix):
+    """Check user coin balances against the ledger; meant to run periodically from cron."""
+    mismatches = coin_ledger.reconcile(fix=fix)
+    for user_id, coins, ledger_total in mismatches:
+        app.logger.warning('Coin balance mismatch for user %s: balance %s, ledger %s', user_id, coins, ledger_total)
+        print(f'user {user_id}: balance {coins}, ledger {ledger_total}')
+    print(f'{len(mismatches)} mismatched balances' + (' (adjusted)' if fix and mismatches else ''))
+
+class BlobStore:
+    """Content-addressed file store: each distinct file is kept once under its SHA-256.
+
+    Blobs live at BLOB_FOLDER/ab/cd/<hash>; Blob.ref_count tracks how many
+    notes point at each one.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, app):
+        self.app = app
+
+    @property
+    def root(self):
+        return self.app.config['BLOB_FOLDER']
+
+    def path(self, content_hash):
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash)
+
+    def put(self, stream):
+        """Stream a file into the store while hashing it. Returns (hash, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in iter(lambda: stream.read(self.CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            content_hash = digest.hexdigest()
+            self._place(tmp_path, content_hash)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return content_hash, size
+
+    def put_file(self, path):
+        """Move an existing file into the store. Returns (hash, size)."""
+        content_hash = file_sha256(path)
+        size = os.path.getsize(path)
+        self._place(path, content_hash)
+        if os.path.exists(path):
+            os.remove(path)
+        return content_hash, size
+
+    def _place(self, src, content_hash):
+        target = self.path(content_hash)
+        if os.path.exists(target):
+            # Refresh the mtime so collect_garbage() leaves it alone while the new reference commits
+            os.utime(target)
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(src, target)
+
+    def add_ref(self, content_hash, size, count=1):
+        """Count one more note using a blob, in the current transaction."""
+        db.session.execute(
+            sqlite_insert(Blob.__table__)
+            .values(hash=content_hash, size=size, ref_count=count, created_at=datetime.utcnow())
+            .on_conflict_do_update(index_elements=['hash'], set_={'ref_count': Blob.__table__.c.ref_count + count})
+        )
+
+    def recount(self):
+        """Recompute every ref_count from the note table."""
+        counts = db.session.query(Note.content_hash, func.count(Note.id)).group_by(Note.content_hash).all()
+        counts = {content_hash: count for content_hash, count in counts if content_hash}
+        for blob in Blob.query.all():
+            blob.ref_count = counts.get(blob.hash, 0)
+        db.session.flush()
+
+    def collect_garbage(self, grace_seconds=3600):
+        """Delete unreferenced blobs and stray files. Returns the number of files removed.
+
+        Files touched within grace_seconds are left alone, dead or not, so an
+        upload that is reusing a blob (see _place) keeps its file.
+        """
+        self.recount()
+        db.session.commit()
+
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        for (content_hash,) in db.session.query(Blob.hash).filter(Blob.ref_count <= 0).all():
+            path = self.path(content_hash)
+            if os.path.exists(path) and os.path.getmtime(path) >= cutoff:
+                continue
+            # An upload may have re-referenced the blob since the query above
+            deleted = db.session.execute(
+                Blob.__table__.delete().where(Blob.hash == content_hash, Blob.ref_count <= 0)
+            ).rowcount
+            db.session.commit()
+            if deleted and os.path.exists(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+
+        known = {content_hash for (content_hash,) in db.session.query(Blob.hash)}
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if name not in known and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+blob_store = BlobStore(app)
+
+@event.listens_for(Note, 'after_delete')
+def _release_blob(mapper, connection, target):
+    if target.content_hash:
+        connection.execute(
+            update(Blob).where(Blob.hash == target.content_hash).values(ref_count=Blob.ref_count - 1)
+        )
+
+def note_file_path(note):
+    if note.content_hash:
+        path = blob_store.path(note.content_hash)
+        if os.path.exists(path):
+            return path
+    # Files uploaded before the blob store that have not been migrated yet
+    return os.path.join(app.config['UPLOAD_FOLDER'], note.filename)
+
+def send_note_file(note):
+    """Send a note's file with a strong ETag, Last-Modified and Range support.
+
+    With DOWNLOAD_OFFLOAD set, only headers are sent and the proxy streams the bytes.
+    """
+    path = os.path.abspath(note_file_path(note))
+    if not note.content_hash:
+        # Notes uploaded before hashes were stored get one on first download
+        note.content_hash = file_sha256(path)
+        db.session.commit()
+    download_name = f"{note.title}.{note.filename.split('.')[-1]}"
+    offload = app.config['DOWNLOAD_OFFLOAD']
+
+    if offload == 'x-accel-redirect':
+        response = app.response_class(mimetype=mimetypes.guess_type(note.filename)[0] or 'application/octet-stream')
+        response.set_etag(note.content_hash)
+        response.last_modified = note.created_at
+        # Same If-None-Match / If-Modified-Since handling as send_file(conditional=True)
+        response.make_conditional(request)
+        if response.status_code != 304:
+            if note.content_hash and path == os.path.abspath(blob_store.path(note.content_hash)):
+                relative_path = os.path.relpath(path, os.path.abspath(app.config['BLOB_FOLDER']))
+                prefix = app.config['X_ACCEL_BLOB_PREFIX']
+            else:
+                relative_path = os.path.relpath(path, os.path.abspath(app.config['UPLOAD_FOLDER']))
+                prefix = app.config['X_ACCEL_REDIRECT_PREFIX']
+            response.headers['X-Accel-Redirect'] = prefix + relative_path.replace(os.sep, '/')
+            response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    else:
+        response = werkzeug_send_file(
+            path,
+            request.environ,
+            as_attachment=True,
+            download_name=download_name,
+            conditional=True,
+            etag=note.content_hash,
+            use_x_sendfile=offload == 'x-sendfile',
+            response_class=app.response_class,
+        )
+    # Downloads are authorized per user, so never let shared caches keep them
+    response.cache_control.private = True
+    return response
+
 # Routes
+@app.cli.command('migrate-uploads')
+def migrate_uploads_command():
+    """Fold note files from the old uuid-named uploads/ layout into the blob store."""
+    migrated = 0
+    for note in Note.query.all():
+        legacy_path = os.path.join(app.config['UPLOAD_FOLDER'], note.filename)
+        if not os.path.isfile(legacy_path):
+            continue
+        content_hash, size = blob_store.put_file(legacy_path)
+        note.content_hash = content_hash
+        db.session.merge(Blob(hash=content_hash, size=size, ref_count=0))
+        migrated += 1
+    db.session.flush()
+    blob_store.recount()
+    db.session.commit()
+    print(f'Migrated {migrated} files into the blob store')
+
+@app.cli.command('gc-blobs')
+@click.option('--grace', default=3600, help='Keep stray files younger than this many seconds.')
+def gc_blobs_command(grace):
+    """Delete blobs no note refers to."""
+    removed = blob_store.collect_garbage(grace_seconds=grace)
+    print(f'Removed {removed} unreferenced blob files')
+
 @app.route('/')
+@cached_page('notes', 'questions')
 def index():
-    recent_notes = Note.query.order_by(Note.created_at.desc()).limit(6).all()
+    recent_notes = note_counters.apply(Note.query.order_by(Note.created_at.desc()).limit(6).all())
     recent_questions = ForumQuestion.query.order_by(ForumQuestion.created_at.desc()).limit(4).all()
     return render_template('index.html', recent_notes=recent_notes, recent_questions=recent_questions)
 
@@ -123,10 +1156,12 @@ def register():
             username=username,
             email=email,
             password_hash=generate_password_hash(password),
-            coins=10  # Welcome bonus
+            coins=0
         )
         
         db.session.add(user)
+        db.session.flush()
+        coin_ledger.credit(user.id, 10, 'signup_bonus')  # Welcome bonus
         db.session.commit()
         
         session['user_id'] = user.id
@@ -163,17 +1198,19 @@ def logout():
 @login_required
 def dashboard():
     user = User.query.get(session['user_id'])
-    uploaded_notes = Note.query.filter_by(uploader_id=user.id).all()
+    stats = get_user_stats(user.id)
+    # Only the newest few are listed; totals come from the stats row
+    uploaded_notes = note_counters.apply(
+        Note.query.filter_by(uploader_id=user.id).order_by(Note.created_at.desc()).limit(5).all()
+    )
     purchased_notes = db.session.query(Note).join(Purchase).filter(Purchase.user_id == user.id).all()
     
-    # Calculate earnings
-    total_earnings = sum(note.downloads * note.price for note in uploaded_notes if note.price > 0)
-    
     return render_template('dashboard.html', 
                          user=user, 
+                         stats=stats,
                          uploaded_notes=uploaded_notes, 
                          purchased_notes=purchased_notes,
-                         total_earnings=total_earnings)
+                         total_earnings=stats.total_earnings)
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -186,6 +1223,14 @@ def allowed_file(filename):
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def note_filename(filename):
+    """secure_filename() that never comes back empty or without the upload's extension."""
+    extension = filename.rsplit('.', 1)[1].lower()
+    name = secure_filename(filename)
+    if not name.lower().endswith('.' + extension):
+        name = f"{name or 'note'}.{extension}"
+    return name
+
 # Jinja filter to support {{ text|nl2br|safe }}
 @app.template_filter('nl2br')
 def nl2br(s: str):
@@ -211,21 +1256,23 @@ def upload_note():
             return redirect(request.url)
         
         if file and allowed_file(file.filename):
-            # Generate unique filename
-            filename = str(uuid.uuid4()) + '_' + secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            # Identical files are stored once and shared between notes
+            content_hash, size = blob_store.put(file.stream)
             
             note = Note(
                 title=title,
                 subject=subject,
                 description=description,
-                filename=filename,
+                filename=note_filename(file.filename),
+                content_hash=content_hash,
                 price=price,
                 uploader_id=session['user_id']
             )
             
             db.session.add(note)
+            db.session.flush()
+            blob_store.add_ref(content_hash, size)
+            bump_user_stats(note.uploader_id, notes_uploaded=1)
             db.session.commit()
             
             flash('Note uploaded successfully!', 'success')
@@ -236,30 +1283,39 @@ def upload_note():
     return render_template('upload.html')
 
 @app.route('/notes')
+@cached_page('notes')
 def notes():
     page = request.args.get('page', 1, type=int)
     subject_filter = request.args.get('subject', '')
+    search_query = request.args.get('q', '').strip()
     
     query = Note.query
     if subject_filter:
-        query = query.filter(Note.subject.ilike(f'%{subject_filter}%'))
+        query = query.filter(Note.subject == subject_filter)
     
-    notes = query.order_by(Note.created_at.desc()).paginate(
-        page=page, per_page=12, error_out=False
-    )
+    if search_query:
+        # Ranked results keep numbered pages; plain browsing seeks by cursor
+        notes = note_search.filter(query, search_query).paginate(page=page, per_page=12, error_out=False)
+    else:
+        notes = keyset_paginate(query, Note, after=request.args.get('after'),
+                                before=request.args.get('before'), per_page=12)
     
-    subjects = db.session.query(Note.subject.distinct()).all()
-    subjects = [s[0] for s in subjects]
+    note_counters.apply(notes.items)
     
-    return render_template('notes.html', notes=notes, subjects=subjects, selected_subject=subject_filter)
+    subject_counts = dict(note_facets.subjects())
+    subjects = list(subject_counts)
+    
+    return render_template('notes.html', notes=notes, subjects=subjects, selected_subject=subject_filter,
+                           subject_counts=subject_counts, price_buckets=note_facets.price_buckets(),
+                           search_query=search_query)
 
 @app.route('/note/<int:note_id>')
 def view_note(note_id):
     note = Note.query.get_or_404(note_id)
     
-    # Increment view count
-    note.views += 1
-    db.session.commit()
+    # Increment view count (buffered, flushed in the background)
+    note_counters.incr(note.id, 'views')
+    note_counters.apply([note])
     
     # Check if user has purchased this note (if it's paid)
     can_download = True
@@ -289,40 +1345,33 @@ def download_note(note_id):
         flash('You need to purchase this note first.', 'error')
         return redirect(url_for('view_note', note_id=note_id))
     
-    # Increment download count
-    note.downloads += 1
-    db.session.commit()
+    response = send_note_file(note)
+    
+    # Count full downloads only, not revalidations (304) or resumed ranges (206)
+    if response.status_code == 200:
+        note_counters.incr(note.id, 'downloads')
     
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], note.filename)
-    return send_file(filepath, as_attachment=True, download_name=f"{note.title}.{note.filename.split('.')[-1]}")
+    return response
 
 @app.route('/purchase/<int:note_id>', methods=['POST'])
 @login_required
 def purchase_note(note_id):
     note = Note.query.get_or_404(note_id)
-    user = User.query.get(session['user_id'])
     
     if note.price == 0:
         return jsonify({'success': False, 'message': 'This note is free!'})
     
-    if user.coins < note.price:
-        return jsonify({'success': False, 'message': 'Insufficient coins. Please buy more coins.'})
-    
-    # Check if already purchased
-    existing_purchase = Purchase.query.filter_by(user_id=user.id, note_id=note_id).first()
-    if existing_purchase:
+    if Purchase.query.filter_by(user_id=session['user_id'], note_id=note_id).first():
         return jsonify({'success': False, 'message': 'You have already purchased this note.'})
     
-    # Process purchase
-    user.coins -= note.price
-    purchase = Purchase(user_id=user.id, note_id=note_id)
-    
-    # Give coins to uploader
-    uploader = User.query.get(note.uploader_id)
-    uploader.coins += note.price
-    
-    db.session.add(purchase)
-    db.session.commit()
+    # The ledger's idempotency key also turns a concurrent repeat into a no-op
+    try:
+        coin_ledger.purchase(session['user_id'], note)
+        db.session.commit()
+    except InsufficientCoins:
+        return jsonify({'success': False, 'message': 'Insufficient coins. Please buy more coins.'})
+    except DuplicateTransaction:
+        return jsonify({'success': False, 'message': 'You have already purchased this note.'})
     
     return jsonify({'success': True, 'message': 'Note purchased successfully!'})
 
@@ -332,8 +1381,7 @@ def buy_coins():
     if request.method == 'POST':
         # Simulate payment processing
         # In production, integrate with actual payment gateway
-        user = User.query.get(session['user_id'])
-        user.coins += 100  # Rs. 100 = 100 coins
+        coin_ledger.credit(session['user_id'], 100, 'topup')  # Rs. 100 = 100 coins
         db.session.commit()
         
         flash('Coins purchased successfully!', 'success')
@@ -342,21 +1390,26 @@ def buy_coins():
     return render_template('buy_coins.html')
 
 @app.route('/forum')
+@cached_page('questions')
 def forum():
     page = request.args.get('page', 1, type=int)
     category_filter = request.args.get('category', '')
+    search_query = request.args.get('q', '').strip()
     
     query = ForumQuestion.query
     if category_filter:
         query = query.filter(ForumQuestion.category == category_filter)
     
-    questions = query.order_by(ForumQuestion.created_at.desc()).paginate(
-        page=page, per_page=10, error_out=False
-    )
+    if search_query:
+        questions = question_search.filter(query, search_query).paginate(page=page, per_page=10, error_out=False)
+    else:
+        questions = keyset_paginate(query, ForumQuestion, after=request.args.get('after'),
+                                    before=request.args.get('before'), per_page=10)
     
     categories = ['Programming', 'Mathematics', 'Science', 'Engineering', 'Literature', 'General']
     
-    return render_template('forum.html', questions=questions, categories=categories, selected_category=category_filter)
+    return render_template('forum.html', questions=questions, categories=categories, selected_category=category_filter,
+                           search_query=search_query)
 
 @app.route('/forum/ask', methods=['GET', 'POST'])
 @login_required
@@ -387,13 +1440,13 @@ def view_question(question_id):
     question = ForumQuestion.query.get_or_404(question_id)
     answers = ForumAnswer.query.filter_by(question_id=question_id).order_by(ForumAnswer.rating.desc()).all()
     
-    # Get comments for each answer
-    answer_comments = {}
-    for answer in answers:
-        comments = Comment.query.filter_by(target_type='answer', target_id=answer.id).all()
-        answer_comments[answer.id] = comments
+    # Load comments for the question and all of its answers in one query
+    comments = load_comments({'question': [question.id], 'answer': [answer.id for answer in answers]})
+    answer_comments = comments['answer']
+    question_comments = comments['question'][question.id]
     
-    return render_template('question_detail.html', question=question, answers=answers, answer_comments=answer_comments)
+    return render_template('question_detail.html', question=question, answers=answers,
+                           answer_comments=answer_comments, question_comments=question_comments)
 
 @app.route('/forum/answer/<int:question_id>', methods=['POST'])
 @login_required
@@ -421,12 +1474,13 @@ def rate_answer(answer_id):
     answer = ForumAnswer.query.get_or_404(answer_id)
     
     if rating_type == 'up':
-        answer.rating += 1
+        db.session.execute(update(ForumAnswer).where(ForumAnswer.id == answer_id)
+                           .values(rating=ForumAnswer.rating + 1))
         # Reward answerer with coins
-        answerer = User.query.get(answer.user_id)
-        answerer.coins += 1
+        coin_ledger.credit(answer.user_id, 1, 'reward')
     elif rating_type == 'down':
-        answer.rating -= 1
+        db.session.execute(update(ForumAnswer).where(ForumAnswer.id == answer_id)
+                           .values(rating=ForumAnswer.rating - 1))
     
     db.session.commit()
     
@@ -456,20 +1510,128 @@ def post_comment():
 @login_required
 def user_stats():
     user = User.query.get(session['user_id'])
-    uploaded_notes = Note.query.filter_by(uploader_id=user.id).all()
-    total_downloads = sum(note.downloads for note in uploaded_notes)
-    total_views = sum(note.views for note in uploaded_notes)
-    total_earnings = sum(note.downloads * note.price for note in uploaded_notes if note.price > 0)
+    stats = get_user_stats(user.id)
     
     return jsonify({
         'coins': user.coins,
-        'total_downloads': total_downloads,
-        'total_views': total_views,
-        'total_earnings': total_earnings,
-        'notes_uploaded': len(uploaded_notes)
+        'total_downloads': stats.total_downloads,
+        'total_views': stats.total_views,
+        'total_earnings': stats.total_earnings,
+        'notes_uploaded': stats.notes_uploaded
+    })
+
+@app.errorhandler(InvalidCursor)
+def invalid_cursor(error):
+    if request.path.startswith('/api/'):
+        return jsonify({'success': False, 'message': 'Invalid pagination cursor'}), 400
+    return 'Invalid pagination cursor', 400
+
+@app.route('/api/notes')
+def notes_api():
+    subject_filter = request.args.get('subject', '')
+    per_page = min(request.args.get('limit', 12, type=int), 50)
+    
+    query = Note.query
+    if subject_filter:
+        query = query.filter(Note.subject == subject_filter)
+    
+    notes = keyset_paginate(query, Note, after=request.args.get('after'),
+                            before=request.args.get('before'), per_page=per_page)
+    note_counters.apply(notes.items)
+    
+    return jsonify({
+        'success': True,
+        'notes': [{
+            'id': note.id,
+            'title': note.title,
+            'subject': note.subject,
+            'price': note.price,
+            'views': note.views,
+            'downloads': note.downloads,
+            'created_at': note.created_at.isoformat(),
+            'url': url_for('view_note', note_id=note.id)
+        } for note in notes.items],
+        'next_cursor': notes.next_cursor,
+        'prev_cursor': notes.prev_cursor
     })
 
+@app.route('/api/forum/questions')
+def forum_questions_api():
+    category_filter = request.args.get('category', '')
+    per_page = min(request.args.get('limit', 10, type=int), 50)
+    
+    query = ForumQuestion.query
+    if category_filter:
+        query = query.filter(ForumQuestion.category == category_filter)
+    
+    questions = keyset_paginate(query, ForumQuestion, after=request.args.get('after'),
+                                before=request.args.get('before'), per_page=per_page)
+    
+    return jsonify({
+        'success': True,
+        'questions': [{
+            'id': question.id,
+            'title': question.title,
+            'category': question.category,
+            'created_at': question.created_at.isoformat(),
+            'url': url_for('view_question', question_id=question.id)
+        } for question in questions.items],
+        'next_cursor': questions.next_cursor,
+        'prev_cursor': questions.prev_cursor
+    })
+
+@app.route('/api/cache-stats')
+def cache_stats():
+    # Counters are per worker process
+    return jsonify(page_cache.stats())
+
+@app.route('/api/search')
+def search():
+    search_query = request.args.get('q', '').strip()
+    search_type = request.args.get('type', 'notes')
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 10, type=int), 50)
+    
+    if search_type == 'questions':
+        results = question_search.search(search_query, page=page, per_page=per_page)
+        items = [{
+            'id': question.id,
+            'title': question.title,
+            'category': question.category,
+            'url': url_for('view_question', question_id=question.id)
+        } for question in results.items]
+    else:
+        results = note_search.search(search_query, page=page, per_page=per_page)
+        items = [{
+            'id': note.id,
+            'title': note.title,
+            'subject': note.subject,
+            'price': note.price,
+            'url': url_for('view_note', note_id=note.id)
+        } for note in results.items]
+    
+    return jsonify({
+        'success': True,
+        'results': items,
+        'page': results.page,
+        'pages': results.pages,
+        'total': results.total
+    })
+
+@app.route('/api/search/suggest')
+def search_suggest():
+    prefix = request.args.get('q', '')
+    return jsonify({
+        'notes': note_search.suggest(prefix),
+        'questions': question_search.suggest(prefix)
+    })
+
+# Servers import the app without running init_db(); search still needs its FTS tables
+with app.app_context():
+    init_search_indexes()
+
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        init_db()
+        note_facets.warm()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark the coin ledger under parallel purchase load.
+
+Runs against a throwaway SQLite database: many buyers hammer /purchase
+concurrently (including repeated purchases of the same note), then the
+script checks that no coins were created or lost, every purchase happened
+exactly once and every balance matches the ledger.
+
+Usage: python bench_coin_ledger.py [--buyers 20] [--notes 10] [--threads 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+db_dir = tempfile.mkdtemp(prefix='notebazar-bench-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'bench.db')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, init_db, coin_ledger, User, Note, Purchase, CoinTransaction  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+
+def setup(buyers, notes, price):
+    with app.app_context():
+        init_db()
+        password_hash = generate_password_hash('bench')
+        uploader = User(username='uploader', email='uploader@bench', password_hash=password_hash, coins=0)
+        db.session.add(uploader)
+        db.session.add_all(
+            User(username=f'buyer{i}', email=f'buyer{i}@bench', password_hash=password_hash, coins=0)
+            for i in range(buyers)
+        )
+        db.session.flush()
+        db.session.add_all(
+            Note(title=f'Note {i}', subject='Bench', description='bench', filename='bench.txt',
+                 price=price, uploader_id=uploader.id)
+            for i in range(notes)
+        )
+        # Enough for roughly half the notes, so some purchases fail on balance
+        for user in User.query.filter(User.username.like('buyer%')):
+            coin_ledger.credit(user.id, price * notes // 2, 'topup')
+        db.session.commit()
+
+
+def worker(buyer_ids, note_ids, repeats, results, lock):
+    client = app.test_client()
+    for buyer_id in buyer_ids:
+        with client.session_transaction() as sess:
+            sess['user_id'] = buyer_id
+        for _ in range(repeats):
+            for note_id in note_ids:
+                started = time.perf_counter()
+                response = client.post(f'/purchase/{note_id}')
+                elapsed = time.perf_counter() - started
+                ok = response.status_code == 200 and response.get_json()['success']
+                with lock:
+                    results.append((ok, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--buyers', type=int, default=20)
+    parser.add_argument('--notes', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--repeats', type=int, default=2, help='times each buyer retries every note')
+    parser.add_argument('--price', type=int, default=5)
+    args = parser.parse_args()
+
+    setup(args.buyers, args.notes, args.price)
+    with app.app_context():
+        buyer_ids = [user.id for user in User.query.filter(User.username.like('buyer%'))]
+        note_ids = [note.id for note in Note.query]
+        coins_before = db.session.query(db.func.sum(User.coins)).scalar()
+
+    # Every thread works on every buyer, so the same (buyer, note) pairs race
+    results, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(buyer_ids, note_ids[i::-1] + note_ids[i + 1:], args.repeats, results, lock))
+        for i in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed for _, elapsed in results)
+    succeeded = sum(ok for ok, _ in results)
+    print(f'{len(results)} purchase requests on {args.threads} threads in {wall:.2f}s '
+          f'({len(results) / wall:.0f} req/s)')
+    print(f'latency p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, '
+          f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms')
+    print(f'{succeeded} purchases succeeded')
+
+    with app.app_context():
+        coins_after = db.session.query(db.func.sum(User.coins)).scalar()
+        purchases = Purchase.query.count()
+        distinct_purchases = db.session.query(Purchase.user_id, Purchase.note_id).distinct().count()
+        negative = User.query.filter(User.coins < 0).count()
+        mismatches = coin_ledger.reconcile()
+        ledger_rows = CoinTransaction.query.count()
+
+    checks = {
+        'coins conserved': coins_before == coins_after,
+        'no duplicate purchases': purchases == distinct_purchases == succeeded,
+        'no negative balances': negative == 0,
+        'balances match ledger': not mismatches,
+    }
+    for name, passed in checks.items():
+        print(f"{'✓' if passed else '✗'} {name}")
+    print(f'{ledger_rows} ledger entries')
+    return all(checks.values())
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
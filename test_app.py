@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Behaviour tests for the NoteBazar counters, dashboard stats and coin ledger.
+
+Runs against a throwaway SQLite database: checks that buffered view and
+download counters flush to exact totals under concurrent requests, that
+unflushed deltas show up in note pages and dashboard stats, that the exit
+flush drains the buffer, that missing stats rows are rebuilt, and that
+coin reconciliation only writes when asked to fix.
+
+Usage: python test_app.py  (or python -m pytest test_app.py)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+db_dir = tempfile.mkdtemp(prefix='notebazar-test-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(db_dir, 'test.db')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import update  # noqa: E402
+
+from app import (  # noqa: E402
+    app, db, init_db, coin_ledger, note_counters, get_user_stats, rebuild_user_stats,
+    CoinTransaction, Note, User, UserStats
+)
+
+THREADS = 8
+VIEWS_PER_THREAD = 25
+
+# Keep the background worker from flushing on its own; each test flushes explicitly
+app.config['COUNTER_FLUSH_INTERVAL'] = 3600
+app.config['COUNTER_FLUSH_EVENTS'] = 10 ** 9
+app.config['PAGE_CACHE_ENABLED'] = False
+
+
+def make_uploader(name, prices=(0, 5)):
+    """Create a user with one note per price. Returns (user_id, [note_ids])."""
+    with app.app_context():
+        init_db()
+        user = User(username=name, email=f'{name}@test', password_hash='x', coins=0)
+        db.session.add(user)
+        db.session.flush()
+        notes = [Note(title=f'{name} {i}', subject='Test', description='test', filename='test.txt',
+                      price=price, uploader_id=user.id) for i, price in enumerate(prices)]
+        db.session.add_all(notes)
+        db.session.flush()
+        rebuild_user_stats(user.id)
+        db.session.commit()
+        return user.id, [note.id for note in notes]
+
+
+def stored(note_id):
+    """Return the (views, downloads) written to the note row."""
+    with app.app_context():
+        note = db.session.get(Note, note_id)
+        return note.views or 0, note.downloads or 0
+
+
+def test_flush_totals():
+    """Concurrent page views flush to exact totals on the note and its uploader."""
+    user_id, (free_id, paid_id) = make_uploader('flush')
+
+    def view_pages():
+        client = app.test_client()
+        for _ in range(VIEWS_PER_THREAD):
+            assert client.get(f'/note/{free_id}').status_code == 200
+
+    threads = [threading.Thread(target=view_pages) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for _ in range(7):
+        note_counters.incr(paid_id, 'downloads')
+
+    with app.app_context():
+        note_counters.flush()
+        stats = db.session.get(UserStats, user_id)
+        assert (stats.total_views, stats.total_downloads, stats.total_earnings) == \
+            (THREADS * VIEWS_PER_THREAD, 7, 7 * 5), stats
+    assert stored(free_id) == (THREADS * VIEWS_PER_THREAD, 0)
+    assert stored(paid_id) == (0, 7)
+    assert note_counters.pending(free_id) == {'views': 0, 'downloads': 0}
+    print(f'✓ {THREADS * VIEWS_PER_THREAD} concurrent views and 7 downloads flushed exactly')
+
+
+def test_pending_reads():
+    """Unflushed deltas are visible to readers but not yet written."""
+    user_id, (free_id, paid_id) = make_uploader('pending')
+    note_counters.incr(free_id, 'views', 3)
+    note_counters.incr(paid_id, 'downloads', 2)
+
+    with app.app_context():
+        note = note_counters.apply([db.session.get(Note, free_id)])[0]
+        assert note.views == 3
+        stats = get_user_stats(user_id)
+        assert (stats.total_views, stats.total_downloads, stats.total_earnings) == (3, 2, 10), stats
+    assert stored(free_id) == (0, 0)
+
+    with app.app_context():
+        note_counters.flush()
+        stats = get_user_stats(user_id)
+        assert (stats.total_views, stats.total_downloads, stats.total_earnings) == (3, 2, 10), stats
+    print('✓ Pending deltas included in note pages and dashboard stats, not double counted after flush')
+
+
+def test_flush_on_exit():
+    """The exit hook writes whatever is still buffered."""
+    _, (free_id, _) = make_uploader('exit')
+    note_counters.incr(free_id, 'views', 4)
+    note_counters.flush_on_exit()
+    assert stored(free_id) == (4, 0)
+    assert note_counters.pending_notes() == {}
+    print('✓ Exit flush drained the buffer')
+
+
+def test_stats_rebuild():
+    """A missing stats row is rebuilt from the notes, once."""
+    user_id, (free_id, paid_id) = make_uploader('rebuild')
+    with app.app_context():
+        db.session.execute(update(Note).where(Note.id == paid_id).values(downloads=4, views=6))
+        UserStats.query.filter_by(user_id=user_id).delete()
+        db.session.commit()
+
+        # A second rebuild racing the first keeps the existing row
+        rebuild_user_stats(user_id, if_missing=True)
+        rebuild_user_stats(user_id, if_missing=True)
+        db.session.commit()
+        db.session.remove()
+
+        stats = get_user_stats(user_id)
+        assert (stats.notes_uploaded, stats.total_views, stats.total_downloads, stats.total_earnings) == \
+            (2, 6, 4, 20), stats
+        assert UserStats.query.filter_by(user_id=user_id).count() == 1
+    print('✓ Missing stats row rebuilt from the notes')
+
+
+def test_reconcile():
+    """Reporting never writes; fix records adjustments until the ledger matches."""
+    with app.app_context():
+        init_db()
+        user = User(username='ledger', email='ledger@test', password_hash='x', coins=0)
+        legacy = User(username='legacy', email='legacy@test', password_hash='x', coins=30)
+        db.session.add_all([user, legacy])
+        db.session.flush()
+        coin_ledger.credit(user.id, 10, 'topup')
+        db.session.commit()
+        db.session.execute(update(User).where(User.id == user.id).values(coins=15))
+        db.session.commit()
+        user_id, legacy_id = user.id, legacy.id
+
+        entries = CoinTransaction.query.count()
+        assert coin_ledger.reconcile() == [(user_id, 15, 10)]
+        assert CoinTransaction.query.count() == entries
+
+        assert coin_ledger.reconcile(fix=True) == [(user_id, 15, 10)]
+        kinds = dict(db.session.query(CoinTransaction.user_id, CoinTransaction.kind)
+                     .filter(CoinTransaction.kind.in_(['adjustment', 'opening_balance'])).all())
+        assert kinds == {user_id: 'adjustment', legacy_id: 'opening_balance'}, kinds
+        assert coin_ledger.reconcile() == []
+    print('✓ Reconcile reports without writing and fixes with adjustment and opening entries')
+
+
+def main():
+    tests = [test_flush_totals, test_pending_reads, test_flush_on_exit, test_stats_rebuild, test_reconcile]
+    try:
+        for test in tests:
+            test()
+    except AssertionError as e:
+        print(f'✗ {test.__name__} failed: {e}')
+        return False
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)